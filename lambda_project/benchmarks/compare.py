@@ -0,0 +1,76 @@
+"""
+Compare two benchmark result files and fail on regression
+
+Every numeric metric is "lower is better". A metric regresses when it grows by
+more than --threshold relative to the baseline's magnitude, or grows at all
+from a zero baseline. The absolute delta is shown next to the relative change.
+
+Usage:
+    python benchmarks/compare.py baseline.json current.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+# Metrics too noisy to gate on (still shown in the report)
+INFORMATIONAL = ('.max', '.min', '.mean', '.p90', '.samples')
+
+
+def flatten(results: Dict, prefix: str = '') -> Iterator[Tuple[str, float]]:
+    """Yield (dotted.path, value) for every numeric leaf, skipping metadata"""
+    for key, value in results.items():
+        if key == 'meta':
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, float(value)
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> int:
+    """Print a comparison table and return the number of regressions"""
+    base = dict(flatten(baseline))
+    regressions = 0
+    
+    print(f"{'metric':<55} {'baseline':>12} {'current':>12} {'delta':>12} {'change':>9}")
+    for path, value in flatten(current):
+        if path not in base:
+            continue
+        before = base[path]
+        delta = value - before
+        # Relative to the baseline's magnitude, so a negative baseline keeps the sign of
+        # the delta; a zero baseline has no relative change, any growth regresses
+        change = delta / abs(before) if before else None
+        gated = not path.endswith(INFORMATIONAL)
+        flag = ''
+        if gated and (change > threshold if change is not None else delta > 0):
+            flag = '  REGRESSION'
+            regressions += 1
+        shown = f"{change:>+8.1%}" if change is not None else f"{'n/a':>8}"
+        print(f"{path:<55} {before:>12.2f} {value:>12.2f} {delta:>+12.2f} {shown}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare benchmark results')
+    parser.add_argument('baseline', help='Baseline results JSON')
+    parser.add_argument('current', help='Current results JSON')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed relative growth (0.10 = 10%%)')
+    args = parser.parse_args()
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{regressions} metric(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+"""
+Load generator with SLO reporting, run against the local runtime
+
+Replays recorded or synthetic API Gateway events at a target rate with
+open-loop scheduling: requests are sent on a fixed schedule whether or not
+earlier ones have completed, and latency is measured from the scheduled send
+time, so a slow function shows up as latency instead of as a lower request
+rate. Reports latency percentiles, error rate and the fraction of cold starts,
+and checks them against SLOs; exits 1 when any SLO fails, so a run can gate
+promotion from NONPROD to PROD.
+
+Targets:
+- by default, a pool of local execution environments (scripts/local_runtime.py's
+  LocalRuntime) started for the run; --recycle-after forces cold starts
+- with --url, an already running `make serve` (cold starts read from its
+  X-Lambda-Cold-Start header)
+
+SLOs come from --slo-file (JSON, e.g. benchmarks/slo.json) and/or --slo NAME=VALUE:
+p50_ms, p90_ms, p99_ms, max_ms, error_rate and cold_start_rate are upper
+bounds; rps is a lower bound on the achieved rate.
+
+Usage:
+    python benchmarks/load.py --rps 50 --duration 30 --path /health --path /
+    python benchmarks/load.py --events events/ --rps 20 --workers 8 --recycle-after 200
+    python benchmarks/load.py --url http://127.0.0.1:3000 --rps 100 --arrival poisson
+    python benchmarks/load.py --env PROD --slo-file benchmarks/slo.json --json load.json --html load.html
+"""
+import argparse
+import base64
+import html
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from local_runtime import LocalRuntime, api_gateway_event
+from run import percentile, summarize
+from src.router import request_line
+
+DEFAULT_SLOS = {'p99_ms': 1000.0, 'error_rate': 0.01}
+
+# SLOs that are lower bounds; every other SLO is an upper bound
+_AT_LEAST = frozenset({'rps'})
+
+Outcome = Dict[str, object]
+
+
+def load_events(paths: List[str]) -> List[Dict]:
+    """Read recorded events: .json files (one event or a list), .jsonl files, or directories of them"""
+    events = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(p for p in path.iterdir() if p.suffix in ('.json', '.jsonl')) if path.is_dir() else [path]
+        for file in files:
+            with open(file) as f:
+                if file.suffix == '.jsonl':
+                    events.extend(json.loads(line) for line in f if line.strip())
+                    continue
+                document = json.load(f)
+            events.extend(document if isinstance(document, list) else [document])
+    return events
+
+
+def synthetic_events(specs: List[str]) -> List[Dict]:
+    """API Gateway events from 'METHOD /path?query' specs (method defaults to GET)"""
+    events = []
+    for spec in specs:
+        method, _, target = spec.strip().rpartition(' ')
+        path, _, query = target.partition('?')
+        params = dict(pair.split('=', 1) for pair in query.split('&') if '=' in pair)
+        events.append(api_gateway_event(method.upper() or 'GET', path or '/', query=params or None))
+    return events
+
+
+def arrivals(rps: float, duration: float, poisson: bool = False, seed: Optional[int] = None) -> Iterator[float]:
+    """Send times in seconds from the start: evenly spaced, or exponential gaps (Poisson process)"""
+    rng = random.Random(seed)
+    offset = 0.0
+    while True:
+        offset += rng.expovariate(rps) if poisson else 1 / rps
+        if offset >= duration:
+            return
+        yield offset
+
+
+class RuntimeTarget:
+    """Invokes the handler in local execution environments (worker processes)"""
+
+    def __init__(self, runtime: LocalRuntime):
+        self.runtime = runtime
+    
+    def send(self, event: Dict, done: Callable[[Outcome], None]):
+        future = self.runtime.submit(event)
+        future.add_done_callback(lambda f: done(self._outcome(f)))
+    
+    @staticmethod
+    def _outcome(future) -> Outcome:
+        try:
+            result = future.result()
+        except Exception as e:
+            return {'status': None, 'error': f"{type(e).__name__}: {e}", 'cold_start': False}
+        response = result.get('response')
+        status = response.get('statusCode') if isinstance(response, dict) else None
+        return {'status': status, 'error': result.get('error'), 'cold_start': result.get('cold_start', False)}
+    
+    def close(self):
+        self.runtime.shutdown()
+
+
+class HTTPTarget:
+    """Sends events as HTTP requests to a running local runtime (`make serve`)"""
+
+    def __init__(self, base_url: str, concurrency: int, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load')
+    
+    def send(self, event: Dict, done: Callable[[Outcome], None]):
+        future = self.pool.submit(self._request, event)
+        future.add_done_callback(lambda f: done(f.result()))
+    
+    def _request(self, event: Dict) -> Outcome:
+        method, path = request_line(event)
+        query = event.get('queryStringParameters') or {}
+        url = self.base_url + path + ('?' + urlencode(query) if query else '')
+        body = event.get('body')
+        if body is not None:
+            body = base64.b64decode(body) if event.get('isBase64Encoded') else body.encode('utf-8')
+        request = urllib.request.Request(url, data=body, headers=event.get('headers') or {}, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                status, headers = response.status, response.headers
+        except urllib.error.HTTPError as e:
+            e.read()
+            status, headers = e.code, e.headers
+        except Exception as e:
+            return {'status': None, 'error': f"{type(e).__name__}: {e}", 'cold_start': False}
+        return {'status': status, 'error': None, 'cold_start': headers.get('X-Lambda-Cold-Start') == 'true'}
+    
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_load(target, events: List[Dict], schedule: Iterator[float], timeout: float) -> Tuple[List[Dict], float, float]:
+    """
+    Send events round-robin on the schedule without waiting for responses
+    
+    Returns:
+        (samples, elapsed seconds, largest dispatch lag in ms). Requests still
+        running `timeout` seconds after the last send are recorded as errors.
+    """
+    samples: List[Dict] = []
+    lock = threading.Lock()
+    finished = threading.Condition(lock)
+    sent = 0
+    max_lag = 0.0
+    
+    def record(scheduled: float, outcome: Outcome):
+        completed = time.perf_counter()
+        with lock:
+            samples.append(dict(outcome, offset=scheduled - started, latency_ms=(completed - scheduled) * 1000))
+            finished.notify()
+    
+    started = time.perf_counter()
+    for index, offset in enumerate(schedule):
+        scheduled = started + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay * 1000)
+        target.send(events[index % len(events)], lambda outcome, scheduled=scheduled: record(scheduled, outcome))
+        sent += 1
+    
+    deadline = time.perf_counter() + timeout
+    with lock:
+        while len(samples) < sent and time.perf_counter() < deadline:
+            finished.wait(deadline - time.perf_counter())
+        missing = sent - len(samples)
+        elapsed = time.perf_counter() - started
+        samples = list(samples)
+    samples.extend(
+        {'status': None, 'error': 'No response before the timeout', 'cold_start': False,
+         'offset': elapsed, 'latency_ms': timeout * 1000}
+        for _ in range(missing)
+    )
+    return samples, elapsed, max_lag
+
+
+def _is_error(sample: Dict) -> bool:
+    return bool(sample['error']) or sample['status'] is None or sample['status'] >= 500
+
+
+def timeline(samples: List[Dict]) -> List[Dict]:
+    """Per-second buckets (by scheduled send time): requests, errors, cold starts, p50/p99"""
+    buckets: Dict[int, List[Dict]] = {}
+    for sample in samples:
+        buckets.setdefault(int(sample['offset']), []).append(sample)
+    rows = []
+    for second in range(max(buckets) + 1 if buckets else 0):
+        bucket = buckets.get(second, [])
+        latencies = [s['latency_ms'] for s in bucket]
+        rows.append({
+            'second': second,
+            'requests': len(bucket),
+            'errors': sum(_is_error(s) for s in bucket),
+            'cold_starts': sum(bool(s['cold_start']) for s in bucket),
+            'p50_ms': round(percentile(latencies, 50), 3) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99), 3) if latencies else None,
+        })
+    return rows
+
+
+def build_report(samples: List[Dict], elapsed: float, target_rps: float, max_lag_ms: float) -> Dict:
+    """Aggregate the samples of one run"""
+    latencies = [s['latency_ms'] for s in samples]
+    warm = [s['latency_ms'] for s in samples if not s['cold_start']]
+    cold = [s['latency_ms'] for s in samples if s['cold_start']]
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        key = str(sample['status']) if sample['status'] is not None else 'error'
+        statuses[key] = statuses.get(key, 0) + 1
+    errors = [s['error'] for s in samples if s['error']]
+    total = len(samples)
+    return {
+        'requests': total,
+        'duration_s': round(elapsed, 3),
+        'target_rps': target_rps,
+        'rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'max_dispatch_lag_ms': round(max_lag_ms, 3),
+        'latency_ms': summarize(latencies) if latencies else {},
+        'warm_latency_ms': summarize(warm) if warm else {},
+        'cold_latency_ms': summarize(cold) if cold else {},
+        'error_rate': sum(_is_error(s) for s in samples) / total if total else 0.0,
+        'cold_start_rate': len(cold) / total if total else 0.0,
+        'statuses': statuses,
+        'error_messages': sorted(set(errors))[:10],
+        'timeline': timeline(samples),
+    }
+
+
+def _metric(report: Dict, name: str) -> Optional[float]:
+    if name.endswith('_ms'):
+        return report['latency_ms'].get(name[:-3])
+    return report.get(name)
+
+
+def evaluate_slos(report: Dict, slos: Dict[str, float]) -> List[Dict]:
+    """Check every SLO; a run with no samples fails them all"""
+    results = []
+    for name, threshold in slos.items():
+        actual = _metric(report, name)
+        if actual is None:
+            passed = False
+        elif name in _AT_LEAST:
+            passed = actual >= threshold
+        else:
+            passed = actual <= threshold
+        results.append({
+            'slo': name,
+            'threshold': threshold,
+            'actual': actual,
+            'bound': 'min' if name in _AT_LEAST else 'max',
+            'passed': passed,
+        })
+    return results
+
+
+def parse_slos(slo_file: Optional[str], overrides: List[str]) -> Dict[str, float]:
+    """SLOs from a JSON file and NAME=VALUE overrides (DEFAULT_SLOS when neither is given)"""
+    slos = {}
+    if slo_file:
+        with open(slo_file) as f:
+            slos.update({name: float(value) for name, value in json.load(f).items()})
+    for override in overrides:
+        name, _, value = override.partition('=')
+        slos[name.strip()] = float(value)
+    if not slos:
+        slos = dict(DEFAULT_SLOS)
+    known = {'p50_ms', 'p90_ms', 'p99_ms', 'max_ms', 'mean_ms', 'error_rate', 'cold_start_rate'} | _AT_LEAST
+    unknown = set(slos) - known
+    if unknown:
+        raise ValueError(f"Unknown SLOs: {', '.join(sorted(unknown))} (known: {', '.join(sorted(known))})")
+    return slos
+
+
+def _format(value: Optional[float], name: str = '') -> str:
+    if value is None:
+        return '-'
+    if name.endswith('_rate'):
+        return f"{value:.2%}"
+    return f"{value:.2f}"
+
+
+def print_report(report: Dict, slo_results: List[Dict]):
+    latency = report['latency_ms']
+    print(f"{report['requests']} requests in {report['duration_s']:.1f} s "
+          f"({report['rps']:.1f} rps, target {report['target_rps']:g})")
+    if report['max_dispatch_lag_ms'] > 10:
+        print(f"Warning: sends fell up to {report['max_dispatch_lag_ms']:.0f} ms behind schedule "
+              f"(the load generator is saturated)")
+    if latency:
+        print(f"Latency [ms]: p50 {latency['p50']:.2f}  p90 {latency['p90']:.2f}  "
+              f"p99 {latency['p99']:.2f}  max {latency['max']:.2f}")
+    for label, key in (('warm', 'warm_latency_ms'), ('cold', 'cold_latency_ms')):
+        if report[key]:
+            print(f"  {label}: p50 {report[key]['p50']:.2f}  p99 {report[key]['p99']:.2f}  "
+                  f"({report[key]['samples']} requests)")
+    print(f"Errors: {report['error_rate']:.2%}   Cold starts: {report['cold_start_rate']:.2%}   "
+          f"Statuses: {', '.join(f'{k}={v}' for k, v in sorted(report['statuses'].items()))}")
+    for message in report['error_messages']:
+        print(f"  - {message}")
+    
+    print(f"\n{'SLO':<16}{'bound':>12}{'actual':>12}  result")
+    for result in slo_results:
+        bound = f"{'>=' if result['bound'] == 'min' else '<='} {_format(result['threshold'], result['slo'])}"
+        print(f"{result['slo']:<16}{bound:>12}{_format(result['actual'], result['slo']):>12}  "
+              f"{'PASS' if result['passed'] else 'FAIL'}")
+
+
+def _polyline(points: List[Tuple[float, float]], width: int, height: int, max_x: float, max_y: float) -> str:
+    return ' '.join(
+        f"{x / max_x * width:.1f},{height - y / max_y * height:.1f}" for x, y in points
+    )
+
+
+def render_html(report: Dict, slo_results: List[Dict], title: str) -> str:
+    """Self-contained HTML report: SLO table, summary and per-second latency chart"""
+    rows = ''.join(
+        f"<tr class=\"{'pass' if r['passed'] else 'fail'}\"><td>{html.escape(r['slo'])}</td>"
+        f"<td>{'&ge;' if r['bound'] == 'min' else '&le;'} {_format(r['threshold'], r['slo'])}</td>"
+        f"<td>{_format(r['actual'], r['slo'])}</td><td>{'PASS' if r['passed'] else 'FAIL'}</td></tr>"
+        for r in slo_results
+    )
+    latency = report['latency_ms']
+    summary = {
+        'Requests': report['requests'],
+        'Achieved rate': f"{report['rps']:.1f} rps (target {report['target_rps']:g})",
+        'Latency p50 / p90 / p99 / max': ' / '.join(
+            f"{latency[k]:.1f}" for k in ('p50', 'p90', 'p99', 'max')
+        ) + ' ms' if latency else '-',
+        'Error rate': f"{report['error_rate']:.2%}",
+        'Cold starts': f"{report['cold_start_rate']:.2%}",
+        'Statuses': ', '.join(f'{k}={v}' for k, v in sorted(report['statuses'].items())),
+    }
+    summary_rows = ''.join(
+        f"<tr><th>{html.escape(k)}</th><td>{html.escape(str(v))}</td></tr>" for k, v in summary.items()
+    )
+    
+    width, height = 800, 240
+    seconds = [row for row in report['timeline'] if row['p99_ms'] is not None]
+    chart = ''
+    if seconds:
+        max_x = max(len(report['timeline']) - 1, 1)
+        max_y = max(row['p99_ms'] for row in seconds) or 1
+        p50 = _polyline([(row['second'], row['p50_ms']) for row in seconds], width, height, max_x, max_y)
+        p99 = _polyline([(row['second'], row['p99_ms']) for row in seconds], width, height, max_x, max_y)
+        chart = (
+            f'<h2>Latency per second (max {max_y:.1f} ms)</h2>'
+            f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<rect width="{width}" height="{height}" fill="#f7f7f7"/>'
+            f'<polyline points="{p99}" fill="none" stroke="#d9534f" stroke-width="2"/>'
+            f'<polyline points="{p50}" fill="none" stroke="#337ab7" stroke-width="2"/></svg>'
+            '<p><span style="color:#337ab7">p50</span> / <span style="color:#d9534f">p99</span>, '
+            'by scheduled send time</p>'
+        )
+    passed = all(r['passed'] for r in slo_results)
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 1.5em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: left; }}
+.pass td:last-child {{ color: #3c763d; font-weight: bold; }}
+.fail td:last-child {{ color: #a94442; font-weight: bold; }}
+</style></head><body>
+<h1>{html.escape(title)}: {'PASS' if passed else 'FAIL'}</h1>
+<table><tr><th>SLO</th><th>Bound</th><th>Actual</th><th>Result</th></tr>{rows}</table>
+<table>{summary_rows}</table>
+{chart}
+</body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Open-loop load test of the handler with SLO checks')
+    parser.add_argument('--rps', type=float, default=20, help='Target request rate')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+    parser.add_argument('--arrival', choices=('uniform', 'poisson'), default='uniform',
+                        help='Evenly spaced sends, or a Poisson process with the same mean rate')
+    parser.add_argument('--seed', type=int, help='Seed for Poisson arrivals')
+    parser.add_argument('--events', action='append', default=[],
+                        help='Recorded events: .json/.jsonl file or directory (repeatable)')
+    parser.add_argument('--path', action='append', default=[],
+                        help="Synthetic event 'METHOD /path?query' (repeatable, default 'GET /')")
+    parser.add_argument('--url', help='Send HTTP requests to a running local runtime instead')
+    parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight with --url')
+    parser.add_argument('--workers', type=int, default=4, help='Execution environments (without --url)')
+    parser.add_argument('--recycle-after', type=int, help='Recycle each environment after N invocations')
+    parser.add_argument('--env', help='Environment name (sets ENV_NAME)')
+    parser.add_argument('--handler', default='src.main.handler', help='Dotted handler path')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--memory', type=int, default=128, help='Reported memory limit in MB')
+    parser.add_argument('--slo-file', help='JSON object of SLO thresholds')
+    parser.add_argument('--slo', action='append', default=[], metavar='NAME=VALUE', help='SLO threshold (repeatable)')
+    parser.add_argument('--json', metavar='PATH', help='Write the report as JSON')
+    parser.add_argument('--html', metavar='PATH', help='Write the report as HTML')
+    args = parser.parse_args()
+    
+    try:
+        slos = parse_slos(args.slo_file, args.slo)
+    except ValueError as e:
+        parser.error(str(e))
+    events = load_events(args.events) + synthetic_events(args.path)
+    if not events:
+        events = synthetic_events(['GET /'])
+    
+    if args.env:
+        # Workers are spawned after this, so they inherit it
+        os.environ['ENV_NAME'] = args.env
+    if args.url:
+        target = HTTPTarget(args.url, args.concurrency, args.timeout)
+    else:
+        target = RuntimeTarget(LocalRuntime(args.workers, args.recycle_after, args.handler, args.timeout, args.memory))
+    
+    print(f"Sending {args.rps:g} rps for {args.duration:g} s ({args.arrival}, {len(events)} event(s)) "
+          f"to {args.url or f'{args.workers} local environment(s)'}", file=sys.stderr)
+    schedule = arrivals(args.rps, args.duration, args.arrival == 'poisson', args.seed)
+    try:
+        samples, elapsed, max_lag = run_load(target, events, schedule, args.timeout)
+    finally:
+        target.close()
+    
+    report = build_report(samples, elapsed, args.rps, max_lag)
+    slo_results = evaluate_slos(report, slos)
+    report['slos'] = slo_results
+    report['passed'] = all(result['passed'] for result in slo_results)
+    print_report(report, slo_results)
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.html:
+        title = f"Load test {os.environ.get('ENV_NAME', '')}".strip()
+        with open(args.html, 'w') as f:
+            f.write(render_html(report, slo_results, title))
+    
+    sys.exit(0 if report['passed'] else 1)
+
+
+if __name__ == "__main__":
+    main()
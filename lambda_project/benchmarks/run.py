@@ -0,0 +1,276 @@
+"""
+Benchmark suite for the Lambda package
+
+Measures:
+- cold import time of src.main (fresh interpreter per sample)
+- EnvironmentConfig() construction time vs os.environ size and .env size
+- warm handler() latency (p50/p99)
+- allocations per invocation (tracemalloc)
+- first request latency in a fresh environment, with and without a warm-up ping
+
+Results are written as JSON; compare two runs with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run.py --output bench.json
+    python benchmarks/run.py --only handler,allocations --iterations 5000
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+# Self-contained configuration so the suite runs without a .env file
+BENCH_ENV = {
+    'ENV_NAME': 'BENCH',
+    'BENCH_URL': 'http://127.0.0.1:9/api',
+    'BENCH_API_KEY': 'bench-key',
+    'BENCH_DATABASE_URL': 'sqlite:///:memory:',
+    'BENCH_LOG_LEVEL': 'WARNING',
+    'BENCH_METRICS_ENABLED': 'false',
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile: the smallest sample with at least pct% of samples at or below it"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summary statistics for a list of samples"""
+    return {
+        'min': min(samples),
+        'p50': percentile(samples, 50),
+        'p90': percentile(samples, 90),
+        'p99': percentile(samples, 99),
+        'max': max(samples),
+        'mean': statistics.fmean(samples),
+        'samples': len(samples),
+    }
+
+
+def bench_cold_import(samples: int = 10) -> Dict:
+    """Time `import src.main` in a fresh interpreter, in milliseconds"""
+    code = (
+        "import time; started = time.perf_counter(); import src.main; "
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    env = dict(os.environ, **BENCH_ENV)
+    timings = []
+    for _ in range(samples):
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=str(PROJECT_ROOT), env=env,
+            capture_output=True, text=True, check=True,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return {'import_ms': summarize(timings)}
+
+
+# First request in a fresh interpreter, optionally preceded by a warm-up ping; the
+# request also runs one pooled query, as business logic touching the database would
+_FIRST_REQUEST = """
+import sys, time
+sys.path.insert(0, 'scripts')
+from local_runtime import LambdaContext, api_gateway_event
+import src.main
+context = LambdaContext(function_name='bench')
+if {warm}:
+    src.main.handler({{'source': 'aws.events', 'detail-type': 'Scheduled Event'}}, context)
+event = api_gateway_event('GET', '/bench', headers={{'Accept-Encoding': 'gzip'}})
+started = time.perf_counter()
+src.main.handler(event, context)
+with src.main.connections.database.connection() as connection:
+    connection.execute('SELECT 1').fetchall()
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def bench_warmup(samples: int = 10) -> Dict:
+    """First request latency (ms) in fresh interpreters, cold vs after a warm-up ping"""
+    env = dict(os.environ, **BENCH_ENV)
+    results = {}
+    for label, warm in (('cold', False), ('warmed', True)):
+        timings = []
+        for _ in range(samples):
+            result = subprocess.run(
+                [sys.executable, '-c', _FIRST_REQUEST.format(warm=warm)], cwd=str(PROJECT_ROOT), env=env,
+                capture_output=True, text=True, check=True,
+            )
+            timings.append(float(result.stdout.strip().splitlines()[-1]))
+        results[f'first_request_{label}_ms'] = summarize(timings)
+    
+    # Kept out of the results: compare.py treats every metric as lower-is-better
+    saved = results['first_request_cold_ms']['p50'] - results['first_request_warmed_ms']['p50']
+    print(f"Warm-up removed {saved:.2f} ms from the first request (p50)", file=sys.stderr)
+    return results
+
+
+def _time_calls(func: Callable[[], object], repeat: int) -> float:
+    """Median wall time of func in microseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(timings)
+
+
+def bench_config(environ_sizes=(100, 1000, 10000), dotenv_sizes=(0, 100, 1000, 5000), repeat: int = 20) -> Dict:
+    """Time EnvironmentConfig() construction as os.environ and .env grow, in microseconds"""
+    from src import envfile
+    from src.config import EnvironmentConfig
+    
+    saved_environ = dict(os.environ)
+    results = {'by_environ_size': {}, 'by_dotenv_size': {}, 'by_dotenv_size_uncached': {}}
+    try:
+        with tempfile.TemporaryDirectory() as root_dir:
+            env_path = Path(root_dir) / '.env'
+            
+            env_path.write_text('')
+            for size in environ_sizes:
+                os.environ.clear()
+                os.environ.update(saved_environ)
+                os.environ.update(BENCH_ENV)
+                padding = size - len(os.environ)
+                os.environ.update({f'PAD_{i}': 'x' * 32 for i in range(max(0, padding))})
+                results['by_environ_size'][str(size)] = _time_calls(
+                    lambda: EnvironmentConfig(root_dir=root_dir), repeat
+                )
+            
+            os.environ.clear()
+            os.environ.update(saved_environ)
+            os.environ.update(BENCH_ENV)
+            cache_path = Path(f'{env_path}.cache')
+            for size in dotenv_sizes:
+                env_path.write_text(''.join(f'BENCH_KEY_{i}="value-{i}"\n' for i in range(size)))
+                
+                # The file is memoized in process (envfile.load), so repeated
+                # constructions only copy this environment's group out of it
+                results['by_dotenv_size'][str(size)] = _time_calls(
+                    lambda: EnvironmentConfig(root_dir=root_dir), repeat
+                )
+                
+                def construct_uncached():
+                    # Drop the memo and the compiled .env.cache: a full read and parse
+                    envfile._loaded.clear()
+                    if cache_path.exists():
+                        cache_path.unlink()
+                    EnvironmentConfig(root_dir=root_dir)
+                
+                results['by_dotenv_size_uncached'][str(size)] = _time_calls(construct_uncached, repeat)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+    
+    return {'construct_us': results}
+
+
+def _load_handler():
+    """Import the handler with the benchmark configuration"""
+    from local_runtime import LambdaContext, api_gateway_event
+    from src.main import handler
+    return handler, LambdaContext, api_gateway_event('GET', '/bench')
+
+
+def bench_handler(iterations: int = 2000, warmup: int = 100) -> Dict:
+    """Warm handler() latency in microseconds"""
+    handler, LambdaContext, event = _load_handler()
+    context = LambdaContext(function_name='bench')
+    
+    for _ in range(warmup):
+        handler(event, context)
+    
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        handler(event, context)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return {'latency_us': summarize(timings)}
+
+
+def bench_allocations(iterations: int = 500, warmup: int = 50) -> Dict:
+    """Peak traced bytes per invocation and bytes retained across invocations"""
+    handler, LambdaContext, event = _load_handler()
+    context = LambdaContext(function_name='bench')
+    for _ in range(warmup):
+        handler(event, context)
+    
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for _ in range(iterations):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            handler(event, context)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'peak_bytes_per_invocation': summarize(peaks),
+        'retained_bytes_per_invocation': (retained - baseline) / iterations,
+    }
+
+
+BENCHMARKS = {
+    'cold_import': lambda args: bench_cold_import(args.import_samples),
+    'config': lambda args: bench_config(),
+    'handler': lambda args: bench_handler(args.iterations),
+    'allocations': lambda args: bench_allocations(max(1, args.iterations // 4)),
+    'warmup': lambda args: bench_warmup(args.import_samples),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Lambda benchmark suite')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--only', help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--iterations', type=int, default=2000, help='Warm handler invocations')
+    parser.add_argument('--import-samples', type=int, default=10, help='Fresh interpreters for cold import')
+    args = parser.parse_args()
+    
+    # Before anything imports src.config, whose global instance reads ENV_NAME
+    os.environ.update(BENCH_ENV)
+    
+    selected = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+    }
+    for name in selected:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = BENCHMARKS[name](args)
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Local stand-in for the AWS AppConfig Lambda extension
+
+Serves JSON files on the extension's API so a function configured with
+CONFIG_SOURCE=appconfig can be developed and tested locally:
+
+    GET /applications/<application>/environments/<environment>/configurations/<profile>
+
+returns <directory>/<application>/<environment>/<profile>.json, re-read on
+every request, so edits are picked up on the function's next poll.
+
+Usage:
+    python scripts/appconfig_local.py --directory appconfig
+    NONPROD_CONFIG_SOURCE=appconfig \\
+    NONPROD_CONFIG_SOURCE_LOCATION=http://127.0.0.1:2772/app/nonprod/settings \\
+        python scripts/local_runtime.py
+"""
+import argparse
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PATH = re.compile(r'^/applications/([^/]+)/environments/([^/]+)/configurations/([^/?]+)')
+
+
+def make_request_handler(directory: str, quiet: bool = False):
+    """Build a request handler class serving configuration documents from `directory`"""
+    
+    class AppConfigHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            match = _PATH.match(self.path)
+            if match is None:
+                self.send_error(404, 'Unknown path')
+                return
+            path = os.path.join(directory, *match.groups()) + '.json'
+            try:
+                with open(path, 'rb') as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self.send_error(404, f'No configuration at {path}')
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+    
+    return AppConfigHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve configuration documents like the AppConfig Lambda extension')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2772)
+    parser.add_argument('--directory', default='appconfig', help='Root of <application>/<environment>/<profile>.json')
+    parser.add_argument('--quiet', action='store_true', help='Disable the access log')
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer((args.host, args.port), make_request_handler(args.directory, args.quiet))
+    print(f"Serving AppConfig documents from {args.directory}/ on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,393 @@
+"""
+Build the Lambda deployment artifacts
+
+By default produces two zips (the paths terraform/main.tf deploys):
+- lambda_layer.zip: requirements.txt dependencies as a Lambda layer (python/),
+  cached under build/layers/ by a hash of requirements.txt, the target Python
+  and platform, and only rebuilt when that hash changes
+- lambda_function.zip: the function code (src/) only
+
+With --bundle, a single lambda_function.zip holds both.
+
+In all cases:
+- dependencies are installed for the Lambda platform and target Python
+- modules the Lambda runtime already provides (boto3, botocore, ...) are excluded
+- tests, docs, type stubs and stale bytecode are stripped
+- .pyc files are precompiled (unchecked-hash, so they stay valid with the
+  normalized zip timestamps and need no stat at import time)
+- the zip is deterministic: sorted entries, fixed timestamps and permissions
+- a content hash and a per-dependency size report are printed
+
+Usage:
+    python scripts/build.py
+    python scripts/build.py --python-version 3.11 --output lambda_function.zip
+    python scripts/build.py --bundle
+"""
+import argparse
+import base64
+import hashlib
+import json
 import os
+import shutil
+import subprocess
 import sys
-import json
+import tempfile
+import zipfile
 from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Shipped with the Lambda Python runtime; bundling them only adds size and unzip time
+RUNTIME_PROVIDED = ('boto3', 'botocore', 's3transfer', 'jmespath')
+
+# Directory names that are never needed at runtime
+STRIP_DIRS = {'__pycache__', 'tests', 'test', 'testing', 'docs', 'doc', 'examples', 'benchmarks'}
+
+# File suffixes that are never needed at runtime
+STRIP_SUFFIXES = ('.pyc', '.pyo', '.pyi', '.md', '.rst', '.c', '.h', '.pxd', '.pyx')
+
+# Fixed timestamp for every zip entry (the earliest a zip can store)
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Bump when the layer build steps change, to invalidate cached layers
+LAYER_FORMAT_VERSION = 1
+
+
+def _requirements(path: Path) -> List[str]:
+    """Requirement lines, without comments and blanks"""
+    if not path.exists():
+        return []
+    lines = [line.split('#', 1)[0].strip() for line in path.read_text().splitlines()]
+    return [line for line in lines if line]
+
+
+def _requirement_name(line: str) -> str:
+    """Distribution name of a requirement line ('boto3>=1.26' -> 'boto3')"""
+    for separator in '<>=!~;[ @':
+        line = line.split(separator, 1)[0]
+    return line.strip().lower().replace('_', '-')
+
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+def bundled_requirements(requirements: Path) -> List[str]:
+    """Requirements to vendor: runtime-provided ones are dropped so their trees aren't pulled in"""
+    return [line for line in _requirements(requirements) if _requirement_name(line) not in RUNTIME_PROVIDED]
 
-from config import EnvironmentConfig
 
-def test_environments():
-    """Test different environments"""
-    environments = ['NONPROD', 'PROD', 'DEV']
+def vendor_dependencies(requirements: Path, target: Path, python_version: str, platform: str):
+    """Install requirements into target as wheels built for the Lambda platform"""
+    wanted = bundled_requirements(requirements)
+    if not wanted:
+        print("No dependencies to vendor")
+        return
     
-    for env in environments:
-        print(f"\n{'='*60}")
-        print(f"Testing {env} Environment")
-        print(f"{'='*60}")
-        
-        try:
-            # Create config for specific environment
-            env_config = EnvironmentConfig(environment=env)
-            
-            # Print debug info
-            debug_info = env_config.debug_info()
-            print(f"Environment: {debug_info['environment']}")
-            print(f"Is Lambda: {debug_info['is_lambda']}")
-            print(f"Available variables: {debug_info['available_vars']}")
-            
-            # Test getting variables
-            print(f"URL: {env_config.get('URL')}")
-            print(f"API_KEY: {env_config.get('API_KEY')}")
-            print(f"DATABASE_URL: {env_config.get('DATABASE_URL')}")
-            print(f"DEBUG: {env_config.get_bool('DEBUG')}")
-            print(f"LOG_LEVEL: {env_config.get('LOG_LEVEL')}")
-            print(f"MAX_RETRIES: {env_config.get_int('MAX_RETRIES')}")
-            print(f"TIMEOUT: {env_config.get_int('TIMEOUT')}")
-            
-        except Exception as e:
-            print(f"Error testing {env}: {e}")
-
-def test_lambda_handler():
-    """Test Lambda handler locally"""
-    print(f"\n{'='*60}")
-    print("Testing Lambda Handler")
-    print(f"{'='*60}")
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as filtered:
+        filtered.write('\n'.join(wanted) + '\n')
+    try:
+        _pip_install(Path(filtered.name), target, python_version, platform)
+    finally:
+        os.unlink(filtered.name)
+
+
+def _pip_install(requirements: Path, target: Path, python_version: str, platform: str):
+    subprocess.run(
+        [
+            sys.executable, '-m', 'pip', 'install',
+            '--requirement', str(requirements),
+            '--target', str(target),
+            '--platform', platform,
+            '--python-version', python_version,
+            '--implementation', 'cp',
+            '--only-binary', ':all:',
+            '--no-compile',
+            '--disable-pip-version-check',
+            '--quiet',
+        ],
+        check=True,
+    )
+
+
+def _distribution_top_level(dist_info: Path) -> List[str]:
+    """Top-level package and module names installed by a distribution"""
+    top_level = dist_info / 'top_level.txt'
+    if top_level.exists():
+        return [name for name in top_level.read_text().split() if name]
+    record = dist_info / 'RECORD'
+    if record.exists():
+        names = {line.split('/', 1)[0].split(',', 1)[0] for line in record.read_text().splitlines()}
+        return [name[:-3] if name.endswith('.py') else name for name in names if not name.endswith('.dist-info')]
+    return []
+
+
+def exclude_runtime_provided(target: Path):
+    """Remove packages the Lambda runtime provides, with their dist-info"""
+    for dist_info in list(target.glob('*.dist-info')):
+        dist_name = dist_info.name.split('-', 1)[0].lower().replace('_', '-')
+        if dist_name.replace('-', '_') not in RUNTIME_PROVIDED and dist_name not in RUNTIME_PROVIDED:
+            continue
+        for name in _distribution_top_level(dist_info):
+            for path in (target / name, target / f'{name}.py'):
+                if path.is_dir():
+                    shutil.rmtree(path)
+                elif path.exists():
+                    path.unlink()
+        shutil.rmtree(dist_info)
+    for name in RUNTIME_PROVIDED:
+        if (target / name).is_dir():
+            shutil.rmtree(target / name)
+
+
+def strip_tree(root: Path):
+    """Delete tests, docs, stubs, C sources, console scripts and stale bytecode"""
+    if (root / 'bin').is_dir():
+        shutil.rmtree(root / 'bin')
+    for dirpath, dirnames, filenames in os.walk(root, topdown=True):
+        # dist-info keeps its metadata; importlib.metadata may need it
+        if dirpath.endswith('.dist-info'):
+            continue
+        for dirname in [d for d in dirnames if d in STRIP_DIRS]:
+            shutil.rmtree(os.path.join(dirpath, dirname))
+            dirnames.remove(dirname)
+        for filename in filenames:
+            if filename.endswith(STRIP_SUFFIXES):
+                os.unlink(os.path.join(dirpath, filename))
+
+
+def copy_sources(source: Path, target: Path):
+    """Copy the function code (src/) into the package"""
+    shutil.copytree(
+        source,
+        target / source.name,
+        ignore=shutil.ignore_patterns('__pycache__', '*.pyc', '.env*', '*.cache'),
+    )
+
+
+def precompile(root: Path, python_version: str, install_dir: str = '/var/task') -> bool:
+    """
+    Precompile .pyc files for the target Python
     
-    # Test with different environments
-    for env in ['NONPROD', 'PROD']:
-        print(f"\n--- Testing {env} ---")
-        os.environ['ENV_NAME'] = env
-        
-        # Import main (this will reload config with new environment)
-        from main import handler
-        
-        # Mock context
-        class MockContext:
-            def __init__(self):
-                self.function_name = f'test-function-{env.lower()}'
-                self.aws_request_id = f'test-request-{env.lower()}'
-                self.memory_limit_in_mb = 128
-        
-        # Test event
-        test_event = {'httpMethod': 'GET', 'path': '/test'}
-        
-        # Call handler
-        response = handler(test_event, MockContext())
+    Bytecode is interpreter-specific, so this only runs when the build
+    interpreter matches the target version; otherwise Python compiles
+    the modules itself on each cold start.
+    """
+    running = f"{sys.version_info.major}.{sys.version_info.minor}"
+    if running != python_version:
+        print(f"Skipping .pyc precompilation: building with Python {running}, target is {python_version}")
+        return False
+    # Fresh interpreter with a fixed hash seed, and paths recorded as they will be
+    # in Lambda (install_dir), so the bytecode is identical from build to build
+    result = subprocess.run(
+        [
+            sys.executable, '-m', 'compileall', '-q',
+            '-d', install_dir,
+            '--invalidation-mode', 'unchecked-hash',
+            str(root),
+        ],
+        env=dict(os.environ, PYTHONHASHSEED='0'),
+    )
+    return result.returncode == 0
+
+
+def write_zip(root: Path, output: Path, group_prefix: str = '') -> Dict[str, Dict[str, int]]:
+    """
+    Write a deterministic zip of root and return sizes per top-level entry
+    
+    Entries are sorted with fixed timestamps and permissions, so identical
+    inputs always produce a byte-identical archive (and the same hash).
+    """
+    files = sorted(path for path in root.rglob('*') if path.is_file())
+    sizes: Dict[str, Dict[str, int]] = {}
+    
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        for path in files:
+            relative = path.relative_to(root).as_posix()
+            info = zipfile.ZipInfo(relative, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o100755 if os.access(path, os.X_OK) else 0o100644) << 16
+            info.create_system = 3  # Unix, so the permissions above apply
+            archive.writestr(info, path.read_bytes(), compresslevel=9)
+    
+    with zipfile.ZipFile(output) as archive:
+        for info in archive.infolist():
+            group = _size_group(info.filename[len(group_prefix):] if info.filename.startswith(group_prefix) else info.filename)
+            entry = sizes.setdefault(group, {'files': 0, 'size': 0, 'compressed': 0})
+            entry['files'] += 1
+            entry['size'] += info.file_size
+            entry['compressed'] += info.compress_size
+    return sizes
+
+
+def _size_group(filename: str) -> str:
+    """Attribute a zip entry to its dependency (dist-info counts towards its package)"""
+    parts = filename.split('/')
+    top = parts[0]
+    if top == '__pycache__':
+        # Bytecode of a top-level module (six.cpython-39.pyc -> six)
+        return parts[-1].split('.', 1)[0]
+    if top.endswith('.dist-info'):
+        return top.split('-', 1)[0].lower()
+    if top.endswith('.py'):
+        return top[:-3]
+    return top
+
+
+def file_hashes(output: Path) -> Dict[str, str]:
+    """SHA-256 of the artifact, as hex and in Terraform's filebase64sha256 format"""
+    digest = hashlib.sha256(output.read_bytes()).digest()
+    return {'sha256': digest.hex(), 'base64sha256': base64.b64encode(digest).decode('ascii')}
+
+
+def print_size_report(sizes: Dict[str, Dict[str, int]], output: Path):
+    """Print artifact size per dependency, largest first"""
+    total = sum(entry['compressed'] for entry in sizes.values())
+    print(f"\n{'dependency':<30} {'files':>6} {'unzipped':>12} {'zipped':>12} {'share':>7}")
+    for name, entry in sorted(sizes.items(), key=lambda item: item[1]['compressed'], reverse=True):
+        share = entry['compressed'] / total if total else 0
+        print(f"{name:<30} {entry['files']:>6} {entry['size']:>12,} {entry['compressed']:>12,} {share:>7.1%}")
+    print(f"\n{output.name}: {output.stat().st_size:,} bytes "
+          f"({sum(entry['size'] for entry in sizes.values()):,} unzipped)")
+
+
+def _fresh_dir(path: Path) -> Path:
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+    return path
+
+
+def _manifest(output: Path, python_version: str, platform: str, compiled: bool, sizes: Dict, **extra) -> Dict:
+    """Artifact manifest: hashes, size and per-dependency breakdown"""
+    return {
+        'artifact': output.name,
+        'python_version': python_version,
+        'platform': platform,
+        'precompiled': bool(compiled),
+        'size': output.stat().st_size,
+        **file_hashes(output),
+        **extra,
+        'dependencies': sizes,
+    }
+
+
+def _write_manifest(manifest: Dict, output: Path):
+    """Write the manifest next to the artifact, for CI size/hash tracking"""
+    with open(f"{output}.json", 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def layer_key(requirements: Path, python_version: str, platform: str) -> str:
+    """Hash identifying a dependency layer: requirements, target Python and platform"""
+    digest = hashlib.sha256()
+    digest.update(f"{LAYER_FORMAT_VERSION}\n{python_version}\n{platform}\n".encode())
+    digest.update('\n'.join(bundled_requirements(requirements)).encode())
+    return digest.hexdigest()[:16]
+
+
+def build_layer(
+    output: Path,
+    build_dir: Path,
+    python_version: str,
+    platform: str,
+    requirements: Path,
+    compile_bytecode: bool = True,
+) -> Optional[Dict]:
+    """
+    Build (or reuse) the dependency layer and return its manifest
+    
+    Layers are cached in build/layers/<key>.zip. While requirements.txt is
+    unchanged, the cached zip is copied byte for byte, so its hash (and the
+    deployed layer version) stays the same. Returns None, and removes a stale
+    layer zip, when there is nothing to bundle.
+    """
+    if not bundled_requirements(requirements):
+        print("No dependencies to bundle; skipping the layer")
+        for stale in (output, Path(f"{output}.json")):
+            if stale.exists():
+                stale.unlink()
+        return None
+    
+    key = layer_key(requirements, python_version, platform)
+    cached = build_dir / 'layers' / f'{key}.zip'
+    
+    if cached.exists():
+        print(f"Dependencies unchanged (layer {key}); reusing {cached}")
+        with open(f"{cached}.json") as f:
+            manifest = json.load(f)
+    else:
+        print(f"Building dependency layer {key}")
+        layer_dir = _fresh_dir(build_dir / 'layer')
+        python_dir = layer_dir / 'python'
+        python_dir.mkdir()
+        vendor_dependencies(requirements, python_dir, python_version, platform)
+        exclude_runtime_provided(python_dir)
+        strip_tree(python_dir)
+        # Layers are extracted to /opt; python/ is on sys.path there
+        compiled = compile_bytecode and precompile(python_dir, python_version, '/opt/python')
         
-        print("Response:")
-        print(json.dumps(response, indent=2))
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        sizes = write_zip(layer_dir, cached, group_prefix='python/')
+        manifest = _manifest(cached, python_version, platform, compiled, sizes, layer_key=key)
+        _write_manifest(manifest, cached)
+        print_size_report(sizes, cached)
+    
+    shutil.copyfile(cached, output)
+    manifest = dict(manifest, artifact=output.name)
+    _write_manifest(manifest, output)
+    print(f"{output.name} sha256: {manifest['sha256']}")
+    return manifest
+
+
+def build_function(
+    output: Path,
+    build_dir: Path,
+    python_version: str,
+    platform: str,
+    requirements: Path,
+    compile_bytecode: bool = True,
+    bundle_dependencies: bool = False,
+) -> Dict:
+    """Build the function artifact (src/, plus dependencies if bundled) and return its manifest"""
+    package_dir = _fresh_dir(build_dir / 'package')
+    
+    if bundle_dependencies:
+        vendor_dependencies(requirements, package_dir, python_version, platform)
+        exclude_runtime_provided(package_dir)
+        strip_tree(package_dir)
+    copy_sources(PROJECT_ROOT / 'src', package_dir)
+    compiled = compile_bytecode and precompile(package_dir, python_version)
+    
+    sizes = write_zip(package_dir, output)
+    manifest = _manifest(output, python_version, platform, compiled, sizes)
+    _write_manifest(manifest, output)
+    print_size_report(sizes, output)
+    print(f"{output.name} sha256: {manifest['sha256']}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the Lambda deployment artifacts')
+    parser.add_argument('--output', default=str(PROJECT_ROOT / 'lambda_function.zip'))
+    parser.add_argument('--layer-output', default=str(PROJECT_ROOT / 'lambda_layer.zip'))
+    parser.add_argument('--build-dir', default=str(PROJECT_ROOT / 'build'))
+    parser.add_argument('--requirements', default=str(PROJECT_ROOT / 'requirements.txt'))
+    parser.add_argument('--python-version', default='3.9', help='Target Lambda Python version')
+    parser.add_argument('--platform', default='manylinux2014_x86_64',
+                        help='Wheel platform (manylinux2014_aarch64 for arm64)')
+    parser.add_argument('--no-compile', action='store_true', help='Skip .pyc precompilation')
+    parser.add_argument('--bundle', action='store_true',
+                        help='Bundle dependencies into the function zip instead of a layer')
+    args = parser.parse_args()
+    
+    build_dir = Path(args.build_dir)
+    requirements = Path(args.requirements)
+    compile_bytecode = not args.no_compile
+    
+    if not args.bundle:
+        build_layer(Path(args.layer_output), build_dir, args.python_version, args.platform,
+                    requirements, compile_bytecode)
+    build_function(Path(args.output), build_dir, args.python_version, args.platform,
+                   requirements, compile_bytecode, bundle_dependencies=args.bundle)
+
 
 if __name__ == "__main__":
-    test_environments()
-    test_lambda_handler()
+    main()
@@ -0,0 +1,106 @@
+"""
+Resolve the configuration schema for every environment in one pass
+
+Loads .env once, scans os.environ once and reports, per environment, missing
+required keys and values that do not coerce to their declared type. Exits 1
+when any environment is invalid, so it can gate CI and deploys.
+
+Usage:
+    python scripts/config_matrix.py
+    python scripts/config_matrix.py --env NONPROD,PROD --all
+    python scripts/config_matrix.py --diff NONPROD PROD
+    python scripts/config_matrix.py --json matrix.json --skip-secrets
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import ConfigMatrix, resolve_matrix
+from src.schema import CONFIG_SCHEMA, SECRET_FIELDS
+
+
+def _cell(value) -> str:
+    return '-' if value is None else str(value)
+
+
+def print_table(matrix: ConfigMatrix, keys: List[str]):
+    """Keys as rows, environments as columns"""
+    rows = [['KEY'] + matrix.environments]
+    for key in keys:
+        rows.append([key] + [_cell(matrix.value(env, key)) for env in matrix.environments])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def print_errors(matrix: ConfigMatrix):
+    for environment in matrix.environments:
+        status = 'ok' if not matrix.errors[environment] else f"{len(matrix.errors[environment])} error(s)"
+        print(f"{environment}: {status}")
+        for error in matrix.errors[environment]:
+            print(f"  - {error}")
+
+
+def print_diff(matrix: ConfigMatrix, left: str, right: str):
+    differences = matrix.diff(left, right)
+    if not differences:
+        print(f"{left} and {right} resolve to the same configuration")
+        return
+    width = max(len(key) for key in differences)
+    print(f"{'KEY'.ljust(width)}  {left} -> {right}")
+    for key, (a, b) in differences.items():
+        print(f"{key.ljust(width)}  {_cell(a)} -> {_cell(b)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate and compare configuration across environments')
+    parser.add_argument('--env', help='Comma-separated environments '
+                        '(default: ENVIRONMENTS, else every .env prefix setting a declared key)')
+    parser.add_argument('--diff', nargs=2, metavar=('LEFT', 'RIGHT'), help='Show keys that differ between two environments')
+    parser.add_argument('--all', action='store_true', help='Show every key, not only those that vary')
+    parser.add_argument('--skip-secrets', action='store_true',
+                        help='Do not require API_KEY/DATABASE_URL (environments using an external secrets store)')
+    parser.add_argument('--json', metavar='PATH', help='Also write the matrix (secrets masked) as JSON')
+    args = parser.parse_args()
+    
+    schema = CONFIG_SCHEMA if args.skip_secrets else CONFIG_SCHEMA + SECRET_FIELDS
+    environments = args.env.split(',') if args.env else []
+    if args.diff:
+        listed = {name.upper() for name in environments}
+        environments += [name for name in args.diff if name.upper() not in listed]
+    
+    started = time.perf_counter()
+    matrix = resolve_matrix(schema, environments or None)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    if not matrix.environments:
+        print("No environments found: pass --env, set ENVIRONMENTS or add PREFIX_<KEY> entries to .env")
+        sys.exit(1)
+    
+    if args.diff:
+        print_diff(matrix, *(name.upper() for name in args.diff))
+    else:
+        keys = [field.name for field in schema] if args.all else matrix.varying_keys()
+        if keys:
+            print_table(matrix, keys)
+        else:
+            print("All environments resolve to the same values")
+    print()
+    print_errors(matrix)
+    print(f"\nResolved {len(schema)} keys for {len(matrix.environments)} environment(s) in {elapsed_ms:.1f} ms")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(matrix.as_dict(), f, indent=2, default=str)
+    
+    sys.exit(0 if matrix.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Startup import-cost report for the Lambda package
+
+Runs `python -X importtime -c "import src.main"` in a fresh interpreter and
+summarizes the per-module cost. Results can be written as JSON and compared
+against a previous release to track import cost over time.
+
+Usage:
+    python scripts/importtime_report.py
+    python scripts/importtime_report.py --lambda --output importtime.json
+    python scripts/importtime_report.py --baseline importtime.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def measure_imports(module: str = 'src.main', simulate_lambda: bool = False) -> List[Dict]:
+    """Import a module in a fresh interpreter and parse -X importtime output"""
+    env = dict(os.environ)
+    if simulate_lambda:
+        # Exercise the cold start path the Lambda runtime takes
+        env.setdefault('AWS_LAMBDA_FUNCTION_NAME', 'importtime-report')
+    
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=str(PROJECT_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(f"Importing {module} failed:\n" + '\n'.join(errors))
+    
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+        })
+    return modules
+
+
+def build_report(modules: List[Dict]) -> Dict:
+    """Summarize import cost: total, and every module by cumulative time"""
+    return {
+        'total_us': sum(m['cumulative_us'] for m in modules if m['depth'] == 0),
+        'module_count': len(modules),
+        'modules': {m['module']: m['cumulative_us'] for m in modules},
+    }
+
+
+def print_report(report: Dict, baseline: Dict = None, limit: int = 20):
+    """Print the slowest imports, with deltas against a baseline"""
+    print(f"Total import time: {report['total_us'] / 1000:.1f} ms "
+          f"({report['module_count']} modules)")
+    if baseline:
+        delta = report['total_us'] - baseline['total_us']
+        print(f"Baseline: {baseline['total_us'] / 1000:.1f} ms (delta {delta / 1000:+.1f} ms)")
+    
+    print(f"\n{'cumulative [ms]':>16}  {'delta [ms]':>11}  module")
+    slowest = sorted(report['modules'].items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative_us in slowest[:limit]:
+        delta = ''
+        if baseline:
+            delta = f"{(cumulative_us - baseline['modules'].get(name, 0)) / 1000:+.2f}"
+        print(f"{cumulative_us / 1000:>16.2f}  {delta:>11}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report import cost of the Lambda package')
+    parser.add_argument('--module', default='src.main', help='Module to import')
+    parser.add_argument('--lambda', dest='simulate_lambda', action='store_true',
+                        help='Simulate the Lambda runtime (skips .env loading)')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against a previously written JSON report')
+    parser.add_argument('--limit', type=int, default=20, help='Number of modules to show')
+    args = parser.parse_args()
+    
+    report = build_report(measure_imports(args.module, args.simulate_lambda))
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    
+    print_report(report, baseline, args.limit)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
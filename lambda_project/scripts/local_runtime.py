@@ -0,0 +1,445 @@
+"""
+Local Lambda runtime emulator for load testing
+
+Serves HTTP on localhost, converts each request into an API Gateway proxy
+event and dispatches it to `src.main.handler` in a pool of worker processes.
+Each worker is an execution environment: it pays the cold start (importing
+`src.main`) on its first invocation and is warm afterwards. Workers can be
+recycled after N invocations to simulate environments being replaced.
+
+With --stream, `src.main.stream_handler` is invoked instead and its response
+stream is relayed to the client as it is written (chunked transfer encoding),
+like a function URL with InvokeMode RESPONSE_STREAM. Chunks cross from the
+worker through a bounded queue, so a slow client holds the handler back.
+
+Usage:
+    python scripts/local_runtime.py --workers 4
+    python scripts/local_runtime.py --workers 4 --recycle-after 100 --env PROD
+    python scripts/local_runtime.py --stream
+    curl -N 'http://127.0.0.1:3000/export?rows=1000000'
+"""
+import argparse
+import base64
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from queue import Empty, Full
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.streaming import PRELUDE_SEPARATOR
+
+# Chunks in flight between a streaming worker and the HTTP connection
+STREAM_QUEUE_CHUNKS = 8
+
+# ProcessPoolExecutor(max_tasks_per_child=...) is Python 3.11+; older
+# interpreters (the 3.9 Lambda runtime) replace the whole pool instead
+PER_WORKER_RECYCLING = sys.version_info >= (3, 11)
+
+
+class LambdaContext:
+    """Context object with the attributes and methods the Lambda runtime provides"""
+
+    def __init__(
+        self,
+        function_name: str = 'local-test',
+        memory_limit_in_mb: int = 128,
+        timeout: float = 30,
+        aws_request_id: Optional[str] = None,
+    ):
+        self.function_name = function_name
+        self.function_version = '$LATEST'
+        self.invoked_function_arn = f'arn:aws:lambda:us-east-1:123456789012:function:{function_name}'
+        self.memory_limit_in_mb = memory_limit_in_mb
+        self.aws_request_id = aws_request_id or str(uuid.uuid4())
+        self.log_group_name = f'/aws/lambda/{function_name}'
+        self.log_stream_name = f'local/{os.getpid()}'
+        self._deadline = time.monotonic() + timeout
+    
+    def get_remaining_time_in_millis(self) -> int:
+        """Milliseconds left before the invocation times out"""
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def api_gateway_event(
+    method: str = 'GET',
+    path: str = '/',
+    query: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[str] = None,
+    is_base64: bool = False,
+) -> Dict:
+    """Build an API Gateway (REST, proxy integration) event"""
+    headers = headers or {}
+    return {
+        'resource': '/{proxy+}',
+        'path': path,
+        'httpMethod': method,
+        'headers': headers,
+        'multiValueHeaders': {key: [value] for key, value in headers.items()},
+        'queryStringParameters': query or None,
+        'multiValueQueryStringParameters': {key: [value] for key, value in query.items()} if query else None,
+        'pathParameters': {'proxy': path.lstrip('/')},
+        'stageVariables': None,
+        'requestContext': {
+            'requestId': str(uuid.uuid4()),
+            'stage': 'local',
+            'httpMethod': method,
+            'path': path,
+            'requestTimeEpoch': int(time.time() * 1000),
+            'identity': {'sourceIp': '127.0.0.1'},
+        },
+        'body': body,
+        'isBase64Encoded': is_base64,
+    }
+
+
+# Per-worker state: the handler is imported on the first invocation (cold start)
+_handler = None
+_invocations = 0
+
+
+def _load_handler(handler_path: str) -> Tuple[bool, float]:
+    """Import the handler on the worker's first invocation: (cold start, init ms)"""
+    global _handler
+    started = time.perf_counter()
+    cold_start = _handler is None
+    if cold_start:
+        module_name, function_name = handler_path.rsplit('.', 1)
+        _handler = getattr(importlib.import_module(module_name), function_name)
+    return cold_start, (time.perf_counter() - started) * 1000
+
+
+def invoke(
+    event: Dict,
+    handler_path: str = 'src.main.handler',
+    timeout: float = 30,
+    memory_limit_in_mb: int = 128,
+) -> Dict:
+    """Invoke the handler inside a worker process, loading it on first use"""
+    global _invocations
+    cold_start, init_ms = _load_handler(handler_path)
+    
+    context = LambdaContext(memory_limit_in_mb=memory_limit_in_mb, timeout=timeout)
+    invoke_started = time.perf_counter()
+    try:
+        response = _handler(event, context)
+        error = None
+    except Exception as e:
+        response = None
+        error = f"{type(e).__name__}: {e}"
+    _invocations += 1
+    
+    return {
+        'response': response,
+        'error': error,
+        'cold_start': cold_start,
+        'init_ms': init_ms,
+        'duration_ms': (time.perf_counter() - invoke_started) * 1000,
+        'worker_pid': os.getpid(),
+        'invocation': _invocations,
+        'request_id': context.aws_request_id,
+    }
+
+
+class QueueStream:
+    """A worker's response stream: each write is handed to the HTTP side through a bounded queue"""
+
+    def __init__(self, queue, timeout: float):
+        self.queue = queue
+        self.timeout = timeout
+    
+    def write(self, data: bytes):
+        # Blocks while the queue is full, i.e. until the client has caught up; a client
+        # that stopped reading fails the write (queue.Full) once the timeout has passed
+        self.queue.put(('data', bytes(data)), timeout=self.timeout)
+
+
+def invoke_streaming(
+    event: Dict,
+    queue,
+    handler_path: str = 'src.main.stream_handler',
+    timeout: float = 30,
+    memory_limit_in_mb: int = 128,
+) -> Dict:
+    """
+    Invoke a streaming handler (event, context, response_stream) inside a worker process
+    
+    Puts ('start', {cold_start, init_ms}), then ('data', bytes) per write,
+    then ('end', {error, duration_ms}) on the queue.
+    """
+    global _invocations
+    cold_start, init_ms = _load_handler(handler_path)
+    queue.put(('start', {'cold_start': cold_start, 'init_ms': init_ms}))
+    
+    context = LambdaContext(memory_limit_in_mb=memory_limit_in_mb, timeout=timeout)
+    invoke_started = time.perf_counter()
+    error = None
+    try:
+        _handler(event, context, QueueStream(queue, timeout))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        _invocations += 1
+        result = {
+            'response': None,
+            'error': error,
+            'cold_start': cold_start,
+            'init_ms': init_ms,
+            'duration_ms': (time.perf_counter() - invoke_started) * 1000,
+            'worker_pid': os.getpid(),
+            'invocation': _invocations,
+            'request_id': context.aws_request_id,
+        }
+        try:
+            queue.put(('end', result), timeout=timeout)
+        except Full:
+            pass
+    return result
+
+
+class LocalRuntime:
+    """Pool of worker processes, each emulating one Lambda execution environment"""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        recycle_after: Optional[int] = None,
+        handler_path: str = 'src.main.handler',
+        timeout: float = 30,
+        memory_limit_in_mb: int = 128,
+        streaming: bool = False,
+    ):
+        """
+        Args:
+            workers: Concurrent execution environments
+            recycle_after: Replace a worker after this many invocations (forces cold starts).
+                Before Python 3.11 the whole pool is replaced after
+                workers * recycle_after invocations instead
+            handler_path: Dotted path of the handler function
+            timeout: Invocation timeout in seconds
+            memory_limit_in_mb: Value reported by context.memory_limit_in_mb
+            streaming: The handler takes a response stream (see invoke_streaming)
+        """
+        self.handler_path = handler_path
+        self.timeout = timeout
+        self.memory_limit_in_mb = memory_limit_in_mb
+        self.streaming = streaming
+        self.workers = workers
+        self.recycle_after = recycle_after
+        # spawn gives every worker a fresh interpreter, so first imports are real cold starts
+        self.context = multiprocessing.get_context('spawn')
+        self.pool = self._new_pool()
+        self._submitted = 0
+        self._lock = threading.Lock()
+        # Queues that can be handed to pool workers are served by a manager process
+        self.manager = self.context.Manager() if streaming else None
+    
+    def _new_pool(self) -> ProcessPoolExecutor:
+        options = {}
+        if self.recycle_after and PER_WORKER_RECYCLING:
+            options['max_tasks_per_child'] = self.recycle_after
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self.context, **options)
+    
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self.recycle_after and not PER_WORKER_RECYCLING:
+                if self._submitted >= self.workers * self.recycle_after:
+                    retired, self.pool = self.pool, self._new_pool()
+                    self._submitted = 0
+                    # Invocations already queued still run; its workers exit afterwards
+                    retired.shutdown(wait=False)
+                self._submitted += 1
+            return self.pool.submit(fn, *args)
+    
+    def submit(self, event: Dict):
+        """Dispatch an event to the next free worker; returns a Future"""
+        return self._submit(invoke, event, self.handler_path, self.timeout, self.memory_limit_in_mb)
+    
+    def submit_streaming(self, event: Dict):
+        """Dispatch an event to the streaming handler; returns (future, queue of stream messages)"""
+        queue = self.manager.Queue(STREAM_QUEUE_CHUNKS)
+        future = self._submit(
+            invoke_streaming, event, queue, self.handler_path, self.timeout, self.memory_limit_in_mb,
+        )
+        return future, queue
+    
+    def invoke(self, event: Dict) -> Dict:
+        """Invoke synchronously, reporting a timeout like Lambda would"""
+        future = self.submit(event)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            return {
+                'response': None,
+                'error': f"Task timed out after {self.timeout:.2f} seconds",
+                'cold_start': False,
+                'duration_ms': self.timeout * 1000,
+            }
+    
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        if self.manager is not None:
+            self.manager.shutdown()
+
+
+def make_request_handler(runtime: LocalRuntime, quiet: bool = False):
+    """Build an HTTP request handler class bound to a runtime"""
+    
+    class ProxyHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def _dispatch(self):
+            url = urlsplit(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            raw_body = self.rfile.read(length) if length else b''
+            try:
+                body, is_base64 = raw_body.decode('utf-8'), False
+            except UnicodeDecodeError:
+                body, is_base64 = base64.b64encode(raw_body).decode('ascii'), True
+            
+            event = api_gateway_event(
+                method=self.command,
+                path=url.path,
+                query={key: values[-1] for key, values in parse_qs(url.query).items()},
+                headers=dict(self.headers.items()),
+                body=body or None,
+                is_base64=is_base64,
+            )
+            if runtime.streaming:
+                self._stream(event)
+            else:
+                self._respond(runtime.invoke(event))
+        
+        def _stream(self, event: Dict):
+            """Relay a streaming invocation: prelude as status and headers, then each write as a chunk"""
+            future, queue = runtime.submit_streaming(event)
+            deadline = time.monotonic() + runtime.timeout
+            start = {}
+            pending = b''
+            headers_sent = False
+            while True:
+                try:
+                    kind, value = queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except Empty:
+                    future.cancel()
+                    if headers_sent:
+                        # Too late for an error status; cut the response short
+                        self.close_connection = True
+                        return
+                    self._respond({'error': f"Task timed out after {runtime.timeout:.2f} seconds", 'cold_start': False})
+                    return
+                if kind == 'start':
+                    start = value
+                    continue
+                if kind == 'end':
+                    break
+                if not headers_sent:
+                    pending += value
+                    prelude, separator, value = pending.partition(PRELUDE_SEPARATOR)
+                    if not separator:
+                        continue
+                    self._send_prelude(json.loads(prelude), start)
+                    headers_sent = True
+                if value:
+                    self._write_chunk(value)
+            
+            if headers_sent:
+                self._write_chunk(b'')
+            else:
+                # Failed (or wrote nothing) before the prelude: report it like a buffered invocation
+                value['error'] = value.get('error') or 'Handler returned without writing a response'
+                self._respond(value)
+        
+        def _send_prelude(self, prelude: Dict, start: Dict):
+            self.send_response(prelude.get('statusCode', 200))
+            for key, value in (prelude.get('headers') or {}).items():
+                self.send_header(key, str(value))
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('X-Lambda-Cold-Start', str(start.get('cold_start', False)).lower())
+            if start.get('cold_start'):
+                self.send_header('X-Lambda-Init-Ms', f"{start.get('init_ms', 0):.3f}")
+            self.end_headers()
+        
+        def _write_chunk(self, data: bytes):
+            self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+        
+        def _respond(self, result: Dict):
+            response = result.get('response')
+            if result.get('error') or not isinstance(response, dict):
+                status = 504 if 'timed out' in (result.get('error') or '') else 502
+                headers = {'Content-Type': 'application/json'}
+                payload = json.dumps({'message': 'Internal server error', 'error': result.get('error')}).encode()
+            else:
+                status = response.get('statusCode', 200)
+                headers = dict(response.get('headers') or {})
+                body = response.get('body') or ''
+                payload = base64.b64decode(body) if response.get('isBase64Encoded') else body.encode('utf-8')
+            
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, str(value))
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('X-Lambda-Cold-Start', str(result.get('cold_start', False)).lower())
+            self.send_header('X-Lambda-Duration-Ms', f"{result.get('duration_ms', 0):.3f}")
+            if result.get('cold_start'):
+                self.send_header('X-Lambda-Init-Ms', f"{result.get('init_ms', 0):.3f}")
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _dispatch
+        
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+    
+    return ProxyHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Lambda handler behind a local API Gateway emulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--workers', type=int, default=1, help='Concurrent execution environments')
+    parser.add_argument('--recycle-after', type=int, help='Recycle each worker after N invocations')
+    parser.add_argument('--env', help='Environment name (sets ENV_NAME)')
+    parser.add_argument('--handler', default='src.main.handler', help='Dotted handler path')
+    parser.add_argument('--timeout', type=float, default=30, help='Invocation timeout in seconds')
+    parser.add_argument('--memory', type=int, default=128, help='Reported memory limit in MB')
+    parser.add_argument('--stream', action='store_true',
+                        help='Invoke src.main.stream_handler and stream responses as they are written')
+    parser.add_argument('--quiet', action='store_true', help='Disable the access log')
+    args = parser.parse_args()
+    if args.stream and args.handler == 'src.main.handler':
+        args.handler = 'src.main.stream_handler'
+    
+    if args.env:
+        # Workers are spawned after this, so they inherit it
+        os.environ['ENV_NAME'] = args.env
+    
+    runtime = LocalRuntime(args.workers, args.recycle_after, args.handler, args.timeout, args.memory, args.stream)
+    server = ThreadingHTTPServer((args.host, args.port), make_request_handler(runtime, args.quiet))
+    print(f"Serving {args.handler} on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        runtime.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Local smoke run: every environment's configuration, then the handler per environment
+
+Not a pytest module (tests live in tests/); run it directly or through
+`make test`. The handler resolves its configuration once per process, at
+import, so each environment's invocation runs in its own interpreter.
+
+Usage:
+    python scripts/local_smoke.py
+    python scripts/local_smoke.py --env NONPROD
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add project root to path (src is imported as a package, like in Lambda)
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import resolve_matrix
+from src.schema import CONFIG_SCHEMA, SECRET_FIELDS
+
+ENVIRONMENTS = ['NONPROD', 'PROD', 'DEV']
+HANDLER_ENVIRONMENTS = ['NONPROD', 'PROD']
+
+def check_environments(environments):
+    """Show each environment's configuration (resolved together in one pass)"""
+    matrix = resolve_matrix(CONFIG_SCHEMA + SECRET_FIELDS, environments)
+    
+    for env in matrix.environments:
+        print(f"\n{'='*60}")
+        print(f"Testing {env} Environment")
+        print(f"{'='*60}")
+        
+        for key in ('URL', 'API_KEY', 'DATABASE_URL', 'DEBUG', 'LOG_LEVEL', 'MAX_RETRIES', 'TIMEOUT'):
+            print(f"{key}: {matrix.value(env, key)}")
+        for error in matrix.errors[env]:
+            print(f"Error: {error}")
+    
+    if 'NONPROD' in matrix.environments and 'PROD' in matrix.environments:
+        print(f"\nNONPROD vs PROD: {matrix.diff('NONPROD', 'PROD')}")
+
+def invoke_handler(env):
+    """Invoke the handler once in this process, configured for `env` (set before the first import)"""
+    os.environ['ENV_NAME'] = env
+    sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+    from local_runtime import LambdaContext, api_gateway_event
+    from src.main import handler
+    
+    response = handler(api_gateway_event('GET', '/test'), LambdaContext(function_name=f'test-function-{env.lower()}'))
+    print("Response:")
+    print(json.dumps(response, indent=2))
+    return response
+
+def check_handler(environments):
+    """Invoke the handler for each environment, each in a fresh interpreter; returns the failures"""
+    print(f"\n{'='*60}")
+    print("Testing Lambda Handler")
+    print(f"{'='*60}")
+    
+    failed = []
+    for env in environments:
+        print(f"\n--- Testing {env} ---", flush=True)
+        result = subprocess.run(
+            [sys.executable, __file__, '--invoke', env], cwd=str(PROJECT_ROOT), env=dict(os.environ, ENV_NAME=env),
+        )
+        if result.returncode != 0:
+            failed.append(env)
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Check configuration and invoke the handler per environment')
+    parser.add_argument('--env', help='Comma-separated environments (default: NONPROD,PROD,DEV; handler: NONPROD,PROD)')
+    parser.add_argument('--invoke', metavar='ENV', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.invoke:
+        response = invoke_handler(args.invoke)
+        sys.exit(0 if response.get('statusCode') == 200 else 1)
+    
+    environments = [name.strip().upper() for name in args.env.split(',')] if args.env else None
+    check_environments(environments or ENVIRONMENTS)
+    failed = check_handler(environments or HANDLER_ENVIRONMENTS)
+    if failed:
+        print(f"\nHandler failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Memory report and leak check for the Lambda package
+
+Imports the handler the way the Lambda runtime does, with tracemalloc
+recording from the first import, and breaks memory down at cold start and
+after N invocations:
+
+- resident memory (RSS) against the function's memory_limit_in_mb
+- Python allocations by module/package (which import holds the memory)
+- live objects by type (gc)
+
+The leak check runs warm-up invocations, then N more, and flags allocation
+growth per invocation above a threshold; it exits 1 on a suspected leak so
+it can gate CI.
+
+Usage:
+    python scripts/memory_report.py
+    python scripts/memory_report.py --invocations 500 --memory 128 --output memory.json
+    python scripts/memory_report.py --leak-check --threshold 512
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+# Frames kept per allocation: enough to see past importlib to the import statement
+TRACEMALLOC_FRAMES = 16
+
+# The report's own bookkeeping is not the handler's memory
+_EXCLUDED = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+)
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident memory of this process in MB (None where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def _module_of(filename: str) -> str:
+    """Group a source file by top-level package, or by src.<module> for the project's own code"""
+    path = Path(filename)
+    try:
+        relative = path.relative_to(PROJECT_ROOT)
+    except ValueError:
+        relative = None
+    if relative is not None:
+        return '.'.join(relative.with_suffix('').parts)
+    
+    for entry in sorted((p for p in sys.path if p), key=len, reverse=True):
+        try:
+            relative = path.relative_to(entry)
+        except ValueError:
+            continue
+        top = relative.parts[0]
+        return top[:-3] if top.endswith('.py') else top
+    return filename
+
+
+def _owner(traceback: tracemalloc.Traceback, root: str) -> str:
+    """
+    Module an allocation is charged to: its most recent frame outside importlib
+    
+    Code objects built while importing are charged to the module whose
+    import statement pulled them in; those of the handler module itself
+    (imported by this script) to `root`.
+    """
+    for frame in traceback:
+        if frame.filename == __file__:
+            return root
+        if not frame.filename.startswith('<frozen importlib'):
+            return _module_of(frame.filename)
+    return _module_of(traceback[0].filename)
+
+
+def allocations_by_module(snapshot: tracemalloc.Snapshot, root: str) -> Dict[str, int]:
+    """Bytes currently allocated, summed per module/package"""
+    sizes: Counter = Counter()
+    for stat in snapshot.statistics('traceback'):
+        sizes[_owner(stat.traceback, root)] += stat.size
+    return dict(sizes.most_common())
+
+
+def objects_by_type() -> Dict[str, Dict[str, int]]:
+    """Count and shallow size of live gc-tracked objects, per type"""
+    counts: Counter = Counter()
+    sizes: Counter = Counter()
+    for obj in gc.get_objects():
+        if type(obj).__module__ == 'tracemalloc':
+            continue
+        name = type(obj).__qualname__
+        counts[name] += 1
+        sizes[name] += sys.getsizeof(obj, 0)
+    return {name: {'count': counts[name], 'bytes': sizes[name]} for name, _ in sizes.most_common()}
+
+
+def measure(label: str, invocations: int) -> Dict:
+    """
+    Collect garbage and take one measurement of the whole process
+    
+    Only raw data is taken here; see attribute() for the per-module
+    breakdown, which is computed after the last snapshot.
+    """
+    gc.collect()
+    types = objects_by_type()
+    snapshot = tracemalloc.take_snapshot().filter_traces(_EXCLUDED)
+    return {
+        'label': label,
+        'invocations': invocations,
+        'rss_mb': rss_mb(),
+        'traced_bytes': sum(stat.size for stat in snapshot.statistics('filename')),
+        'traced_peak_bytes': tracemalloc.get_traced_memory()[1],
+        'types': types,
+        '_snapshot': snapshot,
+    }
+
+
+def attribute(measurement: Dict, root: str):
+    """
+    Add the per-module breakdown to a measurement
+    
+    Called once every snapshot is taken: resolving paths interns strings
+    (pathlib), which would otherwise show up as growth between snapshots.
+    """
+    measurement['modules'] = allocations_by_module(measurement['_snapshot'], root)
+
+
+def load_handler(handler_path: str) -> Callable:
+    """Import the handler (the cold start) with tracemalloc already recording"""
+    import importlib
+    
+    module_name, function_name = handler_path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def run_invocations(handler: Callable, count: int, memory_limit_in_mb: int, path: str):
+    """Invoke the handler `count` times with an API Gateway event"""
+    from local_runtime import LambdaContext, api_gateway_event
+    
+    for _ in range(count):
+        handler(api_gateway_event('GET', path), LambdaContext(memory_limit_in_mb=memory_limit_in_mb))
+
+
+def leak_check(before: Dict, after: Dict, invocations: int, threshold: int, limit: int) -> Dict:
+    """
+    Compare two measurements taken `invocations` apart
+    
+    Returns:
+        Growth per invocation in total and by source line, and whether the
+        total exceeds `threshold` bytes per invocation
+    """
+    growth = after['traced_bytes'] - before['traced_bytes']
+    per_invocation = growth / invocations if invocations else 0.0
+    top = []
+    for stat in after['_snapshot'].compare_to(before['_snapshot'], 'lineno')[:limit]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        top.append({
+            'location': f"{frame.filename}:{frame.lineno}",
+            'bytes': stat.size_diff,
+            'blocks': stat.count_diff,
+        })
+    types = []
+    for name, entry in after['types'].items():
+        diff = entry['count'] - before['types'].get(name, {}).get('count', 0)
+        if diff > 0:
+            types.append({'type': name, 'count': diff})
+    types.sort(key=lambda item: item['count'], reverse=True)
+    return {
+        'invocations': invocations,
+        'growth_bytes': growth,
+        'bytes_per_invocation': round(per_invocation, 1),
+        'threshold_bytes': threshold,
+        'leak_suspected': per_invocation > threshold,
+        'top_growth': top,
+        'type_growth': types[:limit],
+    }
+
+
+def _mb(value: Optional[float]) -> str:
+    return 'n/a' if value is None else f"{value:.1f} MB"
+
+
+def print_measurement(measurement: Dict, memory_limit_in_mb: int, limit: int):
+    """Print RSS against the memory limit, then the largest modules and types"""
+    rss = measurement['rss_mb']
+    share = f" ({rss / memory_limit_in_mb:.0%} of {memory_limit_in_mb} MB)" if rss is not None else ''
+    print(f"== {measurement['label']} (after {measurement['invocations']} invocation(s))")
+    print(f"RSS {_mb(rss)}{share}, Python allocations {measurement['traced_bytes'] / 1024:.0f} KiB "
+          f"(peak {measurement['traced_peak_bytes'] / 1024:.0f} KiB)")
+    
+    print(f"\n{'allocated [KiB]':>16}  module")
+    for name, size in list(measurement['modules'].items())[:limit]:
+        print(f"{size / 1024:>16.1f}  {name}")
+    
+    print(f"\n{'objects':>10}  {'shallow [KiB]':>14}  type")
+    for name, entry in list(measurement['types'].items())[:limit]:
+        print(f"{entry['count']:>10}  {entry['bytes'] / 1024:>14.1f}  {name}")
+    print()
+
+
+def print_leak_check(result: Dict):
+    status = 'LEAK SUSPECTED' if result['leak_suspected'] else 'ok'
+    print(f"== Leak check: {status}")
+    print(f"{result['growth_bytes'] / 1024:+.1f} KiB over {result['invocations']} invocations, "
+          f"{result['bytes_per_invocation']:+.1f} bytes/invocation (threshold {result['threshold_bytes']})")
+    if result['top_growth']:
+        print(f"\n{'growth [B]':>12}  {'blocks':>7}  location")
+        for entry in result['top_growth']:
+            print(f"{entry['bytes']:>12}  {entry['blocks']:>7}  {entry['location']}")
+    if result['type_growth']:
+        print(f"\n{'new objects':>12}  type")
+        for entry in result['type_growth']:
+            print(f"{entry['count']:>12}  {entry['type']}")
+    print()
+
+
+def _public(measurement: Dict, limit: int) -> Dict:
+    """A measurement as JSON: the snapshot dropped, breakdowns cut to `limit` entries"""
+    result = {key: value for key, value in measurement.items() if not key.startswith('_')}
+    result['modules'] = dict(list(measurement['modules'].items())[:limit])
+    result['types'] = dict(list(measurement['types'].items())[:limit])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report memory use of the Lambda package and check for leaks')
+    parser.add_argument('--handler', default='src.main.handler', help='Handler to import and invoke')
+    parser.add_argument('--invocations', type=int, default=200, help='Invocations between measurements')
+    parser.add_argument('--warmup', type=int, default=20,
+                        help='Invocations before the leak check baseline (caches, lazy imports, pools)')
+    parser.add_argument('--memory', type=int, default=128, help='Function memory size in MB')
+    parser.add_argument('--path', default='/', help='Request path to invoke')
+    parser.add_argument('--lambda', dest='simulate_lambda', action='store_true',
+                        help='Simulate the Lambda runtime (skips .env loading)')
+    parser.add_argument('--leak-check', action='store_true', help='Exit 1 when per-invocation growth exceeds --threshold')
+    parser.add_argument('--threshold', type=int, default=1024, help='Allowed growth in bytes per invocation')
+    parser.add_argument('--limit', type=int, default=15, help='Number of modules/types/lines to show')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    args = parser.parse_args()
+    
+    if args.simulate_lambda:
+        os.environ.setdefault('AWS_LAMBDA_FUNCTION_NAME', 'memory-report')
+    
+    root = args.handler.rsplit('.', 1)[0]
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    started = time.perf_counter()
+    handler = load_handler(args.handler)
+    init_ms = (time.perf_counter() - started) * 1000
+    cold = measure('cold start', 0)
+    
+    run_invocations(handler, args.warmup, args.memory, args.path)
+    warm = measure('warm', args.warmup)
+    run_invocations(handler, args.invocations, args.memory, args.path)
+    after = measure(f'after {args.invocations} more', args.warmup + args.invocations)
+    tracemalloc.stop()
+    for measurement in (cold, warm, after):
+        attribute(measurement, root)
+    
+    # The handler's logs go to stdout; keep the report readable after them
+    sys.stdout.flush()
+    print(f"\nCold start import took {init_ms:.1f} ms (slowed down by tracemalloc)\n")
+    for measurement in (cold, after):
+        print_measurement(measurement, args.memory, args.limit)
+    result = leak_check(warm, after, args.invocations, args.threshold, args.limit)
+    print_leak_check(result)
+    
+    if args.output:
+        report = {
+            'memory_limit_in_mb': args.memory,
+            'init_ms': round(init_ms, 1),
+            'measurements': [_public(m, args.limit) for m in (cold, warm, after)],
+            'leak_check': result,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    if args.leak_check and result['leak_suspected']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
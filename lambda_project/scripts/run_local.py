@@ -1,18 +1,25 @@
 import os
-from main import handler
+import sys
+from pathlib import Path
 
-# Set environment for local testing
-os.environ['ENV_NAME'] = 'NONPROD'  # Change to 'PROD' for prod testing
+from local_runtime import LambdaContext, api_gateway_event
+
+# Set environment for local testing (before the handler module loads its config)
+os.environ.setdefault('ENV_NAME', 'NONPROD')  # Set ENV_NAME=PROD for prod testing
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.main import handler, stream_handler
 
 # Mock event and context for local testing
-event = {'test': 'data'}
-context = type('MockContext', (), {
-    'function_name': 'local-test',
-    'aws_request_id': 'local-test-id'
-})()
+event = api_gateway_event('GET', '/test')
+context = LambdaContext(function_name='local-test')
 
 # Run the handler
 if __name__ == "__main__":
+    if '--stream' in sys.argv:
+        # Streamed response on stdout as it is written: JSON prelude, 8 NUL bytes, body
+        stream_handler(api_gateway_event('GET', '/export', query={'rows': '10'}), context, sys.stdout.buffer)
+        sys.exit(0)
     result = handler(event, context)
     print("Local test result:")
-    print(result)
\ No newline at end of file
+    print(result)
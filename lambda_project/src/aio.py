@@ -0,0 +1,119 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sequence, TypeVar
+
+from .connections import ConnectionPool, HTTPResponse, HTTPSession
+
+T = TypeVar('T')
+
+# One event loop per execution environment, kept across warm invocations so
+# loop-bound state (executors, clients) is not rebuilt on every request
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Get the persistent event loop, creating it on first use"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion on the persistent loop (unlike asyncio.run, which closes it)"""
+    return get_loop().run_until_complete(coro)
+
+
+def async_entry(func: Callable[..., Awaitable[T]]) -> Callable[..., T]:
+    """Turn `async def handler(event, context)` into a synchronous Lambda entry point"""
+    
+    @functools.wraps(func)
+    def wrapper(event, context):
+        return run(func(event, context))
+    
+    return wrapper
+
+
+async def gather_bounded(
+    aws: Iterable[Awaitable[T]],
+    limit: int = 10,
+    return_exceptions: bool = False,
+) -> List[T]:
+    """
+    Await independent operations concurrently, at most `limit` at a time
+    
+    Results come back in input order, like asyncio.gather.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    
+    async def bounded(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+    
+    return await asyncio.gather(*(bounded(aw) for aw in aws), return_exceptions=return_exceptions)
+
+
+class _Offloaded:
+    """Runs blocking client calls on a dedicated thread pool so they overlap on the loop"""
+
+    def __init__(self, max_workers: int, name: str):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+    
+    async def _call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+
+class AsyncHTTPClient(_Offloaded):
+    """
+    Async facade over the pooled keep-alive HTTPSession
+    
+    Each request runs on a worker thread with its own pooled connection, so
+    `concurrency` requests can be in flight at once (size the session's pool
+    to match).
+    """
+
+    def __init__(self, session: HTTPSession, concurrency: int = 10):
+        super().__init__(concurrency, 'aio-http')
+        self.session = session
+    
+    async def request(self, method: str, path: str = '', body: Optional[bytes] = None,
+                      headers: Optional[dict] = None, timeout: Optional[float] = None) -> HTTPResponse:
+        return await self._call(self.session.request, method, path, body=body, headers=headers, timeout=timeout)
+    
+    async def get(self, path: str = '', **kwargs) -> HTTPResponse:
+        return await self.request('GET', path, **kwargs)
+    
+    async def post(self, path: str = '', body: Optional[bytes] = None, **kwargs) -> HTTPResponse:
+        return await self.request('POST', path, body=body, **kwargs)
+
+
+class AsyncDatabase(_Offloaded):
+    """Async facade over the database ConnectionPool (DB-API connections)"""
+
+    def __init__(self, pool: ConnectionPool, concurrency: int = 10, timeout: Optional[float] = None):
+        super().__init__(concurrency, 'aio-db')
+        self.pool = pool
+        self.timeout = timeout
+    
+    def _execute(self, sql: str, params: Sequence[Any], fetch: bool) -> Optional[List[tuple]]:
+        with self.pool.connection(self.timeout) as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, params)
+                if fetch:
+                    return cursor.fetchall()
+                connection.commit()
+                return None
+            finally:
+                cursor.close()
+    
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """Run a query on a pooled connection and return all rows"""
+        return await self._call(self._execute, sql, params, True)
+    
+    async def execute(self, sql: str, params: Sequence[Any] = ()):
+        """Run a statement on a pooled connection and commit"""
+        await self._call(self._execute, sql, params, False)
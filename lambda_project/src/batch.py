@@ -0,0 +1,130 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Reused across warm invocations; recreated only if the worker count changes.
+# A concurrent.futures.ThreadPoolExecutor, imported with the first concurrent batch
+_executor = None
+_executor_workers = 0
+
+
+class BatchProcessingError(RuntimeError):
+    """A failed record cannot be reported individually; the whole batch must be retried"""
+
+
+def record_id(record: Dict) -> Optional[str]:
+    """Get the identifier Lambda expects in batchItemFailures for a record"""
+    if 'messageId' in record:  # SQS
+        return record['messageId']
+    if 'kinesis' in record:  # Kinesis
+        return record['kinesis'].get('sequenceNumber')
+    if 'dynamodb' in record:  # DynamoDB streams
+        return record['dynamodb'].get('SequenceNumber')
+    return record.get('eventID')
+
+
+def _get_executor(max_workers: int):
+    """Get the module-level thread pool, sized to max_workers"""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != max_workers:
+        # Imported here: functions processing records in order never need it
+        from concurrent.futures import ThreadPoolExecutor
+        
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch')
+        _executor_workers = max_workers
+    return _executor
+
+
+def _failure_response(records: List[Dict], failed: List[int]) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Build the partial batch failure response for the failed record indexes
+    
+    Raises:
+        BatchProcessingError: If a failed record has no identifier; Lambda would
+            reject {'itemIdentifier': None} anyway, and skipping the entry would
+            report the record as processed
+    """
+    failures = []
+    for index in sorted(failed):
+        identifier = record_id(records[index])
+        if identifier is None:
+            raise BatchProcessingError(f"Record {index} failed and has no identifier; failing the whole batch")
+        failures.append({'itemIdentifier': identifier})
+    return {'batchItemFailures': failures}
+
+
+def process_batch(
+    event: Dict,
+    record_handler: Callable[[Dict], Any],
+    max_workers: int = 1,
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Process event['Records'] and report only the failed records
+    
+    Args:
+        event: SQS/Kinesis/DynamoDB stream event
+        record_handler: Called once per record; raising marks the record failed
+        max_workers: Number of records processed concurrently (1 = in order)
+    
+    Returns:
+        Partial batch response: {'batchItemFailures': [{'itemIdentifier': ...}]}
+    
+    Raises:
+        BatchProcessingError: If a failed record has no identifier
+    """
+    records = event.get('Records') or []
+    failed = []
+    
+    if max_workers <= 1 or len(records) <= 1:
+        for index, record in enumerate(records):
+            try:
+                record_handler(record)
+            except Exception as e:
+                logger.error("Record %s failed: %s", record_id(record), e)
+                failed.append(index)
+        return _failure_response(records, failed)
+    
+    executor = _get_executor(max_workers)
+    futures = [executor.submit(record_handler, record) for record in records]
+    for index, future in enumerate(futures):
+        error = future.exception()
+        if error is not None:
+            logger.error("Record %s failed: %s", record_id(records[index]), error)
+            failed.append(index)
+    return _failure_response(records, failed)
+
+
+async def process_batch_async(
+    event: Dict,
+    record_handler: Callable[[Dict], Awaitable[Any]],
+    max_concurrency: int = 10,
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Process event['Records'] with a coroutine per record, bounded by a semaphore
+    
+    Args:
+        event: SQS/Kinesis/DynamoDB stream event
+        record_handler: Coroutine function called once per record
+        max_concurrency: Maximum number of records in flight
+    """
+    # Imported here: asyncio costs tens of milliseconds, and the synchronous batch
+    # path (the only one most functions use) should not pay for it at cold start
+    import asyncio
+    
+    records = event.get('Records') or []
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def run(record: Dict):
+        async with semaphore:
+            return await record_handler(record)
+    
+    results = await asyncio.gather(*(run(record) for record in records), return_exceptions=True)
+    failed = []
+    for index, result in enumerate(results):
+        if isinstance(result, Exception):
+            logger.error("Record %s failed: %s", record_id(records[index]), result)
+            failed.append(index)
+    return _failure_response(records, failed)
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Methods that must not be re-executed on retry; cached only with an idempotency key
+NON_IDEMPOTENT_METHODS = frozenset({'POST', 'PATCH'})
+
+DEFAULT_KEY_FIELDS = ('method', 'path', 'query', 'header:Idempotency-Key')
+
+# Always part of the key, whatever the projection: one caller's response is never served to another
+AUTHORIZATION_HEADER = 'Authorization'
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Tuple[Any, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DirectoryBackend:
+    """
+    Shared cache backend storing one JSON file per key in a directory
+    
+    A local stand-in for a shared store (Redis/ElastiCache, DynamoDB, ...):
+    several processes, e.g. the local runtime's workers, see each other's
+    entries. Any object with the same get/set methods can replace it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+    
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f'{key}.json')
+    
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._file(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['expires_at'] <= time.time():
+            return None
+        return entry['value']
+    
+    def set(self, key: str, value: Dict, ttl: float):
+        tmp_path = f'{self._file(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'expires_at': time.time() + ttl, 'value': value}, f)
+        os.replace(tmp_path, self._file(key))
+
+
+def _header(headers: Optional[Dict[str, str]], name: str) -> Optional[str]:
+    """Case-insensitive header lookup (API Gateway preserves the client's casing)"""
+    if not headers:
+        return None
+    lowered = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+
+class ResponseCache:
+    """
+    Response cache keyed on a projection of the API Gateway event
+    
+    - Safe methods (GET, HEAD, ...) are served from the cache while fresh
+    - Entries are per credential: the Authorization header is part of every key
+    - POST/PATCH are only cached when they carry an idempotency key, so a
+      retried request gets the stored result instead of running again
+    - Lookups go to the in-process LRU first, then to the optional shared backend
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = 256,
+        ttl: float = 60,
+        key_fields: Iterable[str] = DEFAULT_KEY_FIELDS,
+        idempotency_header: str = 'Idempotency-Key',
+        backend=None,
+    ):
+        """
+        Args:
+            enabled: When False, lookup() and store() do nothing
+            max_entries: In-process LRU size
+            ttl: Seconds a response stays cached
+            key_fields: Event projection forming the key: 'method', 'path',
+                'query', 'body' and 'header:<Name>' entries (the Authorization
+                header is always included)
+            idempotency_header: Header carrying the client's idempotency key
+            backend: Optional shared store with get(key) and set(key, value, ttl)
+        """
+        self.enabled = enabled
+        self.ttl = ttl
+        self.key_fields = tuple(key_fields)
+        self.idempotency_header = idempotency_header
+        self.backend = backend
+        self.local = LRUCache(max_entries, ttl)
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        self._lock = threading.Lock()
+    
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def key(self, event: Dict) -> str:
+        """
+        Hash the configured projection of the event, plus its Authorization header
+        
+        POST/PATCH keys always include the method and idempotency key too, so
+        a projection without them cannot replay one request's outcome for another.
+        """
+        parts = [_header(event.get('headers'), AUTHORIZATION_HEADER)]
+        method = (event.get('httpMethod') or '').upper()
+        if method in NON_IDEMPOTENT_METHODS:
+            parts.append([method, _header(event.get('headers'), self.idempotency_header)])
+        for field in self.key_fields:
+            if field == 'method':
+                parts.append(event.get('httpMethod'))
+            elif field == 'path':
+                parts.append(event.get('path'))
+            elif field == 'query':
+                parts.append(sorted((event.get('queryStringParameters') or {}).items()))
+            elif field == 'body':
+                parts.append(event.get('body'))
+            elif field.startswith('header:'):
+                parts.append(_header(event.get('headers'), field[len('header:'):]))
+            else:
+                raise ValueError(f"Unknown cache key field '{field}'")
+        encoded = json.dumps(parts, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+    
+    def _cacheable(self, event: Dict) -> bool:
+        method = (event.get('httpMethod') or '').upper()
+        if method in NON_IDEMPOTENT_METHODS:
+            return _header(event.get('headers'), self.idempotency_header) is not None
+        return method not in ('PUT', 'DELETE')
+    
+    def lookup(self, event: Dict) -> Optional[Dict]:
+        """Return a copy of the cached response for this event, or None"""
+        if not self.enabled or not self._cacheable(event):
+            return None
+        
+        key = self.key(event)
+        response = self.local.get(key)
+        if response is None and self.backend is not None:
+            response = self.backend.get(key)
+            if response is not None:
+                self.local.set(key, response)
+        
+        if response is None:
+            self._count('misses')
+            return None
+        
+        self._count('hits')
+        cached = dict(response)
+        cached['headers'] = dict(response.get('headers') or {}, **{'X-Cache': 'Hit'})
+        return cached
+    
+    def store(self, event: Dict, response: Dict):
+        """Cache a response; server errors are never stored so they can be retried"""
+        if not self.enabled or response.get('statusCode', 500) >= 500 or not self._cacheable(event):
+            return
+        method = (event.get('httpMethod') or '').upper()
+        # Reads are only worth caching when successful; idempotent writes keep their outcome
+        if method not in NON_IDEMPOTENT_METHODS and response.get('statusCode') != 200:
+            return
+        
+        key = self.key(event)
+        self.local.set(key, response)
+        if self.backend is not None:
+            self.backend.set(key, response, self.ttl)
+        self._count('stores')
@@ -1,6 +1,119 @@
+import logging
 import os
-from typing import Dict, Optional
-from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from . import envfile
+
+logger = logging.getLogger(__name__)
+
+_TRUE_VALUES = ('true', '1', 'yes', 'on')
+
+# .env keys read from the process environment itself; the rest is served from the file's index
+DOTENV_EXPORTS = ('ENV_NAME', 'ENVIRONMENT')
+
+# Comma-separated environment names checked by resolve_matrix() when none are given
+ENVIRONMENTS_KEY = 'ENVIRONMENTS'
+
+
+class ConfigField:
+    """Declared configuration key: name, type, default and whether it is required"""
+
+    __slots__ = ('name', 'type', 'default', 'required', 'attr', 'secret')
+
+    def __init__(self, name: str, type: type = str, default: Any = None,
+                 required: bool = False, attr: str = None, secret: bool = False):
+        self.name = name
+        self.type = type
+        self.default = default
+        self.required = required
+        # Masked in reports (e.g. the config matrix)
+        self.secret = secret
+        # Attribute name on the snapshot (URL -> url, API_KEY -> api_key)
+        self.attr = attr or name.lower()
+
+    def coerce(self, value: str) -> Any:
+        """Convert a raw string value to the declared type"""
+        if self.type is bool:
+            return value.lower() in _TRUE_VALUES
+        if self.type is int:
+            return int(value)
+        if self.type is float:
+            return float(value)
+        return value
+
+
+class ConfigSnapshot:
+    """Immutable, slot-backed view of resolved configuration values"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the snapshot values as a plain dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _snapshot_class(fields: Iterable[ConfigField]) -> type:
+    """Build a ConfigSnapshot subclass with one slot per declared field"""
+    slots = tuple(field.attr for field in fields)
+    return type('ConfigSnapshot', (ConfigSnapshot,), {'__slots__': slots})
+
+
+def _resolve_values(schema: Sequence[ConfigField], env_vars: Dict[str, str]) -> Tuple[Dict[str, Any], List[str]]:
+    """Coerce declared keys from env_vars; returns values by attribute name and error messages"""
+    values = {}
+    errors = []
+    
+    for field in schema:
+        raw = env_vars.get(field.name)
+        if raw is None:
+            if field.required:
+                errors.append(f"'{field.name}' is required")
+            values[field.attr] = field.default
+            continue
+        try:
+            values[field.attr] = field.coerce(raw)
+        except ValueError:
+            errors.append(f"'{field.name}' must be {field.type.__name__}, got {raw!r}")
+    
+    return values, errors
+
+
+# Project root found by the first local construction, reused by later ones
+_project_root: Optional[str] = None
+
+
+def _find_project_root() -> str:
+    """Find project root directory by looking for .env file"""
+    global _project_root
+    if _project_root is not None:
+        return _project_root
+    
+    # Imported here so the Lambda cold start path never pays for pathlib
+    from pathlib import Path
+    
+    current_dir = Path(__file__).parent
+    
+    # Look for .env file in current dir and parent dirs
+    for parent in [current_dir] + list(current_dir.parents):
+        if (parent / '.env').exists():
+            _project_root = str(parent)
+            return _project_root
+    
+    # If not found, return current directory
+    _project_root = str(current_dir.parent)
+    return _project_root
+
 
 class EnvironmentConfig:
     def __init__(self, environment: str = None, root_dir: str = None):
@@ -11,12 +124,18 @@ class EnvironmentConfig:
             environment: Environment name (NONPROD, PROD, DEV, etc.)
             root_dir: Root directory for finding .env file (auto-detected if None)
         """
-        # Auto-detect root directory
-        if root_dir is None:
-            root_dir = self._find_project_root()
+        # Check if we're running in Lambda
+        self.is_lambda = self._is_running_in_lambda()
+        self._env_file = None
+        self.secrets = None
         
-        # Load .env file if it exists (only for local development)
-        if not self._is_running_in_lambda():
+        # Cold start path: in Lambda, skip .env discovery and parsing
+        if not self.is_lambda:
+            # Auto-detect root directory
+            if root_dir is None:
+                root_dir = _find_project_root()
+            
+            # Load .env file if it exists (only for local development)
             self._load_dotenv(root_dir)
         
         # Determine environment
@@ -25,49 +144,30 @@ class EnvironmentConfig:
             os.getenv('ENV_NAME') or
             os.getenv('ENVIRONMENT', 'NONPROD')
         ).upper()
-        
-        # Check if we're running in Lambda
-        self.is_lambda = self._is_running_in_lambda()
+        self._env_prefix = '' if self.is_lambda else f"{self.environment}_"
         
         # Load environment variables
         self.env_vars = self._load_environment_variables()
-    
-    def _find_project_root(self) -> str:
-        """Find project root directory by looking for .env file"""
-        current_dir = Path(__file__).parent
         
-        # Look for .env file in current dir and parent dirs
-        for parent in [current_dir] + list(current_dir.parents):
-            if (parent / '.env').exists():
-                return str(parent)
+        # Dynamic source (see use_dynamic_source); its values override env_vars
+        self._static_vars = self.env_vars
+        self._schema = None
+        self.settings: Optional[ConfigSnapshot] = None
+        self._source = None
+        self._poller = None
+        self._listeners: List[Callable[[ConfigSnapshot, Set[str]], None]] = []
+        self._reload_lock = threading.Lock()
         
-        # If not found, return current directory
-        return str(current_dir.parent)
+        # Keys kept in env_vars once a schema is loaded (None: keep everything)
+        self._retained: Optional[frozenset] = None
+        self._debug_info: Optional[Tuple[Dict[str, str], Dict]] = None
     
     def _load_dotenv(self, root_dir: str):
-        """Load .env file using python-dotenv"""
-        try:
-            from dotenv import load_dotenv
-            env_path = os.path.join(root_dir, '.env')
-            if os.path.exists(env_path):
-                load_dotenv(env_path)
-        except ImportError:
-            # python-dotenv not installed, manually load .env
-            self._manual_load_dotenv(root_dir)
-    
-    def _manual_load_dotenv(self, root_dir: str):
-        """Manually load .env file if python-dotenv is not available"""
-        env_path = os.path.join(root_dir, '.env')
-        if os.path.exists(env_path):
-            with open(env_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip().strip('"').strip("'")
-                        if key not in os.environ:  # Don't override existing env vars
-                            os.environ[key] = value
+        """Load .env file (parsed once and cached by mtime, see envfile.load)"""
+        self._env_file = envfile.load(os.path.join(root_dir, '.env'))
+        if self._env_file is not None:
+            # Don't override existing env vars
+            self._env_file.export(DOTENV_EXPORTS)
     
     def _is_running_in_lambda(self) -> bool:
         """Check if code is running in AWS Lambda environment"""
@@ -87,21 +187,70 @@ class EnvironmentConfig:
             return self._filter_and_clean_env_vars()
     
     def _filter_and_clean_env_vars(self) -> Dict[str, str]:
-        """Filter variables by environment prefix and remove prefix"""
-        env_prefix = f"{self.environment}_"
-        clean_vars = {}
+        """
+        Variables for this environment, prefix removed
+        
+        os.environ is not scanned as a rule: only the keys the .env file sets
+        are looked up in it here. Prefixed variables set only in the process
+        environment are read once declared (resolve()/load()) or asked for (get()).
+        """
+        env_prefix = self._env_prefix
         
-        for key, value in os.environ.items():
-            if key.startswith(env_prefix):
-                # Remove prefix from key name
-                clean_key = key[len(env_prefix):]
-                clean_vars[clean_key] = value
+        # Start from the .env file's pre-built index for this environment
+        clean_vars = dict(self._env_file.environment(self.environment)) if self._env_file else {}
         
+        # Real environment variables win over .env values
+        if len(clean_vars) < len(os.environ):
+            clean_vars.update(self._read_environ(clean_vars))
+        else:
+            # A .env larger than the whole environment: one pass over os.environ is cheaper
+            for key, value in os.environ.items():
+                if key.startswith(env_prefix) and key[len(env_prefix):] in clean_vars:
+                    clean_vars[key[len(env_prefix):]] = value
         return clean_vars
     
+    def _read_environ(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Process environment values of the given (unprefixed) keys, where set"""
+        values = {}
+        for key in keys:
+            value = os.environ.get(self._env_prefix + key)
+            if value is not None:
+                values[key] = value
+        return values
+    
+    def _read_declared(self, keys: Iterable[str]):
+        """Add declared keys that only the process environment sets to env_vars"""
+        found = self._read_environ([key for key in keys if key not in self._static_vars])
+        if not found:
+            return
+        with self._reload_lock:
+            self._static_vars = dict(self._static_vars, **found)
+            # Values from a dynamic source still win
+            self.env_vars = dict(found, **self.env_vars)
+    
     def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
         """Get environment variable value"""
-        return self.env_vars.get(key, default)
+        value = self.env_vars.get(key)
+        if value is None and (self._retained is None or key not in self._retained):
+            # Undeclared key: read through to the process environment and .env rather than keep a copy
+            value = os.environ.get(self._env_prefix + key)
+            if value is None and self._env_file is not None:
+                value = self._env_file.environment(self.environment).get(key)
+        return default if value is None else value
+    
+    def retain(self, keys: Iterable[str]):
+        """
+        Drop every variable but `keys` from env_vars
+        
+        In Lambda env_vars starts as a copy of the whole process environment,
+        which would otherwise live as long as the execution environment.
+        Undeclared keys stay readable through get(), which falls back to
+        os.environ for them.
+        """
+        with self._reload_lock:
+            self._retained = frozenset(keys)
+            self._static_vars = {key: value for key, value in self._static_vars.items() if key in self._retained}
+            self.env_vars = {key: value for key, value in self.env_vars.items() if key in self._retained}
     
     def get_required(self, key: str) -> str:
         """Get required environment variable (raises error if not found)"""
@@ -110,6 +259,27 @@ class EnvironmentConfig:
             raise ValueError(f"Required environment variable '{key}' not found for environment '{self.environment}'")
         return value
     
+    def use_secrets(self, provider, ttl: float = 300, refresh_ahead: Optional[float] = None):
+        """
+        Serve get_secret() through a provider with an in-memory TTL cache
+        
+        Args:
+            provider: Object with fetch(name) -> str (see secret_store)
+            ttl: Seconds a fetched value is served from memory
+            refresh_ahead: Seconds before expiry to refresh in the background
+        """
+        from .secret_store import SecretsCache
+        self.secrets = SecretsCache(provider, ttl, refresh_ahead)
+    
+    def get_secret(self, key: str) -> str:
+        """Get a secret (raises error if not found); plain environment lookup if no provider is set"""
+        if self.secrets is None:
+            return self.get_required(key)
+        try:
+            return self.secrets.get(key)
+        except KeyError:
+            raise ValueError(f"Required secret '{key}' not found for environment '{self.environment}'")
+    
     def get_bool(self, key: str, default: bool = False) -> bool:
         """Get boolean environment variable"""
         value = self.get(key)
@@ -127,9 +297,131 @@ class EnvironmentConfig:
         except ValueError:
             return default
     
+    def resolve(self, schema: Iterable[ConfigField]) -> ConfigSnapshot:
+        """
+        Validate and coerce declared keys once into an immutable snapshot
+        
+        Args:
+            schema: Declared fields to resolve
+        
+        Raises:
+            ValueError: If required keys are missing or values cannot be coerced
+        """
+        schema = tuple(schema)
+        if not self.is_lambda:
+            self._read_declared(field.name for field in schema)
+        return self._resolve(schema, self.env_vars)
+    
+    def _resolve(self, schema, env_vars: Dict[str, str]) -> ConfigSnapshot:
+        values, errors = _resolve_values(schema, env_vars)
+        if errors:
+            raise ValueError(
+                f"Invalid configuration for environment '{self.environment}': " + '; '.join(errors)
+            )
+        
+        snapshot_cls = _snapshot_class(schema)
+        snapshot = snapshot_cls.__new__(snapshot_cls)
+        for attr, value in values.items():
+            object.__setattr__(snapshot, attr, value)
+        return snapshot
+    
+    def load(self, schema: Iterable[ConfigField], extra_keys: Iterable[str] = ()) -> ConfigSnapshot:
+        """
+        Resolve a schema into `settings` and keep it current on dynamic reloads
+        
+        Readers should go through `config.settings` (or re-read it in an
+        on_change callback): a reload replaces the snapshot object, it never
+        mutates it, so every request sees one consistent set of values.
+        
+        Only the schema's keys and `extra_keys` (e.g. secrets read through
+        get_secret) are retained in env_vars afterwards, see retain().
+        """
+        self._schema = tuple(schema)
+        extra_keys = list(extra_keys)
+        if not self.is_lambda:
+            self._read_declared(extra_keys)
+        self.settings = self.resolve(self._schema)
+        self.retain([field.name for field in self._schema] + extra_keys)
+        return self.settings
+    
+    def on_change(self, callback: Callable[[ConfigSnapshot, Set[str]], None]):
+        """Call callback(settings, changed_attrs) after a reload swaps in a new snapshot"""
+        self._listeners.append(callback)
+    
+    def use_dynamic_source(self, source, interval: float = 60.0):
+        """
+        Overlay values from a dynamic source, re-fetched in the background
+        
+        The first fetch happens now (cold start). Later fetches run on a
+        daemon thread every `interval` seconds, never on the request path.
+        
+        Args:
+            source: Object with fetch() -> dict, or None when unchanged (see config_source)
+            interval: Seconds between polls (0 disables polling)
+        """
+        from .config_source import Poller
+        self._source = source
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("Loading dynamic config failed, using environment values: %s", e)
+        if interval > 0:
+            self._poller = Poller(self.refresh, interval)
+            self._poller.start()
+    
+    def refresh(self) -> bool:
+        """Fetch the dynamic source once and apply any change; returns True if settings changed"""
+        values = self._source.fetch() if self._source is not None else None
+        if values is None:
+            return False
+        
+        if self._retained is not None:
+            # Only declared keys, like load(); the source may publish far more
+            values = {key: value for key, value in values.items() if key in self._retained}
+        
+        with self._reload_lock:
+            env_vars = dict(self._static_vars)
+            env_vars.update(values)
+            previous = self.settings
+            if self._schema is not None:
+                try:
+                    snapshot = self._resolve(self._schema, env_vars)
+                except ValueError as e:
+                    # Keep serving the last valid configuration
+                    logger.error("Ignoring dynamic config update: %s", e)
+                    return False
+            else:
+                snapshot = None
+            
+            # Atomic reference swaps; readers see either the old or the new values
+            self.env_vars = env_vars
+            self.settings = snapshot
+        
+        if snapshot is None or previous is None:
+            return False
+        changed = {attr for attr in snapshot.__slots__ if getattr(snapshot, attr) != getattr(previous, attr)}
+        if not changed:
+            return False
+        
+        logger.info("Configuration reloaded, changed: %s", ', '.join(sorted(changed)))
+        for callback in self._listeners:
+            try:
+                callback(snapshot, changed)
+            except Exception:
+                logger.exception("Config change callback %r failed", callback)
+        return True
+    
     def debug_info(self) -> Dict:
-        """Get debug information about current configuration"""
-        return {
+        """
+        Get debug information about current configuration
+        
+        Built once per env_vars mapping (a reload or retain() replaces it),
+        not on every debug call.
+        """
+        cached = self._debug_info
+        if cached is not None and cached[0] is self.env_vars:
+            return cached[1]
+        info = {
             'environment': self.environment,
             'is_lambda': self.is_lambda,
             'available_vars': list(self.env_vars.keys()),
@@ -137,6 +429,121 @@ class EnvironmentConfig:
             'function_name': os.getenv('AWS_LAMBDA_FUNCTION_NAME'),
             'runtime': os.getenv('AWS_EXECUTION_ENV')
         }
+        self._debug_info = (self.env_vars, info)
+        return info
+
+
+MASK = '***'
+
+
+class ConfigMatrix:
+    """
+    One schema resolved for many environments, comparable side by side
+    
+    Attributes:
+        environments: Environment names, in resolution order
+        values: {environment: {KEY: coerced value}} (defaults filled in)
+        errors: {environment: [message, ...]} for missing required keys and type errors
+    """
+
+    def __init__(self, schema: Sequence[ConfigField], environments: List[str],
+                 values: Dict[str, Dict[str, Any]], errors: Dict[str, List[str]]):
+        self.schema = schema
+        self.environments = environments
+        self.values = values
+        self.errors = errors
+        self._secrets = {field.name for field in schema if field.secret}
+    
+    @property
+    def ok(self) -> bool:
+        return not any(self.errors.values())
+    
+    def value(self, environment: str, key: str, mask: bool = True) -> Any:
+        """A resolved value, masked for secret fields unless mask is False"""
+        value = self.values[environment][key]
+        if mask and value is not None and key in self._secrets:
+            return MASK
+        return value
+    
+    def diff(self, left: str, right: str) -> Dict[str, Tuple[Any, Any]]:
+        """Keys whose values differ between two environments: {KEY: (left, right)}"""
+        differences = {}
+        for field in self.schema:
+            a, b = self.values[left][field.name], self.values[right][field.name]
+            if a != b:
+                if field.secret:
+                    a, b = (MASK if a is not None else None), (MASK if b is not None else None)
+                differences[field.name] = (a, b)
+        return differences
+    
+    def varying_keys(self) -> List[str]:
+        """Keys whose value is not the same in every environment"""
+        return [
+            field.name for field in self.schema
+            if len({repr(self.values[env][field.name]) for env in self.environments}) > 1
+        ]
+    
+    def as_dict(self, mask: bool = True) -> Dict[str, Any]:
+        return {
+            environment: {
+                'values': {field.name: self.value(environment, field.name, mask) for field in self.schema},
+                'errors': self.errors[environment],
+            }
+            for environment in self.environments
+        }
+
+
+def resolve_matrix(
+    schema: Iterable[ConfigField],
+    environments: Optional[Iterable[str]] = None,
+    root_dir: Optional[str] = None,
+    environ: Optional[Dict[str, str]] = None,
+) -> ConfigMatrix:
+    """
+    Resolve a schema for every environment in one pass over the sources
+    
+    The .env file is loaded once and os.environ is scanned once. Both are
+    indexed by prefix, so each extra environment only costs a dict lookup and
+    the coercion of its own keys. Precedence matches EnvironmentConfig:
+    real environment variables win over .env values.
+    
+    Args:
+        schema: Declared fields
+        environments: Environment names; by default the comma-separated
+            ENVIRONMENTS variable (process environment, then .env), else every
+            .env prefix that sets at least one declared key. Process variables
+            are never used to detect environments: DATABASE_URL in a shell is
+            not a DATABASE environment. Names containing '_' must be listed.
+        root_dir: Directory containing .env (auto-detected if None)
+        environ: Variables to use instead of os.environ
+    """
+    schema = tuple(schema)
+    env_file = envfile.load(os.path.join(root_dir or _find_project_root(), '.env'))
+    environ = dict(os.environ if environ is None else environ)
+    environ_index = envfile.EnvFile('<environ>', environ, envfile.build_index(environ))
+    
+    if environments is None:
+        declared = environ.get(ENVIRONMENTS_KEY)
+        if declared is None and env_file is not None:
+            declared = env_file.values.get(ENVIRONMENTS_KEY)
+        if declared is not None:
+            environments = [name.strip() for name in declared.split(',') if name.strip()]
+        elif env_file is not None:
+            names = {field.name for field in schema}
+            environments = sorted(prefix for prefix, group in env_file.index.items() if names & group.keys())
+        else:
+            environments = []
+    environments = [name.upper() for name in environments]
+    
+    values = {}
+    errors = {}
+    for environment in environments:
+        env_vars = dict(env_file.environment(environment)) if env_file is not None else {}
+        env_vars.update(environ_index.environment(environment))
+        resolved, errors[environment] = _resolve_values(schema, env_vars)
+        values[environment] = {field.name: resolved.get(field.attr) for field in schema}
+    
+    return ConfigMatrix(schema, environments, values, errors)
 
 # Create a global config instance
 config = EnvironmentConfig()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from . import envfile
+from .lazy import lazy_import
+
+# Only imported when an AppConfig source is configured
+urllib_request = lazy_import('urllib.request')
+
+logger = logging.getLogger(__name__)
+
+# Default endpoint of the AWS AppConfig Lambda extension
+APPCONFIG_EXTENSION_URL = 'http://localhost:2772'
+
+
+def _flatten(document: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Turn a JSON document into string config values
+    
+    AppConfig feature flags ({"NEW_UI": {"enabled": true}}) become their
+    enabled flag; booleans become 'true'/'false' so ConfigField bools parse them.
+    """
+    values = {}
+    for key, value in document.items():
+        if isinstance(value, dict) and 'enabled' in value:
+            value = value['enabled']
+        if isinstance(value, bool):
+            values[key] = 'true' if value else 'false'
+        elif value is not None:
+            values[key] = value if isinstance(value, str) else json.dumps(value)
+    return values
+
+
+class FileConfigSource:
+    """
+    Dynamic values from a local file: JSON object, or KEY=value lines (.env syntax)
+    
+    Also the local stand-in for AppConfig: edit the file and the running
+    process picks the change up on its next poll.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stamp = None
+    
+    def fetch(self) -> Optional[Dict[str, str]]:
+        """Return the current values, or None if the file is unchanged since the last fetch"""
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return None
+        with open(self.path, encoding='utf-8') as f:
+            text = f.read()
+        values = _flatten(json.loads(text)) if self.path.endswith('.json') else envfile.parse(text)
+        self._stamp = stamp
+        return values
+
+
+class AppConfigSource:
+    """
+    Dynamic values from the AWS AppConfig Lambda extension (or anything serving its API)
+    
+    The extension caches the configuration and polls AppConfig itself, so
+    fetching is a localhost round trip. scripts/appconfig_local.py serves a
+    JSON file on the same path for local development.
+    """
+
+    def __init__(self, application: str, environment: str, profile: str,
+                 base_url: str = APPCONFIG_EXTENSION_URL, timeout: float = 2.0):
+        """
+        Args:
+            application: AppConfig application name
+            environment: AppConfig environment name
+            profile: Configuration profile name (freeform JSON or feature flags)
+            base_url: Extension endpoint (AWS_APPCONFIG_EXTENSION_HTTP_PORT changes the port)
+            timeout: Request timeout in seconds
+        """
+        self.url = (
+            f"{base_url.rstrip('/')}/applications/{application}"
+            f"/environments/{environment}/configurations/{profile}"
+        )
+        self.timeout = timeout
+        self._digest = None
+    
+    def fetch(self) -> Optional[Dict[str, str]]:
+        """Return the current values, or None if the document is unchanged since the last fetch"""
+        with urllib_request.urlopen(self.url, timeout=self.timeout) as response:
+            body = response.read()
+        digest = hashlib.sha256(body).hexdigest()
+        if digest == self._digest:
+            return None
+        values = _flatten(json.loads(body or b'{}'))
+        self._digest = digest
+        return values
+
+
+def build_source(kind: str, location: Optional[str] = None):
+    """
+    Create a dynamic config source by name
+    
+    Args:
+        kind: 'file' or 'appconfig'
+        location: File path for 'file'; 'application/environment/profile'
+            for 'appconfig', optionally prefixed by the extension URL
+            (http://localhost:2772/app/env/profile)
+    """
+    kind = kind.lower()
+    if not location:
+        raise ValueError(f"The '{kind}' config source requires CONFIG_SOURCE_LOCATION")
+    if kind == 'file':
+        return FileConfigSource(location)
+    if kind == 'appconfig':
+        base_url = APPCONFIG_EXTENSION_URL
+        if '://' in location:
+            scheme, rest = location.split('://', 1)
+            host, _, location = rest.partition('/')
+            base_url = f'{scheme}://{host}'
+        parts = location.strip('/').split('/')
+        if len(parts) != 3:
+            raise ValueError(f"AppConfig location must be application/environment/profile, got '{location}'")
+        return AppConfigSource(*parts, base_url=base_url)
+    raise ValueError(f"Unknown config source '{kind}'")
+
+
+class Poller:
+    """
+    Daemon thread calling `poll` every `interval` seconds
+    
+    In Lambda the thread is frozen between invocations and resumes with the
+    next one; it never blocks a request, so a slow or failing source only
+    delays the reload.
+    """
+
+    def __init__(self, poll: Callable[[], None], interval: float, name: str = 'config-poller'):
+        self.poll = poll
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning("Polling dynamic config failed: %s", e)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
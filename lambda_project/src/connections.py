@@ -0,0 +1,404 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .lazy import lazy_import
+
+# Only imported when a connection of that kind is first opened
+sqlite3 = lazy_import('sqlite3')
+http_client = lazy_import('http.client')
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable connections kept in module scope across warm invocations
+    
+    Connections are opened lazily and health-checked on checkout, but only when
+    they have been idle for longer than `check_after` seconds.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 2,
+        health_check: Optional[Callable[[Any], bool]] = None,
+        close: Optional[Callable[[Any], None]] = None,
+        check_after: float = 30.0,
+        max_idle: Optional[float] = None,
+        name: str = 'pool',
+    ):
+        """
+        Args:
+            factory: Opens a new connection
+            max_size: Maximum number of open connections
+            health_check: Returns False if an idle connection is no longer usable
+            close: Closes a connection (defaults to calling connection.close())
+            check_after: Idle seconds after which a connection is health-checked
+            max_idle: Idle seconds after which a connection is evicted unchecked
+            name: Name used in errors and logs
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.health_check = health_check
+        self.close_connection = close or (lambda connection: connection.close())
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.name = name
+        
+        self._idle: List[Tuple[Any, float]] = []  # (connection, last_used), most recent last
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._stats = {'hits': 0, 'opens': 0, 'evictions': 0, 'in_use': 0}
+    
+    def _count(self, stat: str, delta: int = 1):
+        with self._lock:
+            self._stats[stat] += delta
+    
+    def _evict(self, connection: Any):
+        """Close a connection that failed its health check or went stale"""
+        self._count('evictions')
+        try:
+            self.close_connection(connection)
+        except Exception as e:
+            logger.debug("Closing evicted %s connection failed: %s", self.name, e)
+    
+    def _take_idle(self) -> Optional[Any]:
+        """Pop the most recently used idle connection that is still usable"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, last_used = self._idle.pop()
+            
+            idle_for = time.monotonic() - last_used
+            if self.max_idle is not None and idle_for > self.max_idle:
+                self._evict(connection)
+            elif self.health_check and idle_for > self.check_after and not self.health_check(connection):
+                self._evict(connection)
+            else:
+                return connection
+    
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Check out a connection, opening one only if no healthy idle one exists"""
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolExhaustedError(f"No {self.name} connection available within {timeout}s")
+        
+        try:
+            connection = self._take_idle()
+            if connection is None:
+                connection = self.factory()
+                self._count('opens')
+            else:
+                self._count('hits')
+        except Exception:
+            self._slots.release()
+            raise
+        
+        self._count('in_use')
+        return connection
+    
+    def release(self, connection: Any, discard: bool = False):
+        """Return a connection to the pool (or close it if discard is set)"""
+        self._count('in_use', -1)
+        try:
+            if discard:
+                self._evict(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+    
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Check out a connection for the duration of a with block"""
+        connection = self.acquire(timeout)
+        discard = True
+        try:
+            yield connection
+            discard = False
+        finally:
+            # Released on any exit, including GeneratorExit from a closed generator or a
+            # cancelled task; after an exception the connection may be in an unknown
+            # state, so it is not handed out again
+            self.release(connection, discard=discard)
+    
+    def prefill(self, count: Optional[int] = None, prepare: Optional[Callable[[Any], None]] = None) -> int:
+        """
+        Open idle connections ahead of the first request (e.g. during a warm-up)
+        
+        Args:
+            count: Connections to have open, idle or in use (capped at max_size)
+            prepare: Called on each new connection, e.g. to establish it eagerly
+        
+        Returns:
+            Number of connections opened
+        """
+        target = min(count if count is not None else self.max_size, self.max_size)
+        opened = 0
+        while True:
+            with self._lock:
+                if len(self._idle) + self._stats['in_use'] >= target:
+                    return opened
+            connection = self.factory()
+            if prepare is not None:
+                prepare(connection)
+            self._count('opens')
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+            opened += 1
+    
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self.close_connection(connection)
+    
+    def stats(self) -> Dict[str, int]:
+        """Get pool counters: hits, opens, evictions, in_use and idle"""
+        with self._lock:
+            return dict(self._stats, idle=len(self._idle), max_size=self.max_size)
+
+
+def _sqlite_factory(get_url: Callable[[], str], timeout: float) -> Callable[[], Any]:
+    """Connection factory for sqlite:///path URLs (sqlite:///:memory: supported)"""
+    
+    def connect():
+        path = get_url().split('://', 1)[1]
+        path = path[1:] if path.startswith('/') else path
+        return sqlite3.connect(path or ':memory:', timeout=timeout, check_same_thread=False)
+    
+    return connect
+
+
+def _postgres_factory(get_url: Callable[[], str], timeout: float) -> Callable[[], Any]:
+    """Connection factory for postgresql:// URLs (requires psycopg2)"""
+    try:
+        import psycopg2
+    except ImportError:
+        raise ImportError("psycopg2 is required for postgresql:// DATABASE_URL values")
+    
+    def connect():
+        return psycopg2.connect(get_url(), connect_timeout=int(timeout))
+    
+    return connect
+
+
+def _ping(connection: Any) -> bool:
+    """Health check: run a trivial query"""
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+        cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+_DB_FACTORIES = {
+    'sqlite': _sqlite_factory,
+    'postgres': _postgres_factory,
+    'postgresql': _postgres_factory,
+}
+
+
+def database_pool(url: Union[str, Callable[[], str]], max_size: int = 2, timeout: float = 30) -> ConnectionPool:
+    """
+    Create a pool for DATABASE_URL, picking the driver from the URL scheme
+    
+    `url` may be a callable (e.g. a cached secret lookup); it is called for
+    every new connection, so rotated credentials are picked up.
+    """
+    get_url = url if callable(url) else (lambda: url)
+    scheme = get_url().split('://', 1)[0].split('+', 1)[0].lower()
+    if scheme not in _DB_FACTORIES:
+        raise ValueError(f"Unsupported DATABASE_URL scheme '{scheme}'")
+    return ConnectionPool(
+        _DB_FACTORIES[scheme](get_url, timeout),
+        max_size=max_size,
+        health_check=_ping,
+        name='database',
+    )
+
+
+class HTTPResponse:
+    """Fully read HTTP response (the connection is back in the pool once this exists)"""
+
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class HTTPSession:
+    """
+    Keep-alive HTTP client for a single base URL, backed by a ConnectionPool
+    
+    Uses http.client so no extra dependency ships with the function.
+    """
+
+    def __init__(self, base_url: str, max_size: int = 2, timeout: float = 30, max_idle: float = 50.0):
+        """
+        Args:
+            base_url: Scheme, host and optional path prefix (e.g. the URL setting)
+            max_size: Maximum number of open connections
+            timeout: Socket timeout in seconds
+            max_idle: Idle seconds after which connections are dropped instead of
+                reused (keep it below the server's keep-alive timeout)
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL scheme '{parts.scheme}'")
+        self.base_url = base_url
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._secure = parts.scheme == 'https'
+        self.pool = ConnectionPool(self._connect, max_size=max_size, max_idle=max_idle, name='http')
+    
+    def _connect(self):
+        connection_cls = http_client.HTTPSConnection if self._secure else http_client.HTTPConnection
+        return connection_cls(self.host, self.port, timeout=self.timeout)
+    
+    def request(
+        self,
+        method: str,
+        path: str = '',
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> HTTPResponse:
+        """
+        Send a request over a pooled connection
+        
+        `timeout` bounds both the pool checkout and the socket operations. A
+        request on a reused connection the server already closed is retried
+        once on a fresh connection.
+        """
+        url = self.prefix + '/' + path.lstrip('/') if path else self.prefix or '/'
+        for attempt in (1, 2):
+            connection = self.pool.acquire(timeout)
+            reused = connection.sock is not None
+            # Per-request socket timeout, e.g. the remaining invocation budget
+            connection.timeout = timeout if timeout is not None else self.timeout
+            if reused:
+                connection.sock.settimeout(connection.timeout)
+            try:
+                connection.request(method, url, body=body, headers=headers or {})
+                response = connection.getresponse()
+                result = HTTPResponse(response.status, dict(response.getheaders()), response.read())
+            except (http_client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.pool.release(connection, discard=True)
+                if attempt == 2 or not reused:
+                    raise
+                continue
+            except Exception:
+                self.pool.release(connection, discard=True)
+                raise
+            
+            self.pool.release(connection, discard=response.will_close)
+            return result
+    
+    def warm(self, count: int = 1) -> int:
+        """Open `count` keep-alive connections now (TCP and TLS handshakes included)"""
+        return self.pool.prefill(count, prepare=lambda connection: connection.connect())
+    
+    def get(self, path: str = '', **kwargs) -> HTTPResponse:
+        return self.request('GET', path, **kwargs)
+    
+    def post(self, path: str = '', body: Optional[bytes] = None, **kwargs) -> HTTPResponse:
+        return self.request('POST', path, body=body, **kwargs)
+    
+    def close(self):
+        self.pool.close()
+
+
+class ConnectionManager:
+    """Module-scope owner of the database pool and HTTP session for the function"""
+
+    def __init__(self, database_url: Union[str, Callable[[], str]], api_url: str,
+                 pool_size: int = 2, timeout: float = 30):
+        self.database_url = database_url
+        self.api_url = api_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._database: Optional[ConnectionPool] = None
+        self._http: Optional[HTTPSession] = None
+    
+    @classmethod
+    def from_settings(cls, settings, database_url: Union[str, Callable[[], str]]) -> 'ConnectionManager':
+        """
+        Create a manager from the resolved config snapshot and a DATABASE_URL source
+        
+        Pools hold at least ASYNC_CONCURRENCY connections: the async clients
+        share them, and a smaller pool would cap the fan-out at its size.
+        Connections still open lazily, so an unused slot costs nothing.
+        """
+        return cls(
+            database_url=database_url,
+            api_url=settings.url,
+            pool_size=max(settings.db_pool_size, settings.async_concurrency),
+            timeout=settings.timeout,
+        )
+    
+    @property
+    def database(self) -> ConnectionPool:
+        """Database pool, created on first use"""
+        if self._database is None:
+            self._database = database_pool(self.database_url, self.pool_size, self.timeout)
+        return self._database
+    
+    @property
+    def http(self) -> HTTPSession:
+        """Keep-alive session for the URL backend, created on first use"""
+        if self._http is None:
+            self._http = HTTPSession(self.api_url, self.pool_size, self.timeout)
+        return self._http
+    
+    def warm(self, count: int = 1) -> Dict[str, int]:
+        """
+        Create both pools and open `count` connections in each
+        
+        A backend that cannot be reached is logged and skipped so the other
+        one is still warmed; the first request will surface the error.
+        """
+        opened = {}
+        for name, warm in (
+            ('database', lambda: self.database.prefill(count)),
+            ('http', lambda: self.http.warm(count)),
+        ):
+            try:
+                opened[name] = warm()
+            except Exception as e:
+                logger.warning("Warming %s connections failed: %s", name, e)
+                opened[name] = 0
+        return opened
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get pool stats for every pool opened so far"""
+        stats = {}
+        if self._database is not None:
+            stats['database'] = self._database.stats()
+        if self._http is not None:
+            stats['http'] = self._http.pool.stats()
+        return stats
+    
+    def close(self):
+        if self._database is not None:
+            self._database.close()
+        if self._http is not None:
+            self._http.close()
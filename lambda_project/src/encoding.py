@@ -0,0 +1,210 @@
+import base64
+import json
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .lazy import lazy_import
+
+# Only imported when a response is actually compressed
+gzip = lazy_import('gzip')
+
+logger = logging.getLogger(__name__)
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+class Fragment:
+    """
+    Pre-encoded JSON object members, spliced into responses without re-encoding
+    
+    Built once per cold start for values that never change between invocations
+    (e.g. the settings echoed in every response).
+    """
+
+    __slots__ = ('members',)
+    
+    def __init__(self, members: str):
+        self.members = members
+
+
+class JSONSerializer:
+    """
+    Compact JSON encoder with a pluggable backend
+    
+    'json' uses the standard library; 'orjson' uses orjson (not shipped with
+    the function, add it to requirements.txt to use it); 'auto' picks orjson
+    when it is importable and falls back to the standard library.
+    """
+
+    def __init__(self, backend: str = 'auto'):
+        """
+        Args:
+            backend: 'auto', 'json' or 'orjson'
+        """
+        self.backend, self._dumps = self._select(backend)
+    
+    @staticmethod
+    def _select(backend: str) -> Tuple[str, Callable[[Any], str]]:
+        backend = backend.lower()
+        if backend not in ('auto', 'json', 'orjson'):
+            raise ValueError(f"Unknown JSON serializer '{backend}'")
+        
+        if backend in ('auto', 'orjson'):
+            try:
+                import orjson
+            except ImportError:
+                if backend == 'orjson':
+                    raise ImportError("orjson is required for JSON_SERIALIZER=orjson")
+            else:
+                def dumps(obj):
+                    return orjson.dumps(obj, default=str).decode('utf-8')
+                return 'orjson', dumps
+        
+        encoder = json.JSONEncoder(separators=(',', ':'), default=str)
+        return 'json', encoder.encode
+    
+    def dumps(self, obj: Any) -> str:
+        """Encode a value as compact JSON"""
+        return self._dumps(obj)
+    
+    def fragment(self, data: Dict[str, Any]) -> Fragment:
+        """Pre-encode a dict once so later responses can splice it in"""
+        return Fragment(self._dumps(data)[1:-1])
+    
+    def dumps_with(self, fragment: Fragment, data: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Encode `data` merged after a pre-encoded fragment
+        
+        Keys in `data` must not repeat keys already in the fragment.
+        """
+        if not data:
+            return '{' + fragment.members + '}'
+        if not fragment.members:
+            return self._dumps(data)
+        return '{' + fragment.members + ',' + self._dumps(data)[1:]
+
+
+def _brotli():
+    """The brotli module, or None when it is not installed"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=6, mtime=0)}
+    brotli = _brotli()
+    if brotli is not None:
+        compressors['br'] = lambda data: brotli.compress(data, quality=5)
+    return compressors
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    accepted = {}
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _vary_accept_encoding(headers: Dict[str, str]) -> Dict[str, str]:
+    """Copy of `headers` with Accept-Encoding added to Vary (kept once, other fields preserved)"""
+    name = next((key for key in headers if key.lower() == 'vary'), 'Vary')
+    fields = [field.strip() for field in headers.get(name, '').split(',') if field.strip()]
+    if '*' in fields or any(field.lower() == 'accept-encoding' for field in fields):
+        return dict(headers)
+    return dict(headers, **{name: ', '.join(fields + ['Accept-Encoding'])})
+
+
+class ResponseCompressor:
+    """
+    Compresses API Gateway response bodies negotiated from Accept-Encoding
+    
+    Brotli is preferred when the client accepts it and the module is
+    installed, then gzip. Bodies smaller than `min_size` bytes, error
+    responses and bodies that already carry a Content-Encoding are returned
+    unchanged; every other response gets `Vary: Accept-Encoding`, whether
+    or not this client's request ended up compressed.
+    """
+
+    def __init__(self, enabled: bool = True, min_size: int = 1024):
+        """
+        Args:
+            enabled: Compress at all
+            min_size: Smallest body (in bytes) worth compressing
+        """
+        self.enabled = enabled
+        self.min_size = min_size
+        self._compressors: Optional[Dict[str, Callable[[bytes], bytes]]] = None
+    
+    def _available(self) -> Dict[str, Callable[[bytes], bytes]]:
+        if self._compressors is None:
+            self._compressors = _compressors()
+        return self._compressors
+    
+    def negotiate(self, header: Optional[str]) -> Optional[str]:
+        """Pick the preferred coding the client accepts, or None"""
+        accepted = parse_accept_encoding(header)
+        best, best_q = None, 0.0
+        for coding in ('br', 'gzip'):
+            q = accepted.get(coding, accepted.get('*', 0.0))
+            if q > best_q and coding in self._available():
+                best, best_q = coding, q
+        return best
+    
+    def compress(self, event: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return `response` with a compressed, base64 encoded body when worthwhile
+        
+        Args:
+            event: API Gateway event (for the Accept-Encoding header)
+            response: API Gateway response; left unmodified
+        """
+        body = response.get('body')
+        if not self.enabled or not body or response.get('isBase64Encoded'):
+            return response
+        if response.get('statusCode', 200) >= 300:
+            return response
+        
+        headers = response.get('headers') or {}
+        if any(name.lower() == 'content-encoding' for name in headers):
+            return response
+        
+        raw = body.encode('utf-8') if isinstance(body, str) else body
+        if len(raw) < self.min_size:
+            return response
+        
+        # From here the encoding depends on the request, so caches in front of
+        # the function must key on Accept-Encoding even for identity bodies
+        headers = _vary_accept_encoding(headers)
+        request_headers = (event or {}).get('headers') or {}
+        accept = next((value for name, value in request_headers.items() if name.lower() == 'accept-encoding'), None)
+        coding = self.negotiate(accept)
+        if coding is None:
+            return dict(response, headers=headers)
+        
+        compressed = self._available()[coding](raw)
+        if len(compressed) >= len(raw):
+            return dict(response, headers=headers)
+        
+        logger.debug("Compressed response with %s: %d -> %d bytes", coding, len(raw), len(compressed))
+        return dict(
+            response,
+            headers=dict(headers, **{'Content-Encoding': coding}),
+            body=base64.b64encode(compressed).decode('ascii'),
+            isBase64Encoded=True,
+        )
@@ -0,0 +1,199 @@
+import hashlib
+import marshal
+import os
+import re
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+# Bump when the parser or the cache layout changes
+CACHE_VERSION = 2
+
+# Start of an assignment: optional `export`, the key, `=`
+_ASSIGNMENT = re.compile(r'[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_.\-]*)[ \t]*=[ \t]*')
+# Double-quoted value, may span lines and contain backslash escapes
+_DOUBLE_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"', re.DOTALL)
+# Single-quoted value, literal, may span lines
+_SINGLE_QUOTED = re.compile(r"'([^']*)'")
+# Unquoted value up to end of line, minus an inline ` # comment`; the whitespace
+# before `#` may be the one after `=` (KEY= # comment is an empty value)
+_UNQUOTED = re.compile(r'([^\n]*?)[ \t]*(?:(?<=[ \t])#[^\n]*)?$', re.MULTILINE)
+_ESCAPE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\', '$': '$'}
+
+
+def _unescape(match) -> str:
+    char = match.group(1)
+    return _ESCAPES.get(char, '\\' + char)
+
+
+def parse(text: str) -> Dict[str, str]:
+    """
+    Parse .env content in a single pass
+    
+    Supports comments, blank lines, `export KEY=value`, single quotes (literal),
+    double quotes (with \\n, \\t, \\", \\\\ escapes) and quoted values that span
+    multiple lines. Later assignments win.
+    
+    Raises:
+        ValueError: If a quoted value is never closed
+    """
+    values = {}
+    pos = 0
+    end = len(text)
+    
+    while pos < end:
+        match = _ASSIGNMENT.match(text, pos)
+        if match is None:
+            # Blank line, comment or garbage: skip to the next line
+            newline = text.find('\n', pos)
+            pos = end if newline == -1 else newline + 1
+            continue
+        
+        key = match.group(1)
+        pos = match.end()
+        quote = text[pos] if pos < end else ''
+        
+        if quote == '"':
+            value_match = _DOUBLE_QUOTED.match(text, pos)
+            if value_match is None:
+                raise ValueError(f"Unterminated double-quoted value for '{key}' (line {text.count(chr(10), 0, pos) + 1})")
+            value = _ESCAPE.sub(_unescape, value_match.group(1))
+        elif quote == "'":
+            value_match = _SINGLE_QUOTED.match(text, pos)
+            if value_match is None:
+                raise ValueError(f"Unterminated single-quoted value for '{key}' (line {text.count(chr(10), 0, pos) + 1})")
+            value = value_match.group(1)
+        else:
+            value_match = _UNQUOTED.match(text, pos)
+            value = value_match.group(1).strip()
+        
+        values[key] = value
+        # Whatever follows the value on its line (e.g. a comment) is ignored
+        newline = text.find('\n', value_match.end())
+        pos = end if newline == -1 else newline + 1
+    
+    return values
+
+
+def build_index(values: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+    """Group PREFIX_KEY=value entries by prefix: {'PROD': {'URL': ...}, ...}"""
+    index: Dict[str, Dict[str, str]] = {}
+    for key, value in values.items():
+        prefix, sep, name = key.partition('_')
+        if sep and name:
+            index.setdefault(prefix, {})[name] = value
+    return index
+
+
+class EnvFile:
+    """Parsed .env file with a per-environment index of cleaned (unprefixed) keys"""
+
+    __slots__ = ('path', 'values', 'index')
+
+    def __init__(self, path: str, values: Dict[str, str], index: Dict[str, Dict[str, str]]):
+        self.path = path
+        self.values = values
+        self.index = index
+    
+    def export(self, keys: Iterable[str]):
+        """
+        Copy the given keys into os.environ, never overriding variables already set
+        
+        Everything else stays in the file's index: the process environment is
+        not grown by (and later scans do not walk) every key in the file.
+        """
+        for key in keys:
+            value = self.values.get(key)
+            if value is not None:
+                os.environ.setdefault(key, value)
+    
+    def environment(self, name: str) -> Dict[str, str]:
+        """Cleaned variables for an environment (NONPROD_URL -> URL for 'NONPROD')"""
+        prefix, sep, rest = name.partition('_')
+        group = self.index.get(prefix, {})
+        if not sep:
+            return group
+        # Environment names containing '_' (e.g. US_EAST): narrow the first-segment group
+        rest_prefix = rest + '_'
+        return {key[len(rest_prefix):]: value for key, value in group.items() if key.startswith(rest_prefix)}
+
+
+# In-process memo: path -> ((mtime_ns, size), EnvFile)
+_loaded: Dict[str, Tuple[Tuple[int, int], EnvFile]] = {}
+_lock = threading.Lock()
+
+
+def _cache_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'{name}.cache')
+
+
+def _read_cache(cache_path: str) -> Optional[Dict]:
+    """Read the compiled cache, or None if it is missing, corrupt or outdated"""
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, dict) or cached.get('version') != CACHE_VERSION:
+        return None
+    return cached
+
+
+def _write_cache(cache_path: str, stamp: Tuple[int, int], digest: str, values: Dict[str, str]):
+    """Atomically write the compiled cache; failures (read-only FS) are ignored"""
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            marshal.dump({'version': CACHE_VERSION, 'stamp': stamp, 'digest': digest, 'values': values}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def load(path: str, use_cache: bool = True) -> Optional[EnvFile]:
+    """
+    Load a .env file, reusing earlier work whenever the file is unchanged
+    
+    - In process: memoized by (mtime, size), so repeated EnvironmentConfig()
+      constructions never re-read the file
+    - On disk: a marshal-compiled `<file>.cache` next to it, valid while
+      (mtime, size) match; after a touch with identical content the SHA-256
+      digest revalidates it without re-parsing
+    
+    Returns None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    
+    with _lock:
+        memo = _loaded.get(path)
+        if memo is not None and memo[0] == stamp:
+            return memo[1]
+        
+        cache_path = _cache_path(path)
+        cached = _read_cache(cache_path) if use_cache else None
+        
+        if cached is not None and tuple(cached['stamp']) == stamp:
+            values = cached['values']
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if cached is not None and cached['digest'] == digest:
+                # Touched but unchanged: the cached parse is still valid
+                values = cached['values']
+            else:
+                values = parse(data.decode('utf-8'))
+            if use_cache:
+                _write_cache(cache_path, stamp, digest, values)
+        
+        env_file = EnvFile(path, values, build_index(values))
+        _loaded[path] = (stamp, env_file)
+        return env_file
@@ -0,0 +1,73 @@
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Iterable, List, Optional
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module lazily: the module body runs on first attribute access
+    
+    Keeps heavy or rarely used modules (boto3, sqlite3, http.client, ...) off
+    the cold start path until an invocation actually needs them.
+    
+    Args:
+        name: Fully qualified module name
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    
+    # Bind submodules on their parent like a regular import (http.client -> http.client)
+    parent_name, _, child_name = name.rpartition('.')
+    if parent_name:
+        setattr(sys.modules[parent_name], child_name, module)
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """Check whether a module has been imported and actually executed"""
+    module = sys.modules.get(name)
+    if module is None:
+        return False
+    # LazyLoader swaps the module class back to ModuleType once loaded
+    return type(module).__name__ != '_LazyModule'
+
+
+def preload(names: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Execute deferred imports now, e.g. during a warm-up invocation
+    
+    Args:
+        names: Modules to import; defaults to every lazily imported module
+            that has not been executed yet
+    
+    Returns:
+        Names of the modules that were actually executed by this call
+    """
+    if names is None:
+        names = [name for name, module in list(sys.modules.items()) if type(module).__name__ == '_LazyModule']
+    
+    loaded = []
+    for name in names:
+        if is_loaded(name):
+            continue
+        module = sys.modules.get(name)
+        if module is None:
+            importlib.import_module(name)
+        else:
+            # Any attribute access runs the deferred module body
+            getattr(module, '__dict__')
+        loaded.append(name)
+    return loaded
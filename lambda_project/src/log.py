@@ -0,0 +1,136 @@
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Per-invocation context attached to every record (one request per environment at a time)
+_request_context = {'request_id': None, 'cold_start': None}
+
+
+def set_request_context(request_id: Optional[str], cold_start: Optional[bool] = None):
+    """Set the request id and cold start flag stamped on subsequent log records"""
+    _request_context['request_id'] = request_id
+    _request_context['cold_start'] = cold_start
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as single-line JSON
+    
+    The message is only interpolated here, i.e. when a handler actually emits
+    the record, so `logger.debug("... %s", value)` costs nothing when DEBUG is off.
+    """
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': _request_context['request_id'],
+            'cold_start': _request_context['cold_start'],
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+# Plain format used with LOG_FORMAT=text when no handler is installed yet
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def configure_logging(level: str = 'INFO', fmt: str = 'json'):
+    """
+    Configure the root logger
+    
+    In Lambda the runtime already installs a root handler, which is reused.
+    
+    Args:
+        level: Log level name
+        fmt: 'json' for single-line JSON records, 'text' for the plain format
+    """
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+    
+    if fmt == 'json':
+        formatter = JsonFormatter()
+        for handler in root.handlers:
+            if not isinstance(handler.formatter, JsonFormatter):
+                # Kept so a reload back to 'text' restores it (e.g. the Lambda runtime's own)
+                handler._text_formatter = handler.formatter
+            handler.setFormatter(formatter)
+        return
+    
+    for handler in root.handlers:
+        if isinstance(handler.formatter, JsonFormatter):
+            handler.setFormatter(getattr(handler, '_text_formatter', None) or logging.Formatter(TEXT_FORMAT))
+
+
+class MetricsLogger:
+    """
+    CloudWatch Embedded Metric Format (EMF) emitter
+    
+    Metrics are buffered during an invocation and written by flush() as one
+    JSON line on stdout, which CloudWatch Logs turns into metrics with no
+    extra API call.
+    """
+
+    def __init__(self, namespace: str, dimensions: Optional[Dict[str, str]] = None, enabled: bool = True, stream=None):
+        self.namespace = namespace
+        self.dimensions = dict(dimensions or {})
+        self.enabled = enabled
+        self.stream = stream or sys.stdout
+        self._metrics: Dict[str, List] = {}
+        self._units: Dict[str, str] = {}
+        self._properties: Dict[str, object] = {}
+    
+    def put_metric(self, name: str, value: float, unit: str = 'None'):
+        """Record a metric value (values for the same name are aggregated in one record)"""
+        if not self.enabled:
+            return
+        self._metrics.setdefault(name, []).append(value)
+        self._units[name] = unit
+    
+    def set_property(self, key: str, value):
+        """Attach a searchable, non-metric property (e.g. the request id)"""
+        if self.enabled:
+            self._properties[key] = value
+    
+    def flush(self):
+        """Write buffered metrics as one EMF record and reset the buffer"""
+        if not self.enabled or not self._metrics:
+            return
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [list(self.dimensions)],
+                    'Metrics': [{'Name': name, 'Unit': self._units[name]} for name in self._metrics],
+                }],
+            },
+        }
+        record.update(self.dimensions)
+        record.update(self._properties)
+        for name, values in self._metrics.items():
+            record[name] = values[0] if len(values) == 1 else values
+        
+        self.stream.write(json.dumps(record, default=str) + '\n')
+        self.stream.flush()
+        self._metrics.clear()
+        self._units.clear()
+        self._properties.clear()
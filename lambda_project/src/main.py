@@ -1,65 +1,558 @@
 import json
 import logging
+import os
+import time
+from . import lazy
+from .batch import process_batch, process_batch_async
+from .cache import DirectoryBackend, ResponseCache
 from .config import config
-
-# Set up logging
-log_level = config.get('LOG_LEVEL', 'INFO')
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from .config_source import build_source
+from .connections import ConnectionManager
+from .encoding import JSON_CONTENT_TYPE, JSONSerializer, ResponseCompressor
+from .log import MetricsLogger, configure_logging, set_request_context
+from .profiling import Instrumentation
+from .resilience import (
+    CircuitOpenError, Deadline, DeadlineExceededError, RetryableError, call_with_retry,
+    call_with_retry_async, get_breaker
+)
+from .router import Request, Router, request_line
+from .schema import CONFIG_SCHEMA, SECRET_KEYS
+from .secret_store import build_provider
+from .streaming import (
+    NDJSON_CONTENT_TYPE, ResponseTooLargeError, StreamingResponse, cursor_rows, ndjson, write_response
 )
+from .warmup import Warmer, is_warmup_event
+
 logger = logging.getLogger(__name__)
 
+# Event loop helpers, loaded by the async handler and coroutine routes only, so a
+# synchronous deployment never imports asyncio
+aio = lazy.lazy_import(f'{__package__}.aio')
+
+# Missing or invalid keys fail the cold start instead of every request; with a
+# dynamic CONFIG_SOURCE, reloads replace this snapshot (see _on_config_change)
+_resolve_started = time.perf_counter()
+settings = config.load(CONFIG_SCHEMA, extra_keys=SECRET_KEYS)
+_resolve_ms = (time.perf_counter() - _resolve_started) * 1000
+
+# Set up logging (single-line JSON by default, formatted only when emitted)
+configure_logging(settings.log_level, settings.log_format)
+
+# Latency/error counters published through CloudWatch Embedded Metric Format
+metrics = MetricsLogger(
+    settings.metrics_namespace,
+    dimensions={'Environment': config.environment},
+    enabled=settings.metrics_enabled,
+)
+
+# Opt-in phase timings, memory high-water mark and sampled profiles (off unless INSTRUMENTATION_ENABLED)
+instrumentation = Instrumentation(
+    enabled=settings.instrumentation_enabled,
+    sample_rate=settings.profile_sample_rate,
+    profiler=settings.profiler,
+    profile_dir=settings.profile_dir,
+    metrics=metrics,
+)
+instrumentation.record('init_config', _resolve_ms)
+
+# Flipped by the first invocation in this execution environment
+_cold_start = True
+
+# Secrets backend; required secrets are fetched now so a missing one fails the cold start
+config.use_secrets(
+    build_provider(
+        settings.secrets_provider,
+        config.get,
+        location=settings.secrets_file,
+        prefix=settings.secrets_prefix,
+        endpoint_url=settings.secrets_endpoint_url,
+    ),
+    ttl=settings.secrets_ttl,
+)
+with instrumentation.phase('init_secrets'):
+    for _key in SECRET_KEYS:
+        config.get_secret(_key)
+
+# Pooled DB connections and keep-alive HTTP session, reused across warm invocations
+connections = ConnectionManager.from_settings(settings, lambda: config.get_secret('DATABASE_URL'))
+
+def _api_breaker():
+    return get_breaker(
+        'api',
+        failure_threshold=settings.circuit_failure_threshold,
+        reset_timeout=settings.circuit_reset_timeout,
+    )
+
+def _api_headers(headers):
+    # API key comes from the TTL-cached secrets provider (no store round trip when fresh)
+    return {'X-Api-Key': config.get_secret('API_KEY'), **(headers or {})}
+
+def _check_status(method, path, response):
+    if response.status >= 500:
+        raise RetryableError(f"{method} {path} returned {response.status}")
+    return response
+
+def call_api(method, path, deadline, body=None, headers=None):
+    """Call the URL backend with retries, backoff and its circuit breaker"""
+    headers = _api_headers(headers)
+    
+    def attempt(timeout):
+        response = connections.http.request(method, path, body=body, headers=headers, timeout=timeout)
+        return _check_status(method, path, response)
+    
+    return call_with_retry(
+        attempt,
+        max_retries=settings.max_retries,
+        timeout=settings.timeout,
+        deadline=deadline,
+        breaker=_api_breaker(),
+    )
+
+# Repeat and retried requests short-circuit here (in-process LRU, optional shared backend)
+response_cache = ResponseCache(
+    enabled=settings.response_cache_enabled,
+    max_entries=settings.response_cache_size,
+    ttl=settings.response_cache_ttl,
+    key_fields=[field.strip() for field in settings.response_cache_key.split(',') if field.strip()],
+    backend=DirectoryBackend(settings.response_cache_dir) if settings.response_cache_dir else None,
+)
+
+# Response encoding: fast JSON backend when available, compression negotiated per request
+serializer = JSONSerializer(settings.json_serializer)
+compressor = ResponseCompressor(settings.compression_enabled, settings.compression_min_size)
+
+_RESPONSE_HEADERS = {
+    'Content-Type': JSON_CONTENT_TYPE,
+    'Access-Control-Allow-Origin': '*'
+}
+
+def _static_body():
+    return serializer.fragment({
+        'message': 'Hello from Lambda!',
+        'environment': config.environment,
+        'api_url': settings.url,
+        'debug_mode': settings.debug,
+        'max_retries': settings.max_retries,
+        'timeout': settings.timeout,
+        'is_lambda': config.is_lambda,
+    })
+
+# Response fields that only change with the configuration, encoded once per snapshot
+_STATIC_BODY = _static_body()
+
+_ERROR_BODIES = {
+    400: serializer.dumps({'error': 'Bad request'}),
+    404: serializer.dumps({'error': 'Not found'}),
+    405: serializer.dumps({'error': 'Method not allowed'}),
+    503: serializer.dumps({'error': 'Service temporarily unavailable'}),
+    504: serializer.dumps({'error': 'Upstream timeout'}),
+    500: serializer.dumps({'error': 'Internal server error'}),
+}
+
+def _on_config_change(new_settings, changed):
+    """Re-apply reloadable settings after a dynamic config reload (runs on the poller thread)"""
+    global settings, _STATIC_BODY
+    settings = new_settings
+    _STATIC_BODY = _static_body()
+    
+    if changed & {'log_level', 'log_format'}:
+        configure_logging(settings.log_level, settings.log_format)
+    metrics.enabled = settings.metrics_enabled
+    compressor.enabled = settings.compression_enabled
+    compressor.min_size = settings.compression_min_size
+    response_cache.enabled = settings.response_cache_enabled
+    instrumentation.enabled = settings.instrumentation_enabled
+    instrumentation.sample_rate = settings.profile_sample_rate
+    # Pool sizes, secrets and circuit breaker settings apply to new execution environments only
+
+# Feature flags, LOG_LEVEL, ... from a polled file or the AppConfig extension, without a redeploy
+config.on_change(_on_config_change)
+if settings.config_source:
+    config.use_dynamic_source(
+        build_source(settings.config_source, settings.config_source_location),
+        interval=settings.config_poll_interval,
+    )
+
+# Async facades over the same pools, created on first use and kept across warm invocations
+_async_clients = {}
+
+def async_http():
+    """Async client for the URL backend (ASYNC_CONCURRENCY requests in flight)"""
+    if 'http' not in _async_clients:
+        _async_clients['http'] = aio.AsyncHTTPClient(connections.http, settings.async_concurrency)
+    return _async_clients['http']
+
+def async_database():
+    """Async client for DATABASE_URL"""
+    if 'database' not in _async_clients:
+        _async_clients['database'] = aio.AsyncDatabase(
+            connections.database, settings.async_concurrency, timeout=settings.timeout
+        )
+    return _async_clients['database']
+
+async def call_api_async(method, path, deadline, body=None, headers=None):
+    """Coroutine version of call_api, for overlapping independent backend calls"""
+    headers = _api_headers(headers)
+    
+    async def attempt(timeout):
+        response = await async_http().request(method, path, body=body, headers=headers, timeout=timeout)
+        return _check_status(method, path, response)
+    
+    return await call_with_retry_async(
+        attempt,
+        max_retries=settings.max_retries,
+        timeout=settings.timeout,
+        deadline=deadline,
+        breaker=_api_breaker(),
+    )
+
+def _begin_invocation(context):
+    """Stamp the request id and cold start flag on logs and metrics"""
+    global _cold_start
+    cold_start, _cold_start = _cold_start, False
+    request_id = getattr(context, 'aws_request_id', None)
+    set_request_context(request_id, cold_start)
+    metrics.set_property('requestId', request_id)
+    metrics.put_metric('ColdStart', int(cold_start), 'Count')
+    return cold_start
+
+def _finish_invocation(event, response, started, cache_hit=False):
+    """Compress the response for the client and record latency and error metrics"""
+    with instrumentation.phase('compress'):
+        response = compressor.compress(event, response)
+    metrics.put_metric('CacheHit', int(cache_hit), 'Count')
+    metrics.put_metric('Latency', (time.perf_counter() - started) * 1000, 'Milliseconds')
+    metrics.put_metric('Errors', int(response['statusCode'] >= 500), 'Count')
+    return response
+
+def _serve(event, context, handle):
+    """Run an API Gateway request through the response cache, instrumentation and metrics"""
+    started = time.perf_counter()
+    cold_start = _begin_invocation(context)
+    if is_warmup_event(event):
+        return _warm_up(cold_start, started)
+    
+    with instrumentation.invocation(context, cold_start):
+        with instrumentation.phase('cache'):
+            response = response_cache.lookup(event)
+        cache_hit = response is not None
+        if not cache_hit:
+            response = handle(event, context)
+            with instrumentation.phase('cache'):
+                response_cache.store(event, response)
+        response = _finish_invocation(event, response, started, cache_hit)
+    
+    metrics.flush()
+    return response
+
+# Eager initialization for warm-up pings and provisioned concurrency, so that
+# the first real request doesn't pay for connection setup and deferred imports
+warmer = Warmer()
+
+@warmer.step('secrets')
+def _warm_secrets():
+    for key in SECRET_KEYS:
+        config.get_secret(key)
+
+@warmer.step('connections')
+def _warm_connections():
+    connections.warm(settings.warmup_connections)
+
+@warmer.step('encoding')
+def _warm_encoding():
+    _build_response(None)
+    compressor.negotiate('br, gzip')
+
+@warmer.step('event_loop')
+def _warm_event_loop():
+    aio.get_loop()
+
+@warmer.step('routes')
+def _warm_routes():
+    for route in router.routes:
+        route.handler
+
+@warmer.step('imports')
+def _warm_imports():
+    lazy.preload()
+
+def _warm_up(cold_start, started):
+    """Answer a warm-up ping after running every initialization step"""
+    steps = warmer.run()
+    metrics.put_metric('WarmUp', 1, 'Count')
+    metrics.put_metric('WarmUpDuration', (time.perf_counter() - started) * 1000, 'Milliseconds')
+    metrics.flush()
+    return {
+        'statusCode': 200,
+        'headers': dict(_RESPONSE_HEADERS),
+        'body': serializer.dumps({'warmup': True, 'cold_start': cold_start, 'steps_ms': steps}),
+    }
+
 def handler(event, context):
     """Lambda handler function"""
-    try:
-        # Get configuration values (works both locally and in Lambda)
-        api_url = config.get_required('URL')
-        api_key = config.get_required('API_KEY')
-        database_url = config.get_required('DATABASE_URL')
-        debug_mode = config.get_bool('DEBUG', False)
-        max_retries = config.get_int('MAX_RETRIES', 3)
-        timeout = config.get_int('TIMEOUT', 30)
-        
-        # Log configuration (only in debug mode)
-        if debug_mode:
-            logger.debug(f"Configuration: {config.debug_info()}")
-        
-        logger.info(f"Processing request in {config.environment} environment")
-        
-        # Your business logic here
-        response_data = {
-            'message': 'Hello from Lambda!',
-            'environment': config.environment,
-            'api_url': api_url,
-            'debug_mode': debug_mode,
-            'max_retries': max_retries,
-            'timeout': timeout,
-            'is_lambda': config.is_lambda,
-            'timestamp': context.aws_request_id if hasattr(context, 'aws_request_id') else 'local-test'
-        }
-        
+    return _serve(event, context, _handle_request)
+
+def stream_handler(event, context, response_stream):
+    """
+    Lambda handler for response streaming: writes the response as it is produced
+    
+    `response_stream` is the invocation's response stream (anything with a
+    blocking write(bytes)); the output is the HTTP integration format of
+    function URLs with InvokeMode RESPONSE_STREAM: a JSON prelude with the
+    status and headers, eight NUL bytes, then the body. StreamingResponse
+    routes are written chunk by chunk and bypass the response cache and
+    compression; other routes are written in one piece.
+    """
+    started = time.perf_counter()
+    cold_start = _begin_invocation(context)
+    if is_warmup_event(event):
+        write_response(response_stream, _warm_up(cold_start, started))
+        return
+    
+    with instrumentation.invocation(context, cold_start):
+        response = _handle_request(event, context, stream=True)
+        if not isinstance(response, StreamingResponse):
+            write_response(response_stream, _finish_invocation(event, response, started))
+        else:
+            try:
+                with instrumentation.phase('stream'):
+                    sent = response.write_to(response_stream, settings.stream_chunk_size, settings.stream_flush_interval)
+            except Exception as e:
+                # Status and headers are already on the wire; all that is left is to stop
+                logger.exception("Streaming the response failed: %s", e)
+                metrics.put_metric('Errors', 1, 'Count')
+            else:
+                metrics.put_metric('StreamedBytes', sent['bytes'], 'Bytes')
+                metrics.put_metric('TimeToFirstByte', sent['first_byte_ms'], 'Milliseconds')
+                metrics.put_metric('Errors', int(response.status_code >= 500), 'Count')
+            metrics.put_metric('Latency', (time.perf_counter() - started) * 1000, 'Milliseconds')
+    
+    metrics.flush()
+
+def _run_async(event, context):
+    return aio.run(_handle_request_async(event, context))
+
+def async_handler(event, context):
+    """Lambda handler running the request on the persistent event loop (I/O fan-out)"""
+    return _serve(event, context, _run_async)
+
+def _start_request(context):
+    """Common request setup: deadline budget and debug logging"""
+    # Retries and downstream calls must fit in the invocation's remaining time
+    deadline = Deadline(context, default_timeout=settings.timeout)
+    
+    # Log configuration (only in debug mode, and only built if DEBUG is emitted)
+    if settings.debug and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Configuration: %s", config.debug_info())
+    
+    logger.info("Processing request in %s environment", config.environment)
+    return deadline
+
+def _build_response(context, extra=None):
+    """Build the API Gateway response for a successful request (extra keys must not repeat static ones)"""
+    response_data = {
+        'timestamp': context.aws_request_id if hasattr(context, 'aws_request_id') else 'local-test'
+    }
+    if extra:
+        response_data.update(extra)
+    
+    with instrumentation.phase('serialize'):
+        body = serializer.dumps_with(_STATIC_BODY, response_data)
+    
+    return {
+        'statusCode': 200,
+        'headers': dict(_RESPONSE_HEADERS),
+        'body': body
+    }
+
+def _error_response(error):
+    """Map an exception to an API Gateway error response"""
+    if isinstance(error, CircuitOpenError):
+        logger.warning("Shedding request: %s", error)
         return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps(response_data)
+            'statusCode': 503,
+            'headers': dict(_RESPONSE_HEADERS),
+            'body': _ERROR_BODIES[503]
         }
-        
-    except ValueError as e:
-        logger.error(f"Configuration error: {str(e)}")
+    if isinstance(error, DeadlineExceededError):
+        logger.error("Deadline exceeded: %s", error)
         return {
-            'statusCode': 500,
-            'body': json.dumps({'error': f'Configuration error: {str(e)}'})
+            'statusCode': 504,
+            'headers': dict(_RESPONSE_HEADERS),
+            'body': _ERROR_BODIES[504]
         }
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+    if isinstance(error, ResponseTooLargeError):
+        logger.error("Response too large: %s", error)
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': 'Internal server error'})
+            'headers': dict(_RESPONSE_HEADERS),
+            'body': _ERROR_BODIES[500]
         }
+    logger.exception("Unexpected error: %s", error)
+    return {
+        'statusCode': 500,
+        'headers': dict(_RESPONSE_HEADERS),
+        'body': _ERROR_BODIES[500]
+    }
+
+def _hello(request):
+    """Default route: the environment/settings echo"""
+    return _build_response(request.context)
+
+# Example streaming route: generated rows straight from a database cursor, so memory
+# stays flat however many are requested (GET /export?rows=100000)
+_EXPORT_QUERY = (
+    "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {rows}) "
+    "SELECT n AS id, 'item-' || n AS name FROM seq"
+)
+_EXPORT_MAX_ROWS = 10_000_000
+
+def _export(request):
+    """Stream rows as NDJSON (collected into one body by the buffered handler)"""
+    try:
+        rows = min(max(int(request.query.get('rows', 1000)), 1), _EXPORT_MAX_ROWS)
+    except ValueError:
+        return {'statusCode': 400, 'headers': dict(_RESPONSE_HEADERS), 'body': _ERROR_BODIES[400]}
+    
+    def export_rows():
+        # The connection stays checked out while the stream is written, and is
+        # returned when the generator finishes or is closed
+        with connections.database.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(_EXPORT_QUERY.format(rows=rows))
+            yield from ndjson(cursor_rows(cursor), serializer.dumps)
+    
+    headers = dict(_RESPONSE_HEADERS, **{'Content-Type': NDJSON_CONTENT_TYPE})
+    return StreamingResponse(export_rows(), headers=headers)
+
+# Routes, compiled into lookup tables at import. String targets are imported on their
+# first request, so endpoints consolidated into this function add nothing to the cold start
+router = Router(package=__package__)
+router.add('GET', '/health', '.routes.health:health')
+router.add('GET', '/export', _export, name='export')
+router.add('ANY', '/', _hello, name='hello')
+router.add('ANY', '/{proxy+}', _hello, name='hello')
+router.compile()
+
+def _route(event, context, deadline):
+    """Match the event to a route: (route, request), or (None, error response)"""
+    method, path = request_line(event)
+    found = router.match(method, path)
+    if found is None:
+        allowed = router.allowed_methods(path)
+        status = 405 if allowed else 404
+        headers = dict(_RESPONSE_HEADERS, Allow=', '.join(allowed)) if allowed else dict(_RESPONSE_HEADERS)
+        return None, {'statusCode': status, 'headers': headers, 'body': _ERROR_BODIES[status]}
+    
+    route, params = found
+    return route, Request(event, context, method, path, params, deadline)
+
+def _route_response(route, result, started, stream=False):
+    """Publish route timing and turn a route's return value into an API Gateway response"""
+    metrics.set_property('route', route.name)
+    metrics.put_metric(f'Route.{route.name}.Latency', (time.perf_counter() - started) * 1000, 'Milliseconds')
+    if isinstance(result, StreamingResponse):
+        if stream:
+            return result
+        # A buffered invocation has to hold the whole body, up to the payload limit
+        with instrumentation.phase('serialize'):
+            return result.collect(settings.stream_buffer_limit)
+    if isinstance(result, dict) and 'statusCode' in result:
+        return result
+    with instrumentation.phase('serialize'):
+        body = serializer.dumps(result)
+    return {'statusCode': 200, 'headers': dict(_RESPONSE_HEADERS), 'body': body}
+
+def _handle_request(event, context, stream=False):
+    """Handle one API Gateway request (stream: let StreamingResponse results through unbuffered)"""
+    try:
+        deadline = _start_request(context)
+        route, request = _route(event, context, deadline)
+        if route is None:
+            return request
+        
+        # Business logic lives in the route functions, e.g. call_api('GET', '/items', request.deadline)
+        started = time.perf_counter()
+        with instrumentation.phase('business'):
+            result = route.handler(request)
+            if hasattr(result, '__await__'):
+                result = aio.run(result)
+        return _route_response(route, result, started, stream)
+        
+    except Exception as e:
+        return _error_response(e)
+
+async def _handle_request_async(event, context):
+    """Handle one API Gateway request with overlapping downstream calls"""
+    try:
+        deadline = _start_request(context)
+        route, request = _route(event, context, deadline)
+        if route is None:
+            return request
+        
+        # Coroutine routes can overlap independent calls, e.g.
+        #   items, user = await aio.gather_bounded(
+        #       [call_api_async('GET', '/items', deadline), call_api_async('GET', '/user', deadline)],
+        #       limit=settings.async_concurrency,
+        #   )
+        started = time.perf_counter()
+        with instrumentation.phase('business'):
+            result = route.handler(request)
+            if hasattr(result, '__await__'):
+                result = await result
+        return _route_response(route, result, started)
+        
+    except Exception as e:
+        return _error_response(e)
+
+def process_record(record):
+    """Process a single queue/stream record (raise to have it retried)"""
+    body = record.get('body')
+    if body is None and 'kinesis' in record:
+        body = record['kinesis'].get('data')
+    
+    # Your business logic here
+    logger.debug("Processing record %s", body)
+
+async def process_record_async(record):
+    """Coroutine version of process_record, for records that await downstream calls"""
+    process_record(record)
+
+def _serve_batch(event, context, process):
+    """Run a batch through warm-up handling, instrumentation and metrics"""
+    started = time.perf_counter()
+    cold_start = _begin_invocation(context)
+    if is_warmup_event(event):
+        _warm_up(cold_start, started)
+        return {'batchItemFailures': []}
+    
+    with instrumentation.invocation(context, cold_start):
+        with instrumentation.phase('business'):
+            response = process(event)
+        
+        metrics.put_metric('Latency', (time.perf_counter() - started) * 1000, 'Milliseconds')
+        metrics.put_metric('BatchSize', len(event.get('Records') or []), 'Count')
+        metrics.put_metric('BatchFailures', len(response['batchItemFailures']), 'Count')
+    
+    metrics.flush()
+    return response
+
+def batch_handler(event, context):
+    """Lambda handler for SQS/Kinesis batches with partial batch failure reporting"""
+    return _serve_batch(
+        event, context, lambda batch: process_batch(batch, process_record, max_workers=settings.batch_concurrency)
+    )
+
+def async_batch_handler(event, context):
+    """Like batch_handler, with up to ASYNC_CONCURRENCY records awaited at once on the persistent event loop"""
+    return _serve_batch(
+        event, context,
+        lambda batch: aio.run(process_batch_async(batch, process_record_async, settings.async_concurrency)),
+    )
+
+# Provisioned concurrency runs module init ahead of traffic; finish warming up there too
+if settings.warmup_on_init or os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency':
+    warmer.run()
 
 # Local entry point for testing
 if __name__ == "__main__":
@@ -0,0 +1,243 @@
+import io
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, Optional
+
+from .lazy import lazy_import
+
+# Only imported when an invocation is actually profiled
+cProfile = lazy_import('cProfile')
+pstats = lazy_import('pstats')
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ('cprofile', 'sample')
+
+_NO_PHASE = nullcontext()
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB (None where getrusage is unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StackSampler:
+    """
+    Low-overhead sampling profiler for one thread
+    
+    A daemon thread records the target thread's stack every `interval`
+    seconds. Samples are kept as collapsed stacks (`outer;inner count`),
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+    
+    def enable(self):
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._sampler.start()
+    
+    def disable(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+    
+    def collapsed(self) -> str:
+        """Samples in collapsed stack format, one stack per line"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+    
+    def dump_stats(self, path: str):
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+    
+    def summary(self, top: int) -> str:
+        total = sum(self.samples.values()) or 1
+        return '\n'.join(
+            f'{count * 100 / total:5.1f}% {stack}' for stack, count in self.samples.most_common(top)
+        )
+
+
+class Invocation:
+    """Measurements for one invocation, filled in by Instrumentation"""
+
+    __slots__ = ('request_id', 'cold_start', 'sampled', 'phases', 'profiler', 'started')
+    
+    def __init__(self, request_id: Optional[str], cold_start: bool, sampled: bool):
+        self.request_id = request_id
+        self.cold_start = cold_start
+        self.sampled = sampled
+        self.phases: Dict[str, float] = {}
+        self.profiler: Any = None
+        self.started = time.perf_counter()
+
+
+class Instrumentation:
+    """
+    Opt-in per-invocation timing and profiling
+    
+    Disabled instances cost one attribute check per phase. When enabled,
+    every invocation logs its phase timings (ms), cold/warm flag and memory
+    high-water mark against the function's memory limit, and a random
+    `sample_rate` fraction of invocations is profiled. Profiles are written
+    to `profile_dir` (e.g. /tmp in Lambda) or, without one, summarized in
+    the log record.
+    
+    Lambda runs one invocation per execution environment at a time, so the
+    current invocation is tracked on the instance.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 0.0,
+        profiler: str = 'cprofile',
+        profile_dir: Optional[str] = None,
+        top: int = 25,
+        metrics=None,
+    ):
+        """
+        Args:
+            enabled: Record phases and memory for every invocation
+            sample_rate: Fraction of invocations to profile (0.0 - 1.0)
+            profiler: 'cprofile' (deterministic) or 'sample' (stack sampling, lower overhead)
+            profile_dir: Directory for profile dumps (.prof for cprofile, .folded for sample)
+            top: Number of functions/stacks in a logged profile summary
+            metrics: MetricsLogger for phase and memory metrics
+        """
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {PROFILERS}")
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.top = top
+        self.metrics = metrics
+        self._current: Optional[Invocation] = None
+        self._init_phases: Dict[str, float] = {}
+    
+    def record(self, name: str, duration_ms: float):
+        """Record a phase measured elsewhere (e.g. cold start work before the first invocation)"""
+        if not self.enabled:
+            return
+        if self._current is None:
+            self._init_phases[name] = self._init_phases.get(name, 0.0) + duration_ms
+        else:
+            phases = self._current.phases
+            phases[name] = phases.get(name, 0.0) + duration_ms
+    
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+    
+    def phase(self, name: str):
+        """Context manager timing a named phase (repeated phases are summed)"""
+        if not self.enabled:
+            return _NO_PHASE
+        return self._timed(name)
+    
+    def _start_profiler(self):
+        profiler = cProfile.Profile() if self.profiler == 'cprofile' else StackSampler()
+        profiler.enable()
+        return profiler
+    
+    @contextmanager
+    def invocation(self, context, cold_start: bool) -> Iterator[Optional[Invocation]]:
+        """Measure one invocation; wraps the whole handler body"""
+        if not self.enabled:
+            yield None
+            return
+        
+        request_id = getattr(context, 'aws_request_id', None)
+        current = Invocation(request_id, cold_start, random.random() < self.sample_rate)
+        # Cold start work (config resolution, imports) is reported with the first invocation
+        current.phases.update(self._init_phases)
+        self._init_phases.clear()
+        self._current = current
+        if current.sampled:
+            current.profiler = self._start_profiler()
+        try:
+            yield current
+        finally:
+            if current.profiler is not None:
+                current.profiler.disable()
+            self._current = None
+            self._report(context, current)
+    
+    def _profile_summary(self, profiler) -> str:
+        if isinstance(profiler, StackSampler):
+            return profiler.summary(self.top)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(self.top)
+        return out.getvalue()
+    
+    def _dump_profile(self, current: Invocation) -> Dict[str, Any]:
+        profiler = current.profiler
+        if self.profile_dir:
+            suffix = 'folded' if isinstance(profiler, StackSampler) else 'prof'
+            name = f"{current.request_id or int(time.time() * 1000)}.{suffix}"
+            path = os.path.join(self.profile_dir, name)
+            try:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(path)
+                return {'profile_path': path}
+            except OSError as e:
+                logger.warning("Could not write profile to %s: %s", path, e)
+        return {'profile': self._profile_summary(profiler)}
+    
+    def _report(self, context, current: Invocation):
+        total_ms = (time.perf_counter() - current.started) * 1000
+        peak_mb = max_rss_mb()
+        limit_mb = getattr(context, 'memory_limit_in_mb', None)
+        
+        details: Dict[str, Any] = {
+            'cold_start': current.cold_start,
+            'duration_ms': round(total_ms, 3),
+            'phases_ms': {name: round(value, 3) for name, value in current.phases.items()},
+            'max_memory_mb': round(peak_mb, 1) if peak_mb is not None else None,
+            'memory_limit_mb': int(limit_mb) if limit_mb else None,
+        }
+        if peak_mb is not None and limit_mb:
+            details['memory_used_pct'] = round(peak_mb * 100 / int(limit_mb), 1)
+        if current.profiler is not None:
+            details.update(self._dump_profile(current))
+        
+        logger.info("Invocation profile", extra={'instrumentation': details})
+        
+        if self.metrics is not None:
+            for name, value in current.phases.items():
+                self.metrics.put_metric(f'Phase.{name}', value, 'Milliseconds')
+            if peak_mb is not None:
+                self.metrics.put_metric('MaxMemoryUsed', peak_mb, 'Megabytes')
@@ -0,0 +1,267 @@
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+from .lazy import lazy_import
+
+# Only needed by call_with_retry_async; keeps asyncio off the synchronous cold start
+asyncio = lazy_import('asyncio')
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is shed because the downstream's circuit is open"""
+
+
+class RetryableError(Exception):
+    """Raise from a call to mark a failure (e.g. an HTTP 5xx) as retryable"""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when the invocation's remaining time budget is used up"""
+
+
+class Deadline:
+    """Time budget for one invocation, derived from the Lambda context"""
+
+    def __init__(self, context=None, default_timeout: float = 30, safety_margin: float = 0.5):
+        """
+        Args:
+            context: Lambda context; its get_remaining_time_in_millis() sets the budget
+            default_timeout: Budget in seconds when the context has no remaining time
+            safety_margin: Seconds kept in reserve to return a response
+        """
+        get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+        budget = get_remaining() / 1000 if get_remaining else default_timeout
+        self.expires_at = time.monotonic() + budget - safety_margin
+    
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def backoff_delays(base: float = 0.1, cap: float = 5.0) -> Iterator[float]:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**n))"""
+    attempt = 0
+    while True:
+        yield random.uniform(0, min(cap, base * (2 ** attempt)))
+        attempt += 1
+
+
+class CircuitBreaker:
+    """
+    Per-downstream circuit breaker
+    
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast for `reset_timeout` seconds. Then one trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Check whether a call may proceed (moves open -> half-open after the timeout)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let exactly one trial call through
+                self.state = self.HALF_OPEN
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self._record_failure()
+    
+    def _record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit '%s' opened after %d failures", self.name, self.failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def abort_trial(self):
+        """
+        Re-open the circuit if the half-open trial call ended without an outcome
+        
+        Used for exceptions that are not downstream failures (a bug, a
+        cancellation): without it the circuit would stay half-open and shed
+        every later call.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._record_failure()
+
+
+# Breakers live in module scope so their state carries across warm invocations
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for a named downstream"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+        return breaker
+
+
+def call_with_retry(
+    func: Callable[[float], T],
+    max_retries: int = 3,
+    timeout: float = 30,
+    deadline: Optional[Deadline] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    retry_on: Tuple[Type[BaseException], ...] = (OSError, RetryableError),
+    base_delay: float = 0.1,
+    max_delay: float = 5.0,
+) -> T:
+    """
+    Call func with retries, backoff, a circuit breaker and a deadline budget
+    
+    Args:
+        func: Called with the timeout (seconds) allowed for this attempt
+        max_retries: Retries after the first attempt (the MAX_RETRIES setting)
+        timeout: Upper bound per attempt (the TIMEOUT setting)
+        deadline: Invocation budget; attempts and sleeps never exceed it
+        breaker: Circuit breaker for the downstream being called
+        retry_on: Exception types that count as retryable downstream failures
+        base_delay: First backoff ceiling in seconds
+        max_delay: Backoff ceiling cap in seconds
+    
+    Raises:
+        CircuitOpenError: The downstream circuit is open
+        DeadlineExceededError: No time left for another attempt
+    """
+    delays = backoff_delays(base_delay, max_delay)
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit '{breaker.name}' is open")
+        
+        attempt_timeout = timeout
+        if deadline is not None:
+            attempt_timeout = min(timeout, deadline.remaining())
+            if attempt_timeout <= 0:
+                raise DeadlineExceededError("Invocation deadline exceeded before attempt")
+        
+        try:
+            result = func(attempt_timeout)
+        except (DeadlineExceededError, CircuitOpenError):
+            # From a nested call: no time left, or another downstream shedding load.
+            # Neither is this downstream failing, so no retry and no failure recorded
+            # (DeadlineExceededError is an OSError and would match retry_on)
+            if breaker is not None:
+                breaker.abort_trial()
+            raise
+        except retry_on as e:
+            if breaker is not None:
+                breaker.record_failure()
+                if breaker.state == CircuitBreaker.OPEN:
+                    # Shed load now rather than sleeping towards a known-bad backend
+                    raise CircuitOpenError(f"Circuit '{breaker.name}' is open") from e
+            if attempt >= max_retries:
+                raise
+            
+            delay = next(delays)
+            if deadline is not None and delay >= deadline.remaining():
+                raise DeadlineExceededError("Invocation deadline exceeded during retries") from e
+            
+            attempt += 1
+            logger.info("Attempt %d failed (%s); retrying in %.3fs", attempt, e, delay)
+            time.sleep(delay)
+            continue
+        except BaseException:
+            if breaker is not None:
+                breaker.abort_trial()
+            raise
+        
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def call_with_retry_async(
+    func: Callable[[float], Awaitable[T]],
+    max_retries: int = 3,
+    timeout: float = 30,
+    deadline: Optional[Deadline] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    retry_on: Tuple[Type[BaseException], ...] = (OSError, RetryableError),
+    base_delay: float = 0.1,
+    max_delay: float = 5.0,
+) -> T:
+    """
+    Coroutine version of call_with_retry: sleeps with asyncio.sleep, and each
+    attempt is cancelled once its timeout (capped by the deadline) runs out
+    """
+    delays = backoff_delays(base_delay, max_delay)
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit '{breaker.name}' is open")
+        
+        attempt_timeout = timeout
+        if deadline is not None:
+            attempt_timeout = min(timeout, deadline.remaining())
+            if attempt_timeout <= 0:
+                raise DeadlineExceededError("Invocation deadline exceeded before attempt")
+        
+        try:
+            result = await asyncio.wait_for(func(attempt_timeout), attempt_timeout)
+        except (DeadlineExceededError, CircuitOpenError):
+            # Not this downstream failing, see call_with_retry
+            if breaker is not None:
+                breaker.abort_trial()
+            raise
+        except retry_on + (asyncio.TimeoutError,) as e:
+            if breaker is not None:
+                breaker.record_failure()
+                if breaker.state == CircuitBreaker.OPEN:
+                    raise CircuitOpenError(f"Circuit '{breaker.name}' is open") from e
+            if attempt >= max_retries:
+                raise
+            
+            delay = next(delays)
+            if deadline is not None and delay >= deadline.remaining():
+                raise DeadlineExceededError("Invocation deadline exceeded during retries") from e
+            
+            attempt += 1
+            logger.info("Attempt %d failed (%s); retrying in %.3fs", attempt, e, delay)
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            if breaker is not None:
+                breaker.abort_trial()
+            raise
+        
+        if breaker is not None:
+            breaker.record_success()
+        return result
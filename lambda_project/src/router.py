@@ -0,0 +1,196 @@
+import base64
+import importlib
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+ANY = 'ANY'
+
+# {name} matches one path segment, {name+} the rest of the path (API Gateway greedy syntax)
+_PARAM = re.compile(r'\{(\w+)(\+?)\}')
+
+
+class Request:
+    """The parts of an API Gateway event (REST v1 or HTTP API v2) a route needs"""
+
+    __slots__ = ('event', 'context', 'method', 'path', 'params', 'deadline')
+    
+    def __init__(self, event: Dict[str, Any], context, method: str, path: str,
+                 params: Dict[str, str], deadline=None):
+        self.event = event
+        self.context = context
+        self.method = method
+        self.path = path
+        self.params = params
+        self.deadline = deadline
+    
+    @property
+    def query(self) -> Dict[str, str]:
+        return self.event.get('queryStringParameters') or {}
+    
+    @property
+    def headers(self) -> Dict[str, str]:
+        return self.event.get('headers') or {}
+    
+    @property
+    def body(self) -> bytes:
+        body = self.event.get('body') or ''
+        if self.event.get('isBase64Encoded'):
+            return base64.b64decode(body)
+        return body.encode('utf-8')
+    
+    def json(self) -> Any:
+        return json.loads(self.body or b'null')
+
+
+def request_line(event: Dict[str, Any]) -> Tuple[str, str]:
+    """(method, path) of an API Gateway event, REST (v1) or HTTP API (v2) format"""
+    http = (event.get('requestContext') or {}).get('http') or {}
+    method = event.get('httpMethod') or http.get('method') or 'GET'
+    path = event.get('path') or event.get('rawPath') or '/'
+    return method.upper(), path
+
+
+class Route:
+    """One registered route; a 'module:function' target is imported on its first request"""
+
+    __slots__ = ('method', 'pattern', 'name', '_target', '_package')
+    
+    def __init__(self, method: str, pattern: str, target: Union[str, Callable], name: str, package: Optional[str]):
+        self.method = method
+        self.pattern = pattern
+        self.name = name
+        self._target = target
+        self._package = package
+    
+    @property
+    def loaded(self) -> bool:
+        return not isinstance(self._target, str)
+    
+    @property
+    def handler(self) -> Callable:
+        """The route function, importing its module on first access"""
+        if isinstance(self._target, str):
+            module_name, _, attr = self._target.partition(':')
+            module = importlib.import_module(module_name, self._package)
+            self._target = getattr(module, attr)
+        return self._target
+
+
+def _normalize(path: str) -> str:
+    return path.rstrip('/') or '/'
+
+
+def _compile_pattern(pattern: str, group_prefix: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Regex source for a pattern, with group names made unique by group_prefix"""
+    source = []
+    params = []
+    position = 0
+    for match in _PARAM.finditer(pattern):
+        source.append(re.escape(pattern[position:match.start()]))
+        name, greedy = match.group(1), match.group(2)
+        group = f'{group_prefix}_{name}'
+        source.append(f'(?P<{group}>.+)' if greedy else f'(?P<{group}>[^/]+)')
+        params.append((group, name))
+        position = match.end()
+    source.append(re.escape(pattern[position:]))
+    return ''.join(source), params
+
+
+class Router:
+    """
+    Method + path router compiled once, before the first request
+    
+    Static paths are a dict lookup. Parameterized paths are combined into
+    one alternation regex per method, so matching is a single regex call
+    regardless of the number of routes. Routes are tried in registration
+    order (static routes first).
+    """
+
+    def __init__(self, package: Optional[str] = None):
+        """
+        Args:
+            package: Anchor for relative 'module:function' targets ('.routes.items:get_item')
+        """
+        self.package = package
+        self.routes: List[Route] = []
+        self._static: Dict[Tuple[str, str], Route] = {}
+        self._dynamic: Dict[str, Tuple[Any, Dict[str, Tuple[Route, List[Tuple[str, str]]]]]] = {}
+        self._compiled = False
+    
+    def add(self, method: str, pattern: str, target: Union[str, Callable], name: Optional[str] = None) -> Route:
+        """
+        Register a route
+        
+        Args:
+            method: HTTP method, or 'ANY'
+            pattern: Path such as '/items/{item_id}' or '/files/{path+}'
+            target: Function taking a Request, or 'module:function' imported on first use
+            name: Name used in metrics (defaults to the function name)
+        """
+        if name is None:
+            name = target.rpartition(':')[2] if isinstance(target, str) else target.__name__
+        route = Route(method.upper(), _normalize(pattern), target, name, self.package)
+        self.routes.append(route)
+        self._compiled = False
+        return route
+    
+    def route(self, method: str, pattern: str, name: Optional[str] = None) -> Callable[[Callable], Callable]:
+        """Decorator form of add() for functions defined next to the router"""
+        
+        def register(func: Callable) -> Callable:
+            self.add(method, pattern, func, name)
+            return func
+        
+        return register
+    
+    def compile(self):
+        """Build the lookup tables (done automatically on the first match)"""
+        self._static = {}
+        dynamic: Dict[str, List[Tuple[int, Route]]] = {}
+        methods = {route.method for route in self.routes} | {ANY}
+        for index, route in enumerate(self.routes):
+            if not _PARAM.search(route.pattern):
+                self._static.setdefault((route.method, route.pattern), route)
+                continue
+            for method in methods:
+                if route.method in (method, ANY):
+                    dynamic.setdefault(method, []).append((index, route))
+        
+        self._dynamic = {}
+        for method, entries in dynamic.items():
+            alternatives = []
+            groups = {}
+            for index, route in entries:
+                source, params = _compile_pattern(route.pattern, f'r{index}')
+                alternatives.append(f'(?P<route{index}>{source})')
+                groups[f'route{index}'] = (route, params)
+            self._dynamic[method] = (re.compile('^(?:' + '|'.join(alternatives) + ')$'), groups)
+        self._compiled = True
+    
+    def match(self, method: str, path: str) -> Optional[Tuple[Route, Dict[str, str]]]:
+        """Find the route for a request: (route, path parameters), or None"""
+        if not self._compiled:
+            self.compile()
+        path = _normalize(path)
+        
+        route = self._static.get((method, path)) or self._static.get((ANY, path))
+        if route is not None:
+            return route, {}
+        
+        table = self._dynamic.get(method) or self._dynamic.get(ANY)
+        if table is None:
+            return None
+        regex, groups = table
+        found = regex.match(path)
+        if found is None:
+            return None
+        route, params = groups[found.lastgroup]
+        return route, {name: found.group(group) for group, name in params}
+    
+    def allowed_methods(self, path: str) -> List[str]:
+        """Methods with a route for this path (for 405 responses)"""
+        return sorted({
+            method for method in {route.method for route in self.routes} - {ANY}
+            if self.match(method, path) is not None
+        })
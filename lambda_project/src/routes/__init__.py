@@ -0,0 +1,10 @@
+"""
+Route modules, imported by the router on their first request
+
+Register a route in src/main.py with a 'module:function' target, e.g.
+router.add('GET', '/items/{item_id}', '.routes.items:get_item'). The
+module is then not imported during the cold start, only when a request
+for that route arrives. Route functions take a router.Request and return
+either a full API Gateway response (a dict with 'statusCode') or data to
+send as a 200 JSON body.
+"""
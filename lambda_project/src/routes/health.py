@@ -0,0 +1,8 @@
+import time
+
+_started = time.time()
+
+
+def health(request):
+    """Liveness check: no downstream calls"""
+    return {'status': 'ok', 'uptime_s': round(time.time() - _started, 3)}
@@ -0,0 +1,51 @@
+from .config import ConfigField
+
+# Configuration schema, resolved once per cold start (and by the config matrix check)
+CONFIG_SCHEMA = (
+    ConfigField('URL', required=True),
+    ConfigField('DEBUG', bool, default=False),
+    ConfigField('MAX_RETRIES', int, default=3),
+    ConfigField('TIMEOUT', int, default=30),
+    ConfigField('BATCH_CONCURRENCY', int, default=1),
+    ConfigField('DB_POOL_SIZE', int, default=2),
+    ConfigField('CIRCUIT_FAILURE_THRESHOLD', int, default=5),
+    ConfigField('CIRCUIT_RESET_TIMEOUT', int, default=30),
+    ConfigField('LOG_LEVEL', default='INFO'),
+    ConfigField('LOG_FORMAT', default='json'),
+    ConfigField('METRICS_ENABLED', bool, default=True),
+    ConfigField('METRICS_NAMESPACE', default='LambdaProject'),
+    ConfigField('SECRETS_PROVIDER', default='env'),
+    ConfigField('SECRETS_TTL', int, default=300),
+    ConfigField('SECRETS_FILE'),
+    ConfigField('SECRETS_PREFIX', default=''),
+    ConfigField('SECRETS_ENDPOINT_URL'),
+    ConfigField('ASYNC_CONCURRENCY', int, default=10),
+    ConfigField('RESPONSE_CACHE_ENABLED', bool, default=False),
+    ConfigField('RESPONSE_CACHE_TTL', int, default=60),
+    ConfigField('RESPONSE_CACHE_SIZE', int, default=256),
+    ConfigField('RESPONSE_CACHE_KEY', default='method,path,query,header:Idempotency-Key'),
+    ConfigField('RESPONSE_CACHE_DIR'),
+    ConfigField('JSON_SERIALIZER', default='auto'),
+    # Off by default: a REST API without binaryMediaTypes passes base64 bodies through as text
+    ConfigField('COMPRESSION_ENABLED', bool, default=False),
+    ConfigField('COMPRESSION_MIN_SIZE', int, default=1024),
+    ConfigField('INSTRUMENTATION_ENABLED', bool, default=False),
+    ConfigField('PROFILE_SAMPLE_RATE', float, default=0.0),
+    ConfigField('PROFILER', default='cprofile'),
+    ConfigField('PROFILE_DIR'),
+    ConfigField('WARMUP_ON_INIT', bool, default=False),
+    ConfigField('WARMUP_CONNECTIONS', int, default=1),
+    ConfigField('CONFIG_SOURCE'),
+    ConfigField('CONFIG_SOURCE_LOCATION'),
+    ConfigField('CONFIG_POLL_INTERVAL', int, default=60),
+    ConfigField('STREAM_CHUNK_SIZE', int, default=65536),
+    ConfigField('STREAM_FLUSH_INTERVAL', float, default=0.1),
+    ConfigField('STREAM_BUFFER_LIMIT', int, default=6 * 1024 * 1024),
+)
+
+# Read through config.get_secret() (TTL-cached provider), never frozen in the snapshot
+SECRET_FIELDS = (
+    ConfigField('API_KEY', required=True, secret=True),
+    ConfigField('DATABASE_URL', required=True, secret=True),
+)
+SECRET_KEYS = tuple(field.name for field in SECRET_FIELDS)
@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+
+class SecretNotFoundError(KeyError):
+    """Raised when a provider has no value for a secret"""
+
+
+class EnvSecretsProvider:
+    """Read secrets from the (cleaned) environment variables, as before"""
+
+    def __init__(self, get: Callable[[str], Optional[str]]):
+        """
+        Args:
+            get: Lookup function, e.g. EnvironmentConfig.get
+        """
+        self._get = get
+    
+    def fetch(self, name: str) -> str:
+        value = self._get(name)
+        if value is None:
+            raise SecretNotFoundError(name)
+        return value
+
+
+class FileSecretsProvider:
+    """Read secrets from a local JSON file ({"API_KEY": "...", ...}), re-read when it changes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime = None
+        self._values: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def fetch(self, name: str) -> str:
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime != self._mtime:
+                with open(self.path) as f:
+                    self._values = json.load(f)
+                self._mtime = mtime
+            values = self._values
+        if name not in values:
+            raise SecretNotFoundError(name)
+        return str(values[name])
+
+
+class SecretsManagerProvider:
+    """
+    Read secrets from AWS Secrets Manager
+    
+    Point `endpoint_url` at a local stand-in (e.g. LocalStack or moto server)
+    for local testing. boto3 comes with the Lambda runtime and is only
+    imported when the first secret is fetched.
+    """
+
+    def __init__(self, prefix: str = '', endpoint_url: Optional[str] = None, region: Optional[str] = None):
+        """
+        Args:
+            prefix: Prepended to secret names (e.g. 'myapp/prod/')
+            endpoint_url: Alternative endpoint, e.g. http://localhost:4566
+            region: AWS region (defaults to AWS_REGION)
+        """
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            boto3 = lazy_import('boto3')
+            self._client = boto3.client('secretsmanager', endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+    
+    def fetch(self, name: str) -> str:
+        try:
+            response = self.client.get_secret_value(SecretId=self.prefix + name)
+        except self.client.exceptions.ResourceNotFoundException:
+            raise SecretNotFoundError(name)
+        return response['SecretString']
+
+
+class ParameterStoreProvider(SecretsManagerProvider):
+    """Read SecureString parameters from SSM Parameter Store (e.g. prefix '/myapp/prod/')"""
+
+    @property
+    def client(self):
+        if self._client is None:
+            boto3 = lazy_import('boto3')
+            self._client = boto3.client('ssm', endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+    
+    def fetch(self, name: str) -> str:
+        try:
+            response = self.client.get_parameter(Name=self.prefix + name, WithDecryption=True)
+        except self.client.exceptions.ParameterNotFound:
+            raise SecretNotFoundError(name)
+        return response['Parameter']['Value']
+
+
+class SecretsCache:
+    """
+    In-memory TTL cache in front of a secrets provider
+    
+    - Fresh values are served from memory
+    - Within `refresh_ahead` seconds of expiry, one background refresh is
+      started and the current value is still served
+    - Missing or expired values are fetched single-flight: concurrent callers
+      wait for the one fetch in progress instead of stampeding the store
+    - If a refresh fails, the stale value keeps being served (and retried)
+    """
+
+    def __init__(self, provider, ttl: float = 300, refresh_ahead: Optional[float] = None):
+        self.provider = provider
+        self.ttl = ttl
+        self.refresh_ahead = ttl * 0.2 if refresh_ahead is None else refresh_ahead
+        self._entries: Dict[str, Tuple[str, float]] = {}  # name -> (value, expires_at)
+        self._inflight: Dict[str, threading.Event] = {}
+        self._errors: Dict[str, BaseException] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'fetches': 0, 'refreshes': 0, 'errors': 0}
+    
+    def _fetch(self, name: str):
+        """Fetch one secret and wake any waiters; only one runs per name at a time"""
+        try:
+            value = self.provider.fetch(name)
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+                self._errors[name] = e
+            logger.warning("Fetching secret '%s' failed: %s", name, e)
+        else:
+            with self._lock:
+                self.stats['fetches'] += 1
+                self._entries[name] = (value, time.monotonic() + self.ttl)
+                self._errors.pop(name, None)
+        finally:
+            with self._lock:
+                event = self._inflight.pop(name)
+            event.set()
+    
+    def _start_fetch(self, name: str) -> Tuple[threading.Event, bool]:
+        """Return the in-flight event for name and whether this caller owns the fetch"""
+        with self._lock:
+            event = self._inflight.get(name)
+            if event is not None:
+                return event, False
+            event = self._inflight[name] = threading.Event()
+            return event, True
+    
+    def get(self, name: str, timeout: Optional[float] = None) -> str:
+        """Get a secret, fetching it at most once concurrently"""
+        now = time.monotonic()
+        entry = self._entries.get(name)
+        if entry is not None:
+            value, expires_at = entry
+            if now < expires_at:
+                with self._lock:
+                    self.stats['hits'] += 1
+                if expires_at - now <= self.refresh_ahead:
+                    self.refresh(name)
+                return value
+        
+        event, owner = self._start_fetch(name)
+        if owner:
+            self._fetch(name)
+        elif not event.wait(timeout):
+            raise TimeoutError(f"Timed out waiting for secret '{name}'")
+        
+        with self._lock:
+            entry = self._entries.get(name)
+            error = self._errors.get(name)
+        if entry is None:
+            raise error if error is not None else SecretNotFoundError(name)
+        if entry[1] <= time.monotonic():
+            logger.warning("Serving stale value for secret '%s'", name)
+        return entry[0]
+    
+    def refresh(self, name: str):
+        """Refresh a secret in the background (no-op if a fetch is already running)"""
+        _, owner = self._start_fetch(name)
+        if owner:
+            with self._lock:
+                self.stats['refreshes'] += 1
+            threading.Thread(target=self._fetch, args=(name,), name=f'secret-refresh-{name}', daemon=True).start()
+    
+    def invalidate(self, name: Optional[str] = None):
+        """Drop one cached secret (or all), e.g. after an authentication failure"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+
+def build_provider(kind: str, get: Callable[[str], Optional[str]], location: Optional[str] = None,
+                   prefix: str = '', endpoint_url: Optional[str] = None):
+    """
+    Create a provider by name
+    
+    Args:
+        kind: 'env', 'file', 'secretsmanager' or 'ssm'
+        get: Environment lookup used by the 'env' provider
+        location: JSON file path for the 'file' provider
+        prefix: Name prefix for the AWS providers
+        endpoint_url: Alternative endpoint for the AWS providers (local stand-in)
+    """
+    kind = kind.lower()
+    if kind == 'env':
+        return EnvSecretsProvider(get)
+    if kind == 'file':
+        if not location:
+            raise ValueError("The 'file' secrets provider requires SECRETS_FILE")
+        return FileSecretsProvider(location)
+    if kind == 'secretsmanager':
+        return SecretsManagerProvider(prefix, endpoint_url)
+    if kind == 'ssm':
+        return ParameterStoreProvider(prefix, endpoint_url)
+    raise ValueError(f"Unknown secrets provider '{kind}'")
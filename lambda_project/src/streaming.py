@@ -0,0 +1,190 @@
+import base64
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Separates the JSON metadata prelude from the body in a streamed HTTP response
+# (Lambda function URLs with InvokeMode RESPONSE_STREAM)
+PRELUDE_SEPARATOR = b'\x00' * 8
+
+# Largest response a buffered (non-streaming) Lambda invocation can return
+BUFFERED_RESPONSE_LIMIT = 6 * 1024 * 1024
+
+Chunk = Union[bytes, str]
+
+
+class ResponseTooLargeError(RuntimeError):
+    """A streamed body does not fit in a buffered invocation's response"""
+
+
+def ndjson(rows: Iterable[Any], dumps: Callable[[Any], str] = json.dumps) -> Iterator[bytes]:
+    """
+    Encode rows (e.g. from a DB cursor) as newline-delimited JSON, one row at a time
+    
+    Args:
+        rows: Any iterable; it is consumed lazily, as the stream is written
+        dumps: Compact JSON encoder (the handler's serializer.dumps)
+    """
+    for row in rows:
+        yield (dumps(row) + '\n').encode('utf-8')
+
+
+def cursor_rows(cursor, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of an executed DB-API cursor as dicts, fetched `batch_size` at a time
+    
+    sqlite3 cursors read lazily; with psycopg2 use a named (server-side)
+    cursor, a default cursor loads the whole result on execute().
+    """
+    columns = [column[0] for column in cursor.description]
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        for row in batch:
+            yield dict(zip(columns, row))
+
+
+class StreamingResponse:
+    """
+    Response whose body is produced by an iterable of chunks
+    
+    Returned by a route instead of a body. The iterable is pulled one chunk
+    at a time only as fast as the response stream accepts writes, so memory
+    stays bounded by the chunk size however large the result is. A buffered
+    invocation collects it into an ordinary response (up to the Lambda
+    payload limit) instead.
+    """
+
+    def __init__(self, chunks: Iterable[Chunk], status_code: int = 200,
+                 headers: Optional[Dict[str, str]] = None, content_type: str = NDJSON_CONTENT_TYPE):
+        """
+        Args:
+            chunks: Body pieces (bytes, or str encoded as UTF-8); generators are typical
+            status_code: HTTP status, sent before the first chunk
+            headers: Response headers
+            content_type: Content-Type unless set in headers
+        """
+        self.chunks = chunks
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        self.headers.setdefault('Content-Type', content_type)
+    
+    def prelude(self) -> bytes:
+        """Status and headers as the metadata prelude of a streamed HTTP response"""
+        metadata = {'statusCode': self.status_code, 'headers': self.headers}
+        return json.dumps(metadata).encode('utf-8') + PRELUDE_SEPARATOR
+    
+    def close(self):
+        """
+        Close the chunk iterable if it is a generator (or anything with close())
+        
+        Runs the generator's finally blocks and with-exits, e.g. returning a
+        pooled database connection, when the body is abandoned part way.
+        """
+        close = getattr(self.chunks, 'close', None)
+        if close is not None:
+            close()
+    
+    def iter_chunks(self, chunk_size: int = 65536, flush_interval: Optional[float] = None) -> Iterator[bytes]:
+        """
+        Coalesce the body into chunks of about `chunk_size` bytes
+        
+        Small pieces (one NDJSON row each) are joined so every write is worth
+        a network round trip; a piece larger than chunk_size passes through
+        as is. With a flush_interval, pending data is also sent once it is
+        that many seconds old, so a slow producer still reaches the client.
+        """
+        pending = []
+        size = 0
+        oldest = None
+        for piece in self.chunks:
+            if isinstance(piece, str):
+                piece = piece.encode('utf-8')
+            if not piece:
+                continue
+            pending.append(piece)
+            size += len(piece)
+            if oldest is None and flush_interval is not None:
+                oldest = time.monotonic()
+            if size >= chunk_size or (oldest is not None and time.monotonic() - oldest >= flush_interval):
+                yield b''.join(pending)
+                pending = []
+                size = 0
+                oldest = None
+        if pending:
+            yield b''.join(pending)
+    
+    def write_to(self, stream, chunk_size: int = 65536, flush_interval: Optional[float] = None) -> Dict[str, float]:
+        """
+        Write the prelude, then the body chunk by chunk
+        
+        Args:
+            stream: Object with write(bytes); a blocking write is the backpressure
+            chunk_size: Target bytes per write
+            flush_interval: Longest time data waits for a full chunk, in seconds
+        
+        Returns:
+            Bytes and chunks written, and time to first body byte in ms
+        """
+        started = time.perf_counter()
+        written = 0
+        chunks = 0
+        first_byte_ms = None
+        body = self.iter_chunks(chunk_size, flush_interval)
+        try:
+            stream.write(self.prelude())
+            for chunk in body:
+                stream.write(chunk)
+                if first_byte_ms is None:
+                    first_byte_ms = (time.perf_counter() - started) * 1000
+                written += len(chunk)
+                chunks += 1
+        finally:
+            # A failed write (client gone) must not leave the producer suspended
+            body.close()
+            self.close()
+        return {'bytes': written, 'chunks': chunks, 'first_byte_ms': first_byte_ms or 0.0}
+    
+    def collect(self, limit: int = BUFFERED_RESPONSE_LIMIT) -> Dict[str, Any]:
+        """
+        Buffer the whole body into an API Gateway response
+        
+        Raises:
+            ResponseTooLargeError: If the body exceeds `limit` bytes
+        """
+        pieces = []
+        size = 0
+        chunks = self.iter_chunks()
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                if size > limit:
+                    raise ResponseTooLargeError(
+                        f"Streamed body exceeds {limit} bytes; invoke the streaming handler for this route"
+                    )
+                pieces.append(chunk)
+        finally:
+            chunks.close()
+            self.close()
+        body = b''.join(pieces)
+        try:
+            return {'statusCode': self.status_code, 'headers': self.headers, 'body': body.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {
+                'statusCode': self.status_code,
+                'headers': self.headers,
+                'body': base64.b64encode(body).decode('ascii'),
+                'isBase64Encoded': True,
+            }
+
+
+def write_response(stream, response: Dict[str, Any]):
+    """Write a buffered API Gateway response to a response stream (prelude, then body)"""
+    body = response.get('body') or ''
+    payload = base64.b64decode(body) if response.get('isBase64Encoded') else body.encode('utf-8')
+    StreamingResponse(
+        [payload], response.get('statusCode', 200), response.get('headers'), content_type='application/json',
+    ).write_to(stream)
@@ -0,0 +1,76 @@
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Event sources sent by warm-up tooling (e.g. serverless-plugin-warmup)
+WARMUP_SOURCES = frozenset({'serverless-plugin-warmup', 'warmup'})
+
+
+def is_warmup_event(event: Any) -> bool:
+    """
+    Check whether an event is a warm-up ping rather than a real request
+    
+    Recognized:
+    - EventBridge schedules: {"source": "aws.events", "detail-type": "Scheduled Event"}
+    - Warm-up tools: {"source": "serverless-plugin-warmup"} or {"source": "warmup"}
+    - Explicit pings: {"warmup": true}
+    """
+    if not isinstance(event, dict):
+        return False
+    if event.get('warmup') is True:
+        return True
+    source = event.get('source')
+    if source == 'aws.events':
+        return event.get('detail-type') == 'Scheduled Event'
+    return source in WARMUP_SOURCES
+
+
+class Warmer:
+    """
+    Ordered list of initialization steps run eagerly by a warm-up
+    
+    Steps run on a warm-up ping or during a provisioned-concurrency init,
+    so a real request finds config, connections and imports ready. Each
+    step is timed. A failing step is logged and does not stop the others.
+    """
+
+    def __init__(self):
+        self._steps: List[Tuple[str, Callable[[], Any]]] = []
+        self.runs = 0
+    
+    def step(self, name: str) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+        """Decorator registering a zero-argument initialization step"""
+        
+        def register(func: Callable[[], Any]) -> Callable[[], Any]:
+            self._steps.append((name, func))
+            return func
+        
+        return register
+    
+    def run(self) -> Dict[str, Optional[float]]:
+        """
+        Run every step in registration order
+        
+        Returns:
+            Milliseconds per step (None for a step that failed)
+        """
+        timings: Dict[str, Optional[float]] = {}
+        started = time.perf_counter()
+        for name, func in self._steps:
+            step_started = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                logger.warning("Warm-up step '%s' failed: %s", name, e)
+                timings[name] = None
+                continue
+            timings[name] = round((time.perf_counter() - step_started) * 1000, 3)
+        
+        self.runs += 1
+        logger.info(
+            "Warm-up completed in %.1f ms", (time.perf_counter() - started) * 1000,
+            extra={'warmup_steps_ms': timings},
+        )
+        return timings
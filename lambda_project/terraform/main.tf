@@ -34,11 +34,23 @@ locals {
     {
       ENVIRONMENT = var.environment
       AWS_REGION  = data.aws_region.current.name
-      DEPLOYED_AT = timestamp()
+      # No DEPLOYED_AT = timestamp(): a value that changes on every apply forces a
+      # configuration update and recycles all execution environments (cold starts)
     }
   )
 }
 
+# Dependency layer (built by scripts/build.py, only present when requirements.txt
+# has dependencies to bundle). The zip is reused byte for byte while requirements
+# are unchanged, so a new layer version is only published when dependencies change
+resource "aws_lambda_layer_version" "dependencies" {
+  count               = fileexists("../lambda_layer.zip") ? 1 : 0
+  filename            = "../lambda_layer.zip"
+  layer_name          = "python-lambda-deps-${lower(var.environment)}"
+  compatible_runtimes = ["python3.9"]
+  source_code_hash    = filebase64sha256("../lambda_layer.zip")
+}
+
 # Lambda function
 resource "aws_lambda_function" "python_lambda" {
   filename         = "../lambda_function.zip"
@@ -47,7 +59,8 @@ resource "aws_lambda_function" "python_lambda" {
   handler         = "src.main.handler"  # Updated handler path
   runtime         = "python3.9"
   timeout         = 30
-  source_code_hash = filebase64sha256("../lambda_function.zip")
+  source_code_hash = filebase64sha256("../lambda_function.zip")  # Function code only
+  layers           = aws_lambda_layer_version.dependencies[*].arn
 
   environment {
     variables = local.lambda_env_vars
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Tests import the function code as the `src` package, like the scripts do
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from src.batch import BatchProcessingError, process_batch, process_batch_async, record_id
+
+
+def sqs_records(*bodies):
+    return [{'messageId': f'msg-{i}', 'body': body} for i, body in enumerate(bodies)]
+
+
+def kinesis_records(*bodies):
+    return [{'kinesis': {'sequenceNumber': f'seq-{i}', 'data': body}, 'eventID': f'shard:{i}'}
+            for i, body in enumerate(bodies)]
+
+
+def fail_on_bad(record):
+    payload = record.get('body') or record.get('kinesis', {}).get('data')
+    if payload == 'bad':
+        raise ValueError('bad record')
+    return payload
+
+
+async def fail_on_bad_async(record):
+    await asyncio.sleep(0)
+    return fail_on_bad(record)
+
+
+def test_record_ids():
+    assert record_id(sqs_records('a')[0]) == 'msg-0'
+    assert record_id(kinesis_records('a')[0]) == 'seq-0'
+    assert record_id({'dynamodb': {'SequenceNumber': '7'}}) == '7'
+    assert record_id({}) is None
+
+
+@pytest.mark.parametrize('make_records, prefix', [(sqs_records, 'msg'), (kinesis_records, 'seq')])
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_only_failed_records_are_reported(make_records, prefix, max_workers):
+    event = {'Records': make_records('ok', 'bad', 'ok', 'bad', 'ok')}
+    response = process_batch(event, fail_on_bad, max_workers=max_workers)
+    assert response == {'batchItemFailures': [{'itemIdentifier': f'{prefix}-1'}, {'itemIdentifier': f'{prefix}-3'}]}
+
+
+@pytest.mark.parametrize('make_records, prefix', [(sqs_records, 'msg'), (kinesis_records, 'seq')])
+def test_async_batch_reports_failed_records(make_records, prefix):
+    event = {'Records': make_records('bad', 'ok', 'ok', 'bad')}
+    response = asyncio.run(process_batch_async(event, fail_on_bad_async, max_concurrency=2))
+    assert response == {'batchItemFailures': [{'itemIdentifier': f'{prefix}-0'}, {'itemIdentifier': f'{prefix}-3'}]}
+
+
+@pytest.mark.parametrize('event', [{'Records': []}, {}])
+def test_empty_batch(event):
+    assert process_batch(event, fail_on_bad) == {'batchItemFailures': []}
+
+
+def test_all_succeed():
+    assert process_batch({'Records': sqs_records('ok', 'ok')}, fail_on_bad, max_workers=2) == {'batchItemFailures': []}
+
+
+def test_failed_record_without_identifier_fails_the_batch():
+    event = {'Records': sqs_records('ok') + [{'body': 'bad'}]}
+    with pytest.raises(BatchProcessingError):
+        process_batch(event, fail_on_bad)
+
+
+def test_successful_record_without_identifier_is_fine():
+    assert process_batch({'Records': [{'body': 'ok'}]}, fail_on_bad) == {'batchItemFailures': []}
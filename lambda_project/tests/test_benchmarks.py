@@ -0,0 +1,42 @@
+import sys
+
+import pytest
+
+from conftest import PROJECT_ROOT
+
+sys.path.insert(0, str(PROJECT_ROOT / 'benchmarks'))
+
+from compare import compare  # noqa: E402
+from run import percentile  # noqa: E402
+
+
+@pytest.mark.parametrize('pct, expected', [(50, 5), (90, 9), (99, 10), (100, 10), (0, 1), (10, 1), (11, 2)])
+def test_nearest_rank_on_ten_samples(pct, expected):
+    assert percentile(list(range(10, 0, -1)), pct) == expected
+
+
+def test_p99_of_a_hundred_samples_is_the_ninety_ninth():
+    assert percentile([float(i) for i in range(1, 101)], 99) == 99.0
+
+
+def test_single_sample():
+    assert percentile([3.5], 50) == 3.5
+
+
+def _results(value):
+    return {'meta': {'python': '3.11'}, 'handler': {'p50': value}}
+
+
+@pytest.mark.parametrize('before, after, regressions', [
+    (10.0, 10.5, 0),
+    (10.0, 12.0, 1),
+    (0.0, 0.0, 0),
+    (0.0, 1.0, 1),
+    (-10.0, -9.5, 0),
+    (-10.0, -8.0, 1),
+    (-10.0, -12.0, 0),
+])
+def test_compare_regressions(before, after, regressions, capsys):
+    assert compare(_results(before), _results(after), threshold=0.10) == regressions
+    line = capsys.readouterr().out.splitlines()[1]
+    assert f"{after - before:+.2f}" in line
@@ -0,0 +1,85 @@
+import threading
+
+from src.cache import DirectoryBackend, ResponseCache
+
+
+def _event(method='GET', path='/items', headers=None, query=None):
+    return {'httpMethod': method, 'path': path, 'headers': headers or {}, 'queryStringParameters': query}
+
+
+def _response(body='{"ok":true}', status_code=200):
+    return {'statusCode': status_code, 'headers': {'Content-Type': 'application/json'}, 'body': body}
+
+
+def test_hit_for_the_same_request():
+    cache = ResponseCache()
+    cache.store(_event(query={'a': '1'}), _response())
+    cached = cache.lookup(_event(query={'a': '1'}))
+    assert cached['body'] == '{"ok":true}'
+    assert cached['headers']['X-Cache'] == 'Hit'
+    assert cache.lookup(_event(query={'a': '2'})) is None
+
+
+def test_authorization_is_part_of_the_key():
+    cache = ResponseCache()
+    cache.store(_event(headers={'Authorization': 'Bearer alice'}), _response('alice'))
+    assert cache.lookup(_event(headers={'authorization': 'Bearer alice'}))['body'] == 'alice'
+    assert cache.lookup(_event(headers={'Authorization': 'Bearer bob'})) is None
+    assert cache.lookup(_event()) is None
+
+
+def test_authorization_is_part_of_a_custom_key():
+    cache = ResponseCache(key_fields=['path'])
+    assert cache.key(_event(headers={'Authorization': 'a'})) != cache.key(_event(headers={'Authorization': 'b'}))
+    assert cache.key(_event(method='GET')) == cache.key(_event(method='HEAD'))
+
+
+def test_shared_backend_does_not_store_the_credential(tmp_path):
+    cache = ResponseCache(backend=DirectoryBackend(str(tmp_path)))
+    cache.store(_event(headers={'Authorization': 'Bearer secret-token'}), _response())
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert 'secret-token' not in files[0].name
+    assert 'secret-token' not in files[0].read_text()
+
+
+def test_non_idempotent_methods_need_an_idempotency_key():
+    cache = ResponseCache()
+    cache.store(_event('POST'), _response())
+    assert cache.lookup(_event('POST')) is None
+    keyed = _event('POST', headers={'Idempotency-Key': 'k1'})
+    cache.store(keyed, _response(status_code=201))
+    assert cache.lookup(keyed)['statusCode'] == 201
+
+
+def test_idempotency_key_is_part_of_every_non_idempotent_key():
+    cache = ResponseCache(key_fields=['method', 'path'])
+    first = _event('POST', '/orders', headers={'Idempotency-Key': 'k1'})
+    second = _event('POST', '/orders', headers={'Idempotency-Key': 'k2'})
+    cache.store(first, _response('order-1', status_code=201))
+    assert cache.lookup(second) is None
+    assert cache.lookup(first)['body'] == 'order-1'
+
+
+def test_post_and_get_do_not_share_a_key_without_method_in_the_projection():
+    cache = ResponseCache(key_fields=['path'])
+    headers = {'Idempotency-Key': 'k1'}
+    assert cache.key(_event('POST', headers=headers)) != cache.key(_event('GET', headers=headers))
+
+
+def test_stats_are_counted_under_concurrency():
+    cache = ResponseCache()
+    cache.store(_event(), _response())
+    threads = [threading.Thread(target=lambda: [cache.lookup(_event()) for _ in range(500)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats['hits'] == 4000
+
+
+def test_server_errors_are_not_stored():
+    cache = ResponseCache()
+    cache.store(_event(), _response(status_code=503))
+    assert cache.lookup(_event()) is None
+    assert cache.stats['stores'] == 0
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from src import envfile
+from src.config import ConfigField, EnvironmentConfig, resolve_matrix
+
+SCHEMA = (
+    ConfigField('URL', required=True),
+    ConfigField('TIMEOUT', int, default=30),
+)
+
+
+@pytest.fixture
+def local(tmp_path):
+    """Local (non-Lambda) environment 'T' with a .env in tmp_path"""
+    saved_environ = dict(os.environ)
+    for name in ('AWS_LAMBDA_FUNCTION_NAME', 'LAMBDA_RUNTIME_DIR', 'AWS_EXECUTION_ENV', 'ENV_NAME', 'ENVIRONMENT'):
+        os.environ.pop(name, None)
+    for name in [key for key in os.environ if key.startswith('T_')]:
+        del os.environ[name]
+    envfile._loaded.clear()
+    
+    def make(dotenv=''):
+        (tmp_path / '.env').write_text(dotenv)
+        return EnvironmentConfig(environment='T', root_dir=str(tmp_path))
+    
+    yield make
+    envfile._loaded.clear()
+    # .env exports (ENV_NAME) must not leak into other tests
+    os.environ.clear()
+    os.environ.update(saved_environ)
+
+
+def test_dotenv_values_are_unprefixed(local):
+    config = local('T_URL=http://dotenv\nOTHER_URL=x\n')
+    assert config.env_vars == {'URL': 'http://dotenv'}
+
+
+def test_process_environment_wins_over_dotenv(local, monkeypatch):
+    monkeypatch.setenv('T_URL', 'http://process')
+    config = local('T_URL=http://dotenv\n')
+    assert config.env_vars['URL'] == 'http://process'
+
+
+def test_construction_does_not_copy_unrelated_process_variables(local, monkeypatch):
+    monkeypatch.setenv('T_UNDECLARED', 'x')
+    config = local()
+    assert config.env_vars == {}
+    assert config.get('UNDECLARED') == 'x'
+
+
+def test_load_reads_declared_keys_set_only_in_the_process(local, monkeypatch):
+    monkeypatch.setenv('T_URL', 'http://process')
+    monkeypatch.setenv('T_TIMEOUT', '5')
+    monkeypatch.setenv('T_SECRET', 's')
+    monkeypatch.setenv('T_UNDECLARED', 'x')
+    config = local()
+    settings = config.load(SCHEMA, extra_keys=['SECRET'])
+    assert (settings.url, settings.timeout) == ('http://process', 5)
+    assert config.env_vars == {'URL': 'http://process', 'TIMEOUT': '5', 'SECRET': 's'}
+    assert config.get('UNDECLARED') == 'x'
+
+
+def test_undeclared_dotenv_keys_stay_readable_after_load(local):
+    config = local('T_URL=http://dotenv\nT_EXTRA=e\n')
+    config.load(SCHEMA)
+    assert 'EXTRA' not in config.env_vars
+    assert config.get('EXTRA') == 'e'
+
+
+def test_missing_required_key_raises(local):
+    with pytest.raises(ValueError, match='URL'):
+        local().load(SCHEMA)
+
+
+def test_only_the_environment_selectors_are_exported(local):
+    config = local('ENV_NAME=t\nT_URL=http://dotenv\nAWS_REGION_FROM_DOTENV=x\n')
+    assert os.environ['ENV_NAME'] == 't'
+    assert 'T_URL' not in os.environ
+    assert 'AWS_REGION_FROM_DOTENV' not in os.environ
+    assert config.environment == 'T'
+
+
+def test_large_dotenv_takes_the_environ_scan(local, monkeypatch):
+    lines = ''.join(f'T_KEY_{i}=dotenv\n' for i in range(len(os.environ) + 10))
+    monkeypatch.setenv('T_KEY_3', 'process')
+    config = local(lines)
+    assert config.env_vars['KEY_3'] == 'process'
+    assert config.env_vars['KEY_4'] == 'dotenv'
+
+
+MATRIX_SCHEMA = (ConfigField('URL', required=True),)
+
+
+def test_matrix_detects_environments_from_dotenv_prefixes_only(tmp_path):
+    envfile._loaded.clear()
+    (tmp_path / '.env').write_text('NONPROD_URL=a\nPROD_URL=b\n')
+    environ = {'DATABASE_URL': 'x', 'ANTHROPIC_API_KEY': 'k', 'PROD_URL': 'c'}
+    matrix = resolve_matrix(MATRIX_SCHEMA, root_dir=str(tmp_path), environ=environ)
+    assert matrix.environments == ['NONPROD', 'PROD']
+    assert matrix.ok
+    assert matrix.value('PROD', 'URL') == 'c'
+
+
+def test_matrix_uses_the_declared_environments(tmp_path):
+    envfile._loaded.clear()
+    (tmp_path / '.env').write_text('ENVIRONMENTS=nonprod\nNONPROD_URL=a\nPROD_URL=b\n')
+    matrix = resolve_matrix(MATRIX_SCHEMA, root_dir=str(tmp_path), environ={})
+    assert matrix.environments == ['NONPROD']
+    
+    override = {'ENVIRONMENTS': 'PROD, STAGE', 'STAGE_URL': 's'}
+    matrix = resolve_matrix(MATRIX_SCHEMA, root_dir=str(tmp_path), environ=override)
+    assert matrix.environments == ['PROD', 'STAGE']
+    assert matrix.ok
+
+
+def test_matrix_without_dotenv_needs_explicit_environments(tmp_path):
+    environ = {'NONPROD_URL': 'a'}
+    assert resolve_matrix(MATRIX_SCHEMA, root_dir=str(tmp_path), environ=environ).environments == []
+    assert resolve_matrix(MATRIX_SCHEMA, ['nonprod'], root_dir=str(tmp_path), environ=environ).ok
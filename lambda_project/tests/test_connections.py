@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.connections import ConnectionManager, ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+def make_pool(max_size=1):
+    return ConnectionPool(FakeConnection, max_size=max_size)
+
+
+def test_connection_is_returned_after_the_block():
+    pool = make_pool()
+    with pool.connection() as first:
+        pass
+    with pool.connection(timeout=1) as second:
+        assert second is first
+    assert pool.stats()['in_use'] == 0
+
+
+def test_connection_is_discarded_after_an_exception():
+    pool = make_pool()
+    with pytest.raises(ValueError):
+        with pool.connection() as connection:
+            raise ValueError('boom')
+    assert connection.closed
+    assert pool.stats()['in_use'] == 0
+
+
+def test_closing_a_generator_mid_block_releases_the_slot():
+    pool = make_pool()
+    
+    def rows():
+        with pool.connection():
+            yield 1
+            yield 2
+    
+    generator = rows()
+    next(generator)
+    generator.close()
+    
+    assert pool.stats()['in_use'] == 0
+    with pool.connection(timeout=1):
+        pass
+
+
+@pytest.mark.parametrize('db_pool_size, async_concurrency, expected', [(2, 10, 10), (16, 10, 16)])
+def test_pools_fit_the_async_fan_out(db_pool_size, async_concurrency, expected):
+    settings = SimpleNamespace(
+        url='http://127.0.0.1:9', timeout=5, db_pool_size=db_pool_size, async_concurrency=async_concurrency,
+    )
+    manager = ConnectionManager.from_settings(settings, 'sqlite:///:memory:')
+    assert manager.pool_size == expected
+    assert manager.database.max_size == expected
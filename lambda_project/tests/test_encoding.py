@@ -0,0 +1,75 @@
+import base64
+import gzip
+
+import pytest
+
+from src.encoding import ResponseCompressor, parse_accept_encoding
+
+BODY = '{"items":[' + ','.join(['"value"'] * 400) + ']}'
+
+
+def _event(accept_encoding=None):
+    return {'headers': {'Accept-Encoding': accept_encoding} if accept_encoding is not None else {}}
+
+
+def _response(body=BODY, status_code=200, headers=None):
+    return {'statusCode': status_code, 'headers': dict(headers or {'Content-Type': 'application/json'}), 'body': body}
+
+
+@pytest.fixture
+def compressor():
+    compressor = ResponseCompressor(min_size=1024)
+    compressor._compressors = {'gzip': lambda data: gzip.compress(data, mtime=0)}
+    return compressor
+
+
+def test_gzip_when_accepted(compressor):
+    response = compressor.compress(_event('gzip, deflate'), _response())
+    assert response['headers']['Content-Encoding'] == 'gzip'
+    assert response['headers']['Vary'] == 'Accept-Encoding'
+    assert response['isBase64Encoded'] is True
+    assert gzip.decompress(base64.b64decode(response['body'])).decode() == BODY
+
+
+@pytest.mark.parametrize('accept_encoding', [None, 'identity', 'gzip;q=0'])
+def test_identity_body_still_varies_on_accept_encoding(compressor, accept_encoding):
+    original = _response()
+    response = compressor.compress(_event(accept_encoding), original)
+    assert response['body'] == BODY
+    assert 'Content-Encoding' not in response['headers']
+    assert response['headers']['Vary'] == 'Accept-Encoding'
+    assert 'Vary' not in original['headers']
+
+
+def test_incompressible_body_varies_on_accept_encoding(compressor):
+    compressor._compressors = {'gzip': lambda data: data + b'!'}
+    response = compressor.compress(_event('gzip'), _response())
+    assert response['body'] == BODY
+    assert response['headers']['Vary'] == 'Accept-Encoding'
+
+
+def test_existing_vary_is_extended_once(compressor):
+    response = compressor.compress(_event('gzip'), _response(headers={'vary': 'Origin'}))
+    assert response['headers']['vary'] == 'Origin, Accept-Encoding'
+    again = compressor.compress(_event(), _response(headers={'Vary': 'accept-encoding'}))
+    assert again['headers']['Vary'] == 'accept-encoding'
+
+
+@pytest.mark.parametrize('response', [
+    _response(body='{"small":true}'),
+    _response(status_code=404),
+    _response(headers={'Content-Encoding': 'br'}),
+])
+def test_ineligible_responses_are_unchanged(compressor, response):
+    assert compressor.compress(_event('gzip'), response) is response
+
+
+def test_disabled_compressor_leaves_responses_alone(compressor):
+    compressor.enabled = False
+    response = _response()
+    assert compressor.compress(_event('gzip'), response) is response
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding('gzip;q=0.5, br, *;q=0') == {'gzip': 0.5, 'br': 1.0, '*': 0.0}
+    assert parse_accept_encoding(None) == {}
@@ -0,0 +1,166 @@
+import marshal
+import os
+
+import pytest
+
+from src import envfile
+from src.envfile import build_index, parse
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    envfile._loaded.clear()
+    yield
+    envfile._loaded.clear()
+
+
+def test_plain_assignments_and_whitespace():
+    assert parse('A=1\n  B = two  \nC=\n') == {'A': '1', 'B': 'two', 'C': ''}
+
+
+def test_comments_and_blank_lines():
+    text = '# heading\n\nA=1 # trailing comment\nB=x#not-a-comment\n   # indented comment\n'
+    assert parse(text) == {'A': '1', 'B': 'x#not-a-comment'}
+
+
+@pytest.mark.parametrize('line, value', [
+    ('KEY= # comment', ''),
+    ('KEY=\t# comment', ''),
+    ('KEY=   ', ''),
+    ('KEY=#not-a-comment', '#not-a-comment'),
+    ('KEY=a # b # c', 'a'),
+])
+def test_comment_right_after_the_equals_sign(line, value):
+    assert parse(line + '\nNEXT=1\n') == {'KEY': value, 'NEXT': '1'}
+
+
+def test_export_prefix():
+    assert parse('export A=1\nexport\tB="two"\nexported=3\n') == {'A': '1', 'B': 'two', 'exported': '3'}
+
+
+def test_single_quotes_are_literal():
+    assert parse("A='a \\n $b # c'\n") == {'A': 'a \\n $b # c'}
+
+
+def test_double_quote_escapes():
+    text = 'A="line\\nnext\\ttab \\"quoted\\" back\\\\slash \\$HOME \\q"\n'
+    assert parse(text) == {'A': 'line\nnext\ttab "quoted" back\\slash $HOME \\q'}
+
+
+def test_quoted_values_span_lines():
+    text = 'KEY="-----BEGIN-----\nabc\n-----END-----"\nB=\'x\ny\' # comment\nC=3\n'
+    assert parse(text) == {'KEY': '-----BEGIN-----\nabc\n-----END-----', 'B': 'x\ny', 'C': '3'}
+
+
+def test_text_after_a_quoted_value_is_ignored():
+    assert parse('A="1" # note\nB="2"junk\n') == {'A': '1', 'B': '2'}
+
+
+def test_later_assignments_win_and_garbage_is_skipped():
+    assert parse('A=1\nnot an assignment\nA=2') == {'A': '2'}
+
+
+@pytest.mark.parametrize('text', ['A="open\nB=1\n', "A='open\n"])
+def test_unterminated_quotes_raise(text):
+    with pytest.raises(ValueError, match="'A'"):
+        parse(text)
+
+
+def test_build_index_and_environment():
+    index = build_index({'NONPROD_URL': 'a', 'US_EAST_URL': 'b', 'PLAIN': 'c'})
+    env_file = envfile.EnvFile('<test>', {}, index)
+    assert env_file.environment('NONPROD') == {'URL': 'a'}
+    assert env_file.environment('US_EAST') == {'URL': 'b'}
+    assert env_file.environment('PROD') == {}
+
+
+def test_export_copies_only_the_given_keys(monkeypatch):
+    monkeypatch.delenv('ENV_NAME', raising=False)
+    monkeypatch.delenv('TEST_ONLY_KEY', raising=False)
+    monkeypatch.setenv('ENVIRONMENT', 'from-process')
+    env_file = envfile.EnvFile('<test>', {'ENV_NAME': 'DEV', 'ENVIRONMENT': 'x', 'TEST_ONLY_KEY': 'y'}, {})
+    env_file.export(['ENV_NAME', 'ENVIRONMENT', 'MISSING'])
+    assert os.environ['ENV_NAME'] == 'DEV'
+    assert os.environ['ENVIRONMENT'] == 'from-process'
+    assert 'TEST_ONLY_KEY' not in os.environ
+    assert 'MISSING' not in os.environ
+
+
+def _write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_load_missing_file(tmp_path):
+    assert envfile.load(str(tmp_path / '.env')) is None
+
+
+def test_load_writes_a_compiled_cache(tmp_path):
+    path = tmp_path / '.env'
+    _write(path, 'DEV_URL=a\n', 1_000_000_000)
+    env_file = envfile.load(str(path))
+    assert env_file.environment('DEV') == {'URL': 'a'}
+    with open(tmp_path / '.env.cache', 'rb') as f:
+        cached = marshal.load(f)
+    assert cached['version'] == envfile.CACHE_VERSION
+    assert tuple(cached['stamp']) == (1_000_000_000, len('DEV_URL=a\n'))
+    assert cached['values'] == {'DEV_URL': 'a'}
+
+
+def test_load_is_memoized_while_the_file_is_unchanged(tmp_path):
+    path = tmp_path / '.env'
+    _write(path, 'A=1\n', 1_000_000_000)
+    assert envfile.load(str(path)) is envfile.load(str(path))
+
+
+def test_cache_is_used_when_the_stamp_matches(tmp_path, monkeypatch):
+    path = tmp_path / '.env'
+    _write(path, 'A=1\n', 1_000_000_000)
+    envfile.load(str(path))
+    envfile._loaded.clear()
+    
+    def no_parse(text):
+        raise AssertionError('parsed despite a valid cache')
+    
+    monkeypatch.setattr(envfile, 'parse', no_parse)
+    assert envfile.load(str(path)).values == {'A': '1'}
+
+
+def test_touched_file_with_same_content_revalidates_by_digest(tmp_path, monkeypatch):
+    path = tmp_path / '.env'
+    _write(path, 'A=1\n', 1_000_000_000)
+    envfile.load(str(path))
+    envfile._loaded.clear()
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    monkeypatch.setattr(envfile, 'parse', lambda text: pytest.fail('parsed an unchanged file'))
+    assert envfile.load(str(path)).values == {'A': '1'}
+    with open(tmp_path / '.env.cache', 'rb') as f:
+        assert tuple(marshal.load(f)['stamp'])[0] == 2_000_000_000
+
+
+def test_changed_file_invalidates_memo_and_cache(tmp_path):
+    path = tmp_path / '.env'
+    _write(path, 'A=1\n', 1_000_000_000)
+    first = envfile.load(str(path))
+    # An edit changes the stamp (size and mtime)
+    _write(path, 'A=22\n', 2_000_000_000)
+    second = envfile.load(str(path))
+    assert second is not first
+    assert second.values == {'A': '22'}
+    envfile._loaded.clear()
+    assert envfile.load(str(path)).values == {'A': '22'}
+
+
+@pytest.mark.parametrize('content', [b'', b'not marshal', marshal.dumps({'version': -1})])
+def test_corrupt_or_outdated_cache_is_ignored(tmp_path, content):
+    path = tmp_path / '.env'
+    _write(path, 'A=1\n', 1_000_000_000)
+    (tmp_path / '.env.cache').write_bytes(content)
+    assert envfile.load(str(path)).values == {'A': '1'}
+
+
+def test_load_without_cache_writes_none(tmp_path):
+    path = tmp_path / '.env'
+    _write(path, 'A=1\n', 1_000_000_000)
+    assert envfile.load(str(path), use_cache=False).values == {'A': '1'}
+    assert not (tmp_path / '.env.cache').exists()
@@ -0,0 +1,34 @@
+import sys
+
+import pytest
+
+from conftest import PROJECT_ROOT
+
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+import local_runtime  # noqa: E402
+from local_runtime import LocalRuntime  # noqa: E402
+
+# Any importable two-argument callable will do: the worker reports its pid and cold start either way
+HANDLER = 'os.path.join'
+
+
+def _run(runtime, count):
+    try:
+        return [runtime.invoke({}) for _ in range(count)]
+    finally:
+        runtime.shutdown()
+
+
+@pytest.mark.parametrize('per_worker', [True, False] if local_runtime.PER_WORKER_RECYCLING else [False])
+def test_recycling_forces_a_cold_start(monkeypatch, per_worker):
+    monkeypatch.setattr(local_runtime, 'PER_WORKER_RECYCLING', per_worker)
+    results = _run(LocalRuntime(workers=1, recycle_after=2, handler_path=HANDLER), 5)
+    assert [result['cold_start'] for result in results] == [True, False, True, False, True]
+    pids = [result['worker_pid'] for result in results]
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+
+
+def test_without_recycling_the_worker_stays_warm():
+    results = _run(LocalRuntime(workers=1, handler_path=HANDLER), 3)
+    assert [result['cold_start'] for result in results] == [True, False, False]
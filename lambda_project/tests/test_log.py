@@ -0,0 +1,37 @@
+import logging
+
+import pytest
+
+from src.log import JsonFormatter, configure_logging
+
+
+@pytest.fixture
+def root_handler():
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    handler = logging.StreamHandler()
+    original = logging.Formatter('%(message)s')
+    handler.setFormatter(original)
+    root.handlers = [handler]
+    yield handler, original
+    root.handlers, root.level = saved_handlers, saved_level
+
+
+def test_json_format_installs_the_json_formatter(root_handler):
+    handler, _ = root_handler
+    configure_logging('INFO', 'json')
+    assert isinstance(handler.formatter, JsonFormatter)
+
+
+def test_switching_back_to_text_restores_the_previous_formatter(root_handler):
+    handler, original = root_handler
+    configure_logging('INFO', 'json')
+    configure_logging('DEBUG', 'text')
+    assert handler.formatter is original
+    assert logging.getLogger().level == logging.DEBUG
+
+
+def test_text_format_leaves_a_non_json_formatter_alone(root_handler):
+    handler, original = root_handler
+    configure_logging('INFO', 'text')
+    assert handler.formatter is original
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from src.resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceededError, call_with_retry, call_with_retry_async,
+)
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def fail_with(error):
+    def func(timeout):
+        raise error
+    return func
+
+
+def test_retryable_failures_open_the_circuit():
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(fail_with(OSError('down')), max_retries=3, breaker=breaker, base_delay=0)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(lambda timeout: 'ok', breaker=breaker)
+
+
+def test_successful_trial_closes_the_circuit():
+    breaker = half_open_breaker()
+    assert call_with_retry(lambda timeout: 'ok', breaker=breaker) == 'ok'
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_retryable_error_in_trial_reopens_the_circuit():
+    breaker = half_open_breaker()
+    with pytest.raises(ValueError):
+        call_with_retry(fail_with(ValueError('bug')), breaker=breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    # The next trial is let through again once the reset timeout has passed
+    assert call_with_retry(lambda timeout: 'ok', breaker=breaker) == 'ok'
+
+
+def test_non_retryable_error_when_closed_does_not_count():
+    breaker = CircuitBreaker('test', failure_threshold=1)
+    with pytest.raises(ValueError):
+        call_with_retry(fail_with(ValueError('bug')), breaker=breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_non_retryable_error_in_trial_reopens_the_circuit():
+    breaker = half_open_breaker()
+    
+    async def func(timeout):
+        raise KeyError('bug')
+    
+    with pytest.raises(KeyError):
+        asyncio.run(call_with_retry_async(func, breaker=breaker))
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+class CountingCall:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+    
+    def __call__(self, timeout):
+        self.calls += 1
+        raise self.error
+
+
+@pytest.mark.parametrize('error', [DeadlineExceededError('nested'), CircuitOpenError('other downstream')])
+def test_nested_deadline_and_circuit_errors_are_not_retried_or_counted(error):
+    breaker = CircuitBreaker('test', failure_threshold=1)
+    func = CountingCall(error)
+    with pytest.raises(type(error)):
+        call_with_retry(func, max_retries=3, breaker=breaker, base_delay=0)
+    assert func.calls == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+@pytest.mark.parametrize('error', [DeadlineExceededError('nested'), CircuitOpenError('other downstream')])
+def test_async_nested_deadline_and_circuit_errors_are_not_retried_or_counted(error):
+    breaker = CircuitBreaker('test', failure_threshold=1)
+    calls = []
+    
+    async def func(timeout):
+        calls.append(timeout)
+        raise error
+    
+    with pytest.raises(type(error)):
+        asyncio.run(call_with_retry_async(func, max_retries=3, breaker=breaker, base_delay=0))
+    assert len(calls) == 1
+    assert breaker.failures == 0
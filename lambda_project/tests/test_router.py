@@ -0,0 +1,126 @@
+from src.router import ANY, Request, Router, request_line
+
+
+def get_item(request):
+    return 'item'
+
+
+def list_items(request):
+    return 'items'
+
+
+def any_item(request):
+    return 'any'
+
+
+def serve_file(request):
+    return 'file'
+
+
+def make_router():
+    router = Router()
+    router.add('GET', '/items', list_items)
+    router.add('GET', '/items/{item_id}', get_item)
+    router.add('DELETE', '/items/{item_id}', any_item, name='delete_item')
+    router.add(ANY, '/files/{path+}', serve_file)
+    router.compile()
+    return router
+
+
+def test_static_route():
+    route, params = make_router().match('GET', '/items')
+    assert route.handler is list_items
+    assert params == {}
+
+
+def test_trailing_slash_is_ignored():
+    route, _ = make_router().match('GET', '/items/')
+    assert route.handler is list_items
+
+
+def test_path_parameter():
+    route, params = make_router().match('GET', '/items/42')
+    assert route.handler is get_item
+    assert params == {'item_id': '42'}
+
+
+def test_parameter_matches_one_segment_only():
+    assert make_router().match('GET', '/items/42/extra') is None
+
+
+def test_greedy_parameter_takes_the_rest_of_the_path():
+    route, params = make_router().match('GET', '/files/a/b/c.txt')
+    assert route.handler is serve_file
+    assert params == {'path': 'a/b/c.txt'}
+
+
+def test_method_selects_the_route():
+    route, _ = make_router().match('DELETE', '/items/42')
+    assert route.name == 'delete_item'
+
+
+def test_any_route_serves_every_method():
+    router = make_router()
+    for method in ('GET', 'POST', 'PATCH'):
+        route, _ = router.match(method, '/files/x')
+        assert route.handler is serve_file
+
+
+def test_method_without_its_own_table_falls_back_to_any():
+    router = Router()
+    router.add(ANY, '/{proxy+}', any_item)
+    route, params = router.match('PUT', '/anything/here')
+    assert route.handler is any_item
+    assert params == {'proxy': 'anything/here'}
+
+
+def test_unknown_path_is_not_found():
+    router = make_router()
+    assert router.match('GET', '/missing') is None
+    assert router.allowed_methods('/missing') == []
+
+
+def test_wrong_method_lists_allowed_methods():
+    router = make_router()
+    assert router.match('POST', '/items/42') is None
+    assert router.allowed_methods('/items/42') == ['DELETE', 'GET']
+
+
+def test_routes_are_tried_in_registration_order():
+    router = Router()
+    router.add('GET', '/users/{user_id}', get_item, name='first')
+    router.add('GET', '/users/{name}', list_items, name='second')
+    route, params = router.match('GET', '/users/me')
+    assert route.name == 'first'
+    assert params == {'user_id': 'me'}
+
+
+def test_string_target_is_imported_on_first_access():
+    router = Router(package='src')
+    route = router.add('GET', '/health', '.routes.health:health')
+    assert route.name == 'health'
+    assert not route.loaded
+    found, _ = router.match('GET', '/health')
+    assert found is route and not route.loaded
+    assert route.handler.__name__ == 'health'
+    assert route.loaded
+
+
+def test_adding_a_route_recompiles():
+    router = make_router()
+    router.add('GET', '/late', list_items)
+    route, _ = router.match('GET', '/late')
+    assert route.handler is list_items
+
+
+def test_request_line_rest_and_http_api_events():
+    assert request_line({'httpMethod': 'post', 'path': '/a'}) == ('POST', '/a')
+    assert request_line({'rawPath': '/b', 'requestContext': {'http': {'method': 'PUT'}}}) == ('PUT', '/b')
+    assert request_line({}) == ('GET', '/')
+
+
+def test_request_body_and_json():
+    event = {'body': 'eyJhIjogMX0=', 'isBase64Encoded': True, 'queryStringParameters': None}
+    request = Request(event, None, 'POST', '/', {})
+    assert request.json() == {'a': 1}
+    assert request.query == {}
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from src import secret_store
+from src.secret_store import SecretNotFoundError, SecretsCache
+
+
+class CountingProvider:
+    """Returns '<name>-<call number>' after `delay` seconds, or fails while `fail` is set"""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+        self._lock = threading.Lock()
+    
+    def fetch(self, name):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError('store unavailable')
+        if name == 'missing':
+            raise SecretNotFoundError(name)
+        return f'{name}-{call}'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(secret_store.time, 'monotonic', clock)
+    return clock
+
+
+def _wait_for_refresh(cache, provider, calls):
+    deadline = time.time() + 5
+    while (provider.calls < calls or cache._inflight) and time.time() < deadline:
+        time.sleep(0.005)
+
+
+def test_concurrent_misses_share_one_fetch():
+    provider = CountingProvider(delay=0.1)
+    cache = SecretsCache(provider, ttl=60)
+    barrier = threading.Barrier(16)
+    results = []
+    
+    def read():
+        barrier.wait()
+        results.append(cache.get('API_KEY'))
+    
+    threads = [threading.Thread(target=read) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.calls == 1
+    assert results == ['API_KEY-1'] * 16
+    assert cache.stats['fetches'] == 1
+
+
+def test_fresh_values_are_served_from_memory(clock):
+    provider = CountingProvider()
+    cache = SecretsCache(provider, ttl=60, refresh_ahead=0)
+    assert cache.get('API_KEY') == 'API_KEY-1'
+    clock.now += 59
+    assert cache.get('API_KEY') == 'API_KEY-1'
+    assert provider.calls == 1
+    assert cache.stats['hits'] == 1
+
+
+def test_expired_value_is_fetched_again(clock):
+    provider = CountingProvider()
+    cache = SecretsCache(provider, ttl=60, refresh_ahead=0)
+    cache.get('API_KEY')
+    clock.now += 61
+    assert cache.get('API_KEY') == 'API_KEY-2'
+
+
+def test_refresh_ahead_serves_the_current_value_and_refreshes_once_in_background(clock):
+    provider = CountingProvider()
+    cache = SecretsCache(provider, ttl=60, refresh_ahead=10)
+    cache.get('API_KEY')
+    clock.now += 55
+    assert cache.get('API_KEY') == 'API_KEY-1'
+    _wait_for_refresh(cache, provider, 2)
+    assert provider.calls == 2
+    assert cache.stats['refreshes'] == 1
+    assert cache.get('API_KEY') == 'API_KEY-2'
+
+
+def test_stale_value_is_served_after_a_failed_refresh(clock):
+    provider = CountingProvider()
+    cache = SecretsCache(provider, ttl=60, refresh_ahead=10)
+    cache.get('API_KEY')
+    provider.fail = True
+    clock.now += 55
+    assert cache.get('API_KEY') == 'API_KEY-1'
+    _wait_for_refresh(cache, provider, 2)
+    assert cache.stats['errors'] == 1
+    
+    # Past expiry the fetch is synchronous; it fails again and the stale value is served
+    clock.now += 10
+    assert cache.get('API_KEY') == 'API_KEY-1'
+    assert cache.stats['errors'] == 2
+    
+    provider.fail = False
+    assert cache.get('API_KEY') == 'API_KEY-4'
+
+
+def test_failure_without_a_cached_value_raises():
+    provider = CountingProvider()
+    provider.fail = True
+    cache = SecretsCache(provider)
+    with pytest.raises(ConnectionError):
+        cache.get('API_KEY')
+    with pytest.raises(SecretNotFoundError):
+        SecretsCache(CountingProvider()).get('missing')
+
+
+def test_waiter_times_out_while_another_caller_fetches():
+    provider = CountingProvider(delay=0.5)
+    cache = SecretsCache(provider)
+    owner = threading.Thread(target=cache.get, args=('API_KEY',))
+    owner.start()
+    while not cache._inflight:
+        time.sleep(0.001)
+    with pytest.raises(TimeoutError):
+        cache.get('API_KEY', timeout=0.01)
+    owner.join()
+
+
+def test_invalidate_forces_a_fetch():
+    provider = CountingProvider()
+    cache = SecretsCache(provider)
+    cache.get('API_KEY')
+    cache.invalidate('API_KEY')
+    assert cache.get('API_KEY') == 'API_KEY-2'
@@ -0,0 +1,63 @@
+import pytest
+
+from src.streaming import PRELUDE_SEPARATOR, ResponseTooLargeError, StreamingResponse
+
+
+class Tracked:
+    """Chunk generator recording whether it was closed"""
+
+    def __init__(self, count, size=10):
+        self.count = count
+        self.size = size
+        self.closed = False
+    
+    def __iter__(self):
+        try:
+            for _ in range(self.count):
+                yield b'x' * self.size
+        finally:
+            self.closed = True
+
+
+class FailingStream:
+    def __init__(self, fail_after):
+        self.fail_after = fail_after
+        self.writes = []
+    
+    def write(self, data):
+        if len(self.writes) >= self.fail_after:
+            raise BrokenPipeError()
+        self.writes.append(data)
+
+
+def test_collect_joins_the_body():
+    response = StreamingResponse(['a\n', b'b\n'], headers={'X-Test': '1'})
+    collected = response.collect()
+    assert collected['statusCode'] == 200
+    assert collected['body'] == 'a\nb\n'
+    assert collected['headers']['Content-Type'] == 'application/x-ndjson'
+
+
+def test_collect_over_the_limit_closes_the_generator():
+    rows = Tracked(1000)
+    generator = iter(rows)
+    with pytest.raises(ResponseTooLargeError):
+        StreamingResponse(generator).collect(limit=100)
+    assert rows.closed
+
+
+def test_write_to_sends_prelude_then_chunks():
+    stream = FailingStream(fail_after=100)
+    sent = StreamingResponse(iter(Tracked(10)), status_code=201).write_to(stream, chunk_size=25)
+    assert stream.writes[0].endswith(PRELUDE_SEPARATOR)
+    assert b'"statusCode": 201' in stream.writes[0]
+    assert b''.join(stream.writes[1:]) == b'x' * 100
+    assert sent['bytes'] == 100
+    assert sent['chunks'] == 4
+
+
+def test_failed_write_closes_the_generator():
+    rows = Tracked(1000)
+    with pytest.raises(BrokenPipeError):
+        StreamingResponse(iter(rows)).write_to(FailingStream(fail_after=2), chunk_size=10)
+    assert rows.closed